@@ -0,0 +1,70 @@
+from collections import deque
+from typing import Dict, Hashable, Iterator, List, Tuple
+
+class AhoCorasick:
+    """여러 용어를 한 번에 찾는 Aho-Corasick 오토마톤
+
+    용어 수와 관계없이 텍스트 길이에 비례하는 시간으로 모든 (겹치는) 출현 위치를 찾습니다.
+    add()로 용어와 종류를 등록한 뒤 build()를 한 번 호출하고, 이후에는 읽기 전용으로 공유합니다.
+    """
+
+    def __init__(self):
+        # 상태별 전이, 실패 링크, 그 상태에서 끝나는 (용어, 종류) 목록
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[str, Hashable]]] = [[]]
+        self._built = False
+
+    def add(self, term: str, kind: Hashable = None):
+        """용어 등록 (같은 용어를 여러 종류로 등록 가능)"""
+        if not term:
+            raise ValueError("빈 용어는 등록할 수 없습니다")
+        if self._built:
+            raise RuntimeError("build() 이후에는 용어를 추가할 수 없습니다")
+
+        state = 0
+        for char in term:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+
+        if (term, kind) not in self._output[state]:
+            self._output[state].append((term, kind))
+
+    def build(self):
+        """실패 링크 계산 (너비 우선) 후 각 상태의 출력에 접미사 용어를 합침"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+        self._built = True
+        return self
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, str, Hashable]]:
+        """(시작, 끝, 용어, 종류)를 끝 위치 순서로 반환"""
+        if not self._built:
+            raise RuntimeError("build()를 먼저 호출해야 합니다")
+
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for pos, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for term, kind in output[state]:
+                yield pos + 1 - len(term), pos + 1, term, kind
+
+    def __len__(self) -> int:
+        """상태 수"""
+        return len(self._goto)
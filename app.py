@@ -132,16 +132,70 @@ with col2:
 
 # 검색 실행
 if search_button and search_query:
-    with st.spinner('논문을 검색하고 분석 중입니다... ⏳'):
-        try:
-            # 검색 실행 - 올바른 매개변수명 사용
-            results = service.search_medical_papers(search_query, max_results=max_papers)
-            
-            # 결과 저장 (세션 상태)
-            st.session_state.search_results = results
-            
-        except Exception as e:
-            st.error(f"검색 중 오류가 발생했습니다: {str(e)}")
+    # 진행 상황과 요약 문장을 받는 대로 표시 (완료되면 아래 결과 화면으로 대체)
+    status_placeholder = st.empty()
+    overall_placeholder = st.empty()
+    papers_container = st.container()
+    paper_placeholders = []
+    status_placeholder.info('논문을 검색하고 분석 중입니다... ⏳')
+    
+    try:
+        results = {}
+        papers = []
+        overall_text = ""
+        paper_texts = []
+        summarized_count = 0
+        
+        def render_paper(index: int, cursor: str = ""):
+            """논문별 자리에 제목과 지금까지 받은 요약 표시"""
+            title = f"**{index + 1}. {papers[index].get('title', '')}**"
+            text = paper_texts[index]
+            paper_placeholders[index].markdown(f"{title}\n\n> {text}{cursor}" if text else title)
+        
+        for event, data in service.stream_medical_papers(search_query, max_results=max_papers):
+            if event == 'analysis':
+                results.update(data)
+            elif event == 'paper':
+                papers.append(data)
+                paper_texts.append("")
+                with papers_container:
+                    paper_placeholders.append(st.empty())
+                render_paper(len(papers) - 1)
+                status_placeholder.info(f"📚 논문 {len(papers)}개를 찾았습니다. AI 요약 생성 중... ⏳")
+            elif event == 'summary_delta':
+                paper_texts[data['index']] += data['delta']
+                render_paper(data['index'], "▌")
+            elif event == 'summary':
+                paper_texts[data['index']] = data['ai_summary']
+                render_paper(data['index'])
+                papers[data['index']]['ai_summary'] = data['ai_summary']
+                papers[data['index']]['summary_incomplete'] = data.get('incomplete', False)
+                papers[data['index']]['summary_fallback'] = data.get('summary_fallback', False)
+                summarized_count += 1
+                status_placeholder.info(f"🤖 논문 요약 {summarized_count}/{len(papers)} 완료 ⏳")
+            elif event == 'overall_summary_delta':
+                overall_text += data['delta']
+                overall_placeholder.markdown(f"**📋 종합 요약**\n\n{overall_text}▌")
+            elif event == 'overall_summary':
+                results['overall_summary'] = data['overall_summary']
+                results['overall_summary_incomplete'] = data.get('incomplete', False)
+                results['overall_summary_fallback'] = data.get('overall_summary_fallback', False)
+            elif event == 'done':
+                results.update(data)
+        
+        results['papers'] = papers
+        
+        # 결과 저장 (세션 상태)
+        st.session_state.search_results = results
+        
+    except Exception as e:
+        st.error(f"검색 중 오류가 발생했습니다: {str(e)}")
+    
+    finally:
+        status_placeholder.empty()
+        overall_placeholder.empty()
+        for placeholder in paper_placeholders:
+            placeholder.empty()
 
 # 결과 표시
 if st.session_state.search_results:
@@ -166,6 +220,16 @@ if st.session_state.search_results:
             st.info(interpretation)
         st.markdown("---")
     
+    # 종합 요약 표시
+    if results.get('overall_summary'):
+        st.subheader("📋 종합 요약")
+        st.markdown(results['overall_summary'])
+        if results.get('overall_summary_incomplete'):
+            st.warning("⚠️ AI 요약 생성이 중간에 끊겨 앞부분만 표시합니다.")
+        elif results.get('overall_summary_fallback'):
+            st.warning("⚠️ AI 요약을 생성하지 못해 기본 요약을 표시합니다.")
+        st.markdown("---")
+    
     # 논문 목록 표시
     if results['papers']:
         st.subheader(f"📚 검색 결과 ({len(results['papers'])}개 논문)")
@@ -200,6 +264,10 @@ if st.session_state.search_results:
                 if paper.get('ai_summary'):
                     st.markdown("**🤖 AI 요약**")
                     st.markdown(f"> {paper['ai_summary']}")
+                    if paper.get('summary_incomplete'):
+                        st.caption("⚠️ 요약 생성이 중간에 끊겨 앞부분만 표시합니다.")
+                    elif paper.get('summary_fallback'):
+                        st.caption("⚠️ AI 요약을 생성하지 못해 초록 앞부분을 표시합니다.")
                 
                 # 초록 보기 토글 (nested expander 문제 해결)
                 if paper.get('abstract'):
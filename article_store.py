@@ -0,0 +1,191 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Optional, Iterable, Iterator, Tuple
+from config import config
+from sqlite_cache import CacheEviction
+
+class ArticleStore:
+    """PMID를 키로 논문 정보를 저장하는 SQLite 기반 영구 캐시
+
+    논문 초록은 거의 바뀌지 않으므로 efetch 결과를 디스크에 보관하고,
+    TTL이 지난 항목과 최대 개수를 넘는 오래된(최근 조회 기준) 항목을 CacheEviction 주기로 제거합니다.
+    여러 uvicorn 워커가 같은 파일을 공유할 수 있도록 WAL 모드를 사용합니다.
+    """
+
+    _default: Optional['ArticleStore'] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, path: str = None, ttl: float = None, max_entries: int = None):
+        self.path = path or config.ARTICLE_CACHE_PATH
+        self.ttl = config.ARTICLE_CACHE_TTL if ttl is None else ttl
+        max_entries = config.ARTICLE_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.hits = 0
+        self.misses = 0
+        # 관련 논문 목록(related)은 개수 제한 없이 만료 항목만 함께 정리
+        self._eviction = CacheEviction('articles', 'pmid', max_entries, expiring_tables=('related',))
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS articles (
+                pmid TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                expires_at REAL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_articles_accessed ON articles(accessed_at)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_articles_expires ON articles(expires_at)')
+        # ELink(pubmed_pubmed) 관련 논문 목록 [(pmid, 점수), ...]
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS related (
+                pmid TEXT PRIMARY KEY,
+                links TEXT NOT NULL,
+                expires_at REAL
+            )
+        ''')
+        self._conn.commit()
+
+    @classmethod
+    def default(cls) -> Optional['ArticleStore']:
+        """설정에 따라 프로세스 전체에서 공유하는 저장소 반환 (비활성화 시 None)"""
+        if not config.ARTICLE_CACHE_ENABLED:
+            return None
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    cls._default = cls()
+        return cls._default
+
+    def get(self, pmid: str) -> Optional[Dict]:
+        """단일 논문 조회"""
+        return self.get_many([pmid]).get(pmid)
+
+    def get_many(self, pmids: List[str]) -> Dict[str, Dict]:
+        """만료되지 않은 논문들을 {pmid: paper} 형태로 반환"""
+        if not pmids:
+            return {}
+
+        now = time.time()
+        placeholders = ','.join('?' * len(pmids))
+
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT pmid, data, accessed_at FROM articles WHERE pmid IN ({placeholders}) '
+                f'AND (expires_at IS NULL OR expires_at > ?)',
+                [*pmids, now]
+            ).fetchall()
+
+            stale = [pmid for pmid, _, accessed_at in rows if self._eviction.is_stale(accessed_at, now)]
+            if stale:
+                self._conn.execute(
+                    f'UPDATE articles SET accessed_at = ? WHERE pmid IN ({",".join("?" * len(stale))})',
+                    [now, *stale]
+                )
+                self._conn.commit()
+
+            found = {pmid: json.loads(data) for pmid, data, _ in rows}
+            self.hits += len(found)
+            self.misses += len(set(pmids) - found.keys())
+
+        return found
+
+    def put_many(self, papers: Iterable[Dict], ttl: float = None):
+        """논문 목록 저장 (같은 PMID는 덮어씀)"""
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = now + ttl if ttl and ttl > 0 else None
+
+        rows = [
+            (paper['pmid'], json.dumps(paper, ensure_ascii=False), now, now, expires_at)
+            for paper in papers if paper.get('pmid')
+        ]
+        if not rows:
+            return
+
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO articles (pmid, data, fetched_at, accessed_at, expires_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                rows
+            )
+            self._conn.commit()
+            self._eviction.written(self._conn, len(rows), now)
+
+    def get_related(self, pmids: List[str]) -> Dict[str, List[Tuple[str, float]]]:
+        """만료되지 않은 관련 논문 목록을 {pmid: [(관련 pmid, 점수), ...]} 형태로 반환"""
+        if not pmids:
+            return {}
+
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT pmid, links FROM related WHERE pmid IN ({",".join("?" * len(pmids))}) '
+                f'AND (expires_at IS NULL OR expires_at > ?)',
+                [*pmids, time.time()]
+            ).fetchall()
+        return {pmid: [tuple(link) for link in json.loads(links)] for pmid, links in rows}
+
+    def put_related(self, related: Dict[str, List[Tuple[str, float]]], ttl: float = None):
+        """관련 논문 목록 저장 (논문과 같은 TTL, 관련 논문이 없는 PMID도 빈 목록으로 저장)"""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl and ttl > 0 else None
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO related (pmid, links, expires_at) VALUES (?, ?, ?)',
+                [(pmid, json.dumps(links), expires_at) for pmid, links in related.items()]
+            )
+            self._conn.commit()
+
+    def iter_papers(self, batch_size: int = 1000) -> Iterator[List[Dict]]:
+        """만료되지 않은 전체 논문을 PMID 순서로 batch_size개씩 (색인 재구축용, 조회 통계에 반영하지 않음)"""
+        last_pmid = ''
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    'SELECT pmid, data FROM articles WHERE pmid > ? AND (expires_at IS NULL OR expires_at > ?) '
+                    'ORDER BY pmid LIMIT ?',
+                    (last_pmid, time.time(), batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            last_pmid = rows[-1][0]
+            yield [json.loads(data) for _, data in rows]
+
+    def delete_many(self, pmids: List[str]):
+        """논문 삭제"""
+        if not pmids:
+            return
+
+        with self._lock:
+            self._conn.execute(
+                f'DELETE FROM articles WHERE pmid IN ({",".join("?" * len(pmids))})',
+                pmids
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+
+    def stats(self) -> Dict:
+        """캐시 적중 통계 (항목 수는 COUNT(*) 대신 정리 때 센 대략값, 아직 세지 않았으면 None)"""
+        total = self.hits + self.misses
+        return {
+            'entries': self._eviction.approx_count,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,272 @@
+import asyncio
+import httpx
+import xml.etree.ElementTree as ET
+from typing import List, Dict, Optional, AsyncIterator, Awaitable, Callable, Tuple, TypeVar
+from config import config
+from pubmed_search import (
+    PubMedSearcher, PaperXMLStreamParser, STREAM_CHUNK_SIZE, RELATED_FETCH_CHUNK, eutils_endpoint,
+    PubMedError, PubMedHTTPError, PubMedTimeoutError, PubMedConnectionError, PubMedResponseError, PubMedUnavailableError
+)
+from resilience import parse_retry_after
+from single_flight import AsyncSingleFlight
+from article_store import ArticleStore
+from search_index import SearchIndex
+from rate_limiter import TokenBucket
+import time
+import tracing
+
+T = TypeVar('T')
+
+class AsyncPubMedSearcher(PubMedSearcher):
+    """asyncio 기반 PubMed 클라이언트 (esearch/efetch/esummary 코루틴)
+
+    요청 파라미터와 XML 파싱은 PubMedSearcher와 공유하고,
+    HTTP 호출만 httpx.AsyncClient 연결 풀로 수행합니다.
+    로컬 저장소/색인(SQLite) 작업은 이벤트 루프를 막지 않도록 스레드에서 실행합니다.
+    """
+
+    def __init__(self, article_store: Optional[ArticleStore] = None,
+                 rate_limiter: Optional[TokenBucket] = None,
+                 search_index: Optional[SearchIndex] = None):
+        super().__init__(article_store, rate_limiter, search_index)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._afetch_flight = AsyncSingleFlight()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """이벤트 루프에서 공유하는 비동기 연결 풀 클라이언트 반환"""
+        if self._client is None or self._client.is_closed:
+            keepalive = config.PUBMED_POOL_SIZE if config.PUBMED_KEEP_ALIVE else 0
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=config.PUBMED_POOL_SIZE,
+                    max_keepalive_connections=keepalive
+                ),
+                timeout=httpx.Timeout(config.PUBMED_READ_TIMEOUT, connect=config.PUBMED_CONNECT_TIMEOUT)
+            )
+        return self._client
+
+    async def aclose(self):
+        """연결 풀 종료"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _acall(self, operation: Callable[[], Awaitable[T]]) -> T:
+        """호출 제한, 재시도(지수 백오프), 서킷 브레이커를 적용해 비동기 E-utilities 작업 실행"""
+        attempt = 0
+        while True:
+            if not self.circuit_breaker.allow_request():
+                raise PubMedUnavailableError(self.circuit_breaker.retry_after())
+
+            try:
+                if self.rate_limiter is not None:
+                    wait = await self.rate_limiter.acquire_async()
+                    if wait > 0:
+                        tracing.record('ncbi.rate_limit_wait', 'wait', wait)
+                result = await operation()
+            except PubMedError as e:
+                delay = self._handle_failure(e, attempt)
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                # 코드 오류나 취소(CancelledError)는 NCBI 장애로 세지 않고 시험 호출만 반납
+                self.circuit_breaker.release_trial()
+                raise
+
+            self.circuit_breaker.record_success()
+            return result
+
+    @staticmethod
+    def _check_status(response: httpx.Response):
+        """4xx/5xx 응답을 PubMedHTTPError로 변환"""
+        if response.status_code >= 400:
+            raise PubMedHTTPError(
+                response.status_code,
+                f"E-utilities HTTP {response.status_code}: {response.reason_phrase}",
+                parse_retry_after(response.headers.get('Retry-After'))
+            )
+
+    async def _aget_xml(self, url: str, params: Dict, parse: Callable[[bytes], T]) -> T:
+        """공유 클라이언트로 GET 요청 후 응답 XML을 파싱 (재시도 포함)"""
+        async def operation():
+            with tracing.span(f'ncbi.{eutils_endpoint(url)}', kind='ncbi'):
+                try:
+                    response = await self._get_client().get(url, params=params)
+                except httpx.TimeoutException as e:
+                    raise PubMedTimeoutError(str(e)) from e
+                except httpx.HTTPError as e:
+                    raise PubMedConnectionError(str(e)) from e
+                self._check_status(response)
+
+            try:
+                with tracing.span(f'{eutils_endpoint(url)}_xml_parse', kind='parse'):
+                    return parse(response.content)
+            except (ET.ParseError, ValueError, TypeError) as e:
+                raise PubMedResponseError(f"E-utilities XML 파싱 오류: {e}") from e
+
+        return await self._acall(operation)
+
+    async def _afetch_paper_stream(self, url: str, params: Dict) -> List[Dict]:
+        """efetch 응답을 받는 대로 점진적으로 파싱 (재시도 포함)"""
+        async def operation():
+            papers = []
+            parser = PaperXMLStreamParser()
+            parse_time = 0.0
+            try:
+                with tracing.span(f'ncbi.{eutils_endpoint(url)}', kind='ncbi'):
+                    async with self._get_client().stream('GET', url, params=params) as response:
+                        self._check_status(response)
+                        async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+                            start = time.perf_counter()
+                            papers.extend(parser.feed(chunk))
+                            parse_time += time.perf_counter() - start
+                        start = time.perf_counter()
+                        papers.extend(parser.close())
+                        parse_time += time.perf_counter() - start
+            except httpx.TimeoutException as e:
+                raise PubMedTimeoutError(str(e)) from e
+            except httpx.HTTPError as e:
+                raise PubMedConnectionError(str(e)) from e
+            except ET.ParseError as e:
+                raise PubMedResponseError(f"E-utilities XML 파싱 오류: {e}") from e
+            tracing.record('efetch_xml_parse', 'parse', parse_time, papers=len(papers))
+            return papers
+
+        return await self._acall(operation)
+
+    async def search_papers(self, query: str, max_results: int = None) -> List[str]:
+        """PubMed에서 논문 검색"""
+        if max_results is None:
+            max_results = config.MAX_PAPERS
+
+        return await self._aget_xml(config.PUBMED_SEARCH_URL, self._search_params(query, max_results),
+                                    self._parse_search_xml)
+
+    async def fetch_paper_details(self, pmids: List[str]) -> List[Dict]:
+        """논문 상세 정보 가져오기 (로컬 저장소에 없는 PMID만 efetch)"""
+        if not pmids:
+            return []
+
+        cached = await asyncio.to_thread(self._get_cached_papers, pmids)
+        missing = [pmid for pmid in pmids if pmid not in cached]
+
+        fetched = []
+        if missing and not config.PUBMED_OFFLINE:
+            fetched = await self._afetch_flight.do(frozenset(missing), lambda: self._afetch_missing(missing))
+
+        return self._merge_in_order(pmids, cached, fetched)
+
+    async def _afetch_missing(self, missing: List[str]) -> List[Dict]:
+        """저장소에 없는 PMID들을 efetch하고 저장소에 기록"""
+        fetched = await self._afetch_paper_stream(config.PUBMED_FETCH_URL, self._fetch_params(missing))
+        await asyncio.to_thread(self._store_papers, fetched)
+        return fetched
+
+    async def fetch_summaries(self, pmids: List[str]) -> List[Dict]:
+        """esummary로 논문 요약 메타데이터 가져오기"""
+        if not pmids:
+            return []
+
+        return await self._aget_xml(config.PUBMED_SUMMARY_URL, self._summary_params(pmids),
+                                    self._parse_summary_xml)
+
+    async def fetch_related(self, pmids: List[str], max_per_pmid: int = None) -> Dict[str, List[Tuple[str, float]]]:
+        """ELink로 PMID별 관련 논문 [(pmid, 점수), ...] 가져오기 (저장소에 없는 PMID만 묶어서 요청)"""
+        pmids = list(dict.fromkeys(pmids))
+        related = await asyncio.to_thread(self._get_cached_related, pmids)
+        missing = [pmid for pmid in pmids if pmid not in related]
+
+        batch_size = max(1, config.PUBMED_LINK_BATCH_SIZE)
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start:start + batch_size]
+            links = await self._aget_xml(config.PUBMED_LINK_URL, self._link_params(batch), self._parse_link_xml)
+            fetched = {pmid: links.get(pmid, []) for pmid in batch}
+            await asyncio.to_thread(self._store_related, fetched)
+            related.update(fetched)
+
+        return self._limit_related(pmids, related, max_per_pmid)
+
+    async def fetch_related_papers(self, pmids: List[str], max_per_pmid: int = 5) -> Dict[str, List[Dict]]:
+        """PMID별 관련 논문 상세 정보 (ELink 한 번 + 저장소에 없는 관련 논문만 묶어서 efetch)"""
+        related = await self.fetch_related(pmids, max_per_pmid)
+        linked = list(dict.fromkeys(pmid for links in related.values() for pmid, _ in links))
+        papers = []
+        for start in range(0, len(linked), RELATED_FETCH_CHUNK):
+            papers.extend(await self.fetch_paper_details(linked[start:start + RELATED_FETCH_CHUNK]))
+        return self._related_papers(related, papers)
+
+    async def search_with_history(self, query: str) -> Dict:
+        """esearch 결과를 히스토리 서버에 저장하고 WebEnv/query_key/전체 건수 반환"""
+        return await self._aget_xml(config.PUBMED_SEARCH_URL, self._history_search_params(query),
+                                    self._parse_history_xml)
+
+    async def fetch_history_batch(self, webenv: str, query_key: str, retstart: int, retmax: int) -> List[Dict]:
+        """히스토리 서버에서 retstart부터 retmax개 논문 상세 정보 가져오기"""
+        papers = await self._afetch_paper_stream(
+            config.PUBMED_FETCH_URL,
+            self._history_fetch_params(webenv, query_key, retstart, retmax)
+        )
+        await asyncio.to_thread(self._store_papers, papers)
+        return papers
+
+    async def iter_history_batches(self, webenv: str, query_key: str, total: int,
+                                   batch_size: int = None, max_workers: int = None) -> AsyncIterator[List[Dict]]:
+        """히스토리 서버 결과를 배치 단위로 병렬 요청하여 순서대로 반환"""
+        batch_size = batch_size or config.PUBMED_HISTORY_BATCH_SIZE
+        max_workers = max_workers or config.PUBMED_MAX_PARALLEL_FETCHES
+
+        pending = []
+        try:
+            for retstart in range(0, total, batch_size):
+                retmax = min(batch_size, total - retstart)
+                pending.append(asyncio.ensure_future(
+                    self.fetch_history_batch(webenv, query_key, retstart, retmax)
+                ))
+                if len(pending) >= max_workers:
+                    yield await pending.pop(0)
+
+            while pending:
+                yield await pending.pop(0)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def iter_search_results(self, query: str, max_results: int = None,
+                                  batch_size: int = None) -> AsyncIterator[List[Dict]]:
+        """히스토리 서버를 사용해 대량 검색 결과를 배치 단위로 스트리밍"""
+        history = await self.search_with_history(query)
+        if history['count'] == 0:
+            return
+
+        total = history['count'] if max_results is None else min(max_results, history['count'])
+        async for batch in self.iter_history_batches(history['webenv'], history['query_key'], total, batch_size):
+            yield batch
+
+    async def search_and_fetch(self, query: str, max_results: int = None, use_history: bool = False) -> List[Dict]:
+        """검색과 상세 정보 가져오기를 한번에 수행"""
+        if config.PUBMED_OFFLINE:
+            return await asyncio.to_thread(self._offline_results, query, max_results or config.MAX_PAPERS)
+
+        if use_history:
+            papers = []
+            async for batch in self.iter_search_results(query, max_results):
+                papers.extend(batch)
+            return papers
+
+        if max_results is None:
+            max_results = config.MAX_PAPERS
+
+        # 최근에 검색한 주제는 NCBI 호출 없이 로컬 저장소에서 응답
+        local = await asyncio.to_thread(self._local_topic_results, query, max_results)
+        if local is not None:
+            return local
+
+        pmids = await self.search_papers(query, max_results)
+        papers = await self.fetch_paper_details(pmids) if pmids else []
+        await asyncio.to_thread(self._remember_topic, query, max_results, pmids, papers)
+        return papers
+
+    async def search_and_fetch_many(self, queries: List[str], max_results: int = None) -> List[List[Dict]]:
+        """여러 쿼리를 동시에 검색 (쿼리 순서대로 결과 반환)"""
+        return await asyncio.gather(*(self.search_and_fetch(q, max_results) for q in queries))
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+PubMed 연결 풀 벤치마크
+
+로컬 모의 E-utilities 서버를 띄워 연결 풀 사용 여부에 따른
+핸드셰이크(신규 TCP 연결) 수와 검색당 지연 시간을 비교합니다.
+
+    python bench_connection_pool.py --searches 50 --handshake-delay 0.03
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import requests
+
+from config import config
+from pubmed_search import PubMedSearcher
+
+ESEARCH_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<eSearchResult><Count>{count}</Count><RetMax>{count}</RetMax><IdList>{ids}</IdList></eSearchResult>"""
+
+ARTICLE_XML = """<PubmedArticle><MedlineCitation><PMID Version="1">{pmid}</PMID>
+<Article><Journal><JournalIssue><PubDate><Year>2023</Year><Month>Jan</Month></PubDate></JournalIssue>
+<Title>Journal of Benchmarks</Title></Journal><ArticleTitle>Benchmark article {pmid}</ArticleTitle>
+<Abstract><AbstractText Label="BACKGROUND">Connection pooling benchmark abstract.</AbstractText></Abstract>
+<AuthorList><Author><LastName>Kim</LastName><ForeName>Minji</ForeName></Author></AuthorList>
+</Article></MedlineCitation></PubmedArticle>"""
+
+
+class _CountingServer(ThreadingHTTPServer):
+    """수락한 TCP 연결 수를 세는 HTTP 서버"""
+    daemon_threads = True
+
+    def __init__(self, address, handler, handshake_delay: float):
+        super().__init__(address, handler)
+        self.handshake_delay = handshake_delay
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    def get_request(self):
+        request = super().get_request()
+        with self._lock:
+            self.connections += 1
+        return request
+
+
+class _EUtilsHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive 지원
+    disable_nagle_algorithm = True  # 헤더/본문 분할 전송 시 delayed ACK 지연 방지
+
+    def setup(self):
+        super().setup()
+        # 새 연결마다 TLS 핸드셰이크 비용을 흉내냄
+        if self.server.handshake_delay:
+            time.sleep(self.server.handshake_delay)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        params = parse_qs(parsed.query)
+
+        if parsed.path.endswith('esearch.fcgi'):
+            retmax = int(params.get('retmax', ['10'])[0])
+            ids = ''.join(f'<Id>{30000000 + i}</Id>' for i in range(retmax))
+            body = ESEARCH_XML.format(count=retmax, ids=ids)
+        elif parsed.path.endswith('efetch.fcgi'):
+            pmids = params.get('id', [''])[0].split(',')
+            articles = ''.join(ARTICLE_XML.format(pmid=pmid) for pmid in pmids if pmid)
+            body = f'<?xml version="1.0"?><PubmedArticleSet>{articles}</PubmedArticleSet>'
+        else:
+            self.send_error(404)
+            return
+
+        payload = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/xml')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _UnpooledSearcher(PubMedSearcher):
+    """기존 동작(요청마다 requests.get) 재현용"""
+
+    def _get(self, url, params, stream=False):
+        response = requests.get(url, params=params, timeout=self.timeout, stream=stream)
+        response.raise_for_status()
+        return response
+
+
+def run_case(label: str, searcher: PubMedSearcher, server: _CountingServer,
+             searches: int, concurrency: int, max_results: int) -> dict:
+    """검색을 반복 실행하고 연결 수와 지연 시간을 측정"""
+    server.connections = 0
+    latencies = []
+    lock = threading.Lock()
+    counter = iter(range(searches))
+
+    def worker():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            start = time.perf_counter()
+            papers = searcher.search_and_fetch(f"benchmark query {i}", max_results)
+            elapsed = time.perf_counter() - start
+            assert len(papers) == max_results
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    total_start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    total = time.perf_counter() - total_start
+
+    latencies.sort()
+    return {
+        'label': label,
+        'connections': server.connections,
+        'connections_per_search': server.connections / searches,
+        'mean_ms': statistics.mean(latencies) * 1000,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        'throughput': searches / total,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PubMed 연결 풀 벤치마크")
+    parser.add_argument('--searches', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--max-results', type=int, default=10)
+    parser.add_argument('--handshake-delay', type=float, default=0.03,
+                        help="새 연결마다 추가할 지연(초), TLS 핸드셰이크 모사")
+    args = parser.parse_args()
+
+    server = _CountingServer(('127.0.0.1', 0), _EUtilsHandler, args.handshake_delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}/entrez/eutils"
+
+    original_urls = (config.PUBMED_SEARCH_URL, config.PUBMED_FETCH_URL)
+    config.PUBMED_SEARCH_URL = f"{base}/esearch.fcgi"
+    config.PUBMED_FETCH_URL = f"{base}/efetch.fcgi"
+    config.PUBMED_REQUESTS_PER_SECOND = 0  # 로컬 서버이므로 호출 제한 해제
+    config.ARTICLE_CACHE_ENABLED = False  # 매 검색마다 efetch가 실제로 나가도록 캐시 비활성화
+
+    try:
+        results = [
+            run_case("without pooling", _UnpooledSearcher(), server,
+                     args.searches, args.concurrency, args.max_results),
+            run_case("with pooling", PubMedSearcher(), server,
+                     args.searches, args.concurrency, args.max_results),
+        ]
+    finally:
+        config.PUBMED_SEARCH_URL, config.PUBMED_FETCH_URL = original_urls
+        PubMedSearcher.close_session()
+        server.shutdown()
+
+    print(f"🔌 연결 풀 벤치마크 (searches={args.searches}, concurrency={args.concurrency}, "
+          f"handshake_delay={args.handshake_delay}s)")
+    print("=" * 78)
+    print(f"{'case':<18}{'connections':>12}{'conn/search':>13}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'search/s':>10}")
+    for r in results:
+        print(f"{r['label']:<18}{r['connections']:>12}{r['connections_per_search']:>13.2f}"
+              f"{r['mean_ms']:>10.1f}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['throughput']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+MedicalAnalyzer 개체 추출 벤치마크
+
+한국어/영어가 섞인 실제 질의 형태의 입력으로 기존 방식(호출마다 정규식 재컴파일 +
+사전 항목별 부분 문자열 검사)과 미리 컴파일한 단일 스캔 엔진(EntityEngine)의
+호출당 처리 시간을 비교하고, 두 방식의 추출 결과가 같은지 확인합니다.
+질의마다 스캔 결과 캐시를 비워, 질의 하나를 처음 분석하는 비용을 측정합니다.
+이어서 사전 크기를 늘려 가며 용어별 부분 문자열 검사와 Aho-Corasick 스캔을 비교합니다.
+
+    python bench_medical_analyzer.py --repeat 200 --vocab-sizes 100 10000 50000
+"""
+
+import argparse
+import random
+import re
+import time
+from typing import List
+
+from entity_engine import EntityEngine
+from medical_analyzer import (
+    CA125_VALUE_PATTERNS, ENGLISH_MEDICAL_TERMS, KOREAN_LAB_NAMES, MEDICAL_VOCABULARY,
+    SPECIAL_DISEASE_PATTERNS, SPECIAL_LAB_KEYS, TREATMENT_KEYWORDS, TUMOR_MARKERS,
+    MedicalAnalyzer, MedicalEntity
+)
+
+QUERIES = [
+    "파킨슨병 치료법",
+    "CRP 수치 12.5",
+    "HbA1c 7.8 당뇨병",
+    "혈압 180/120",
+    "콜레스테롤 250",
+    "CA-125 수치가 85 U/mL로 나왔는데 난소암 가능성이 있나요?",
+    "spinal cord stimulation 효능과 만성통증 개선 효과",
+    "SCS 치료 후 신경병증 통증 변화",
+    "Deep brain stimulation outcome in Parkinson Disease patients",
+    "당화혈색소 8.2, 혈당 210, 고혈압 약 복용 중인데 신장 기능 검사 creatinine 1.6",
+    "LDL cholesterol 190 HDL cholesterol 35 triglycerides 300 고지혈증 약물 치료",
+    "ALT 85 AST 70 간염 의심, 간 초음파 검사 결과",
+    "CEA와 AFP 종양 표지자 검사, 대장암 수술 후 추적 관찰",
+    "Chronic pain management with neurostimulation therapy and medication",
+    "두통과 편두통, 목통증이 계속되는데 진단과 치료 방법",
+    "WBC 12000 발열 기침 폐렴 감염 염증 수치 CRP 45",
+    "유방암 환자 임상 시험 결과와 효과",
+    "Hemoglobin 9.5 빈혈, iron therapy efficacy",
+    "TSH 6.2 갑상선 기능 저하증 증상",
+    "혈압 150/95 와 140/90 측정, 심부전 위험",
+]
+
+
+class LegacyMedicalAnalyzer(MedicalAnalyzer):
+    """EntityEngine 도입 전과 같은 방식으로 추출하는 분석기 (비교용)"""
+
+    def analyze_input(self, text: str) -> List[MedicalEntity]:
+        entities = []
+        entities.extend(self._extract_lab_values(text))
+        entities.extend(self._extract_diseases(text))
+        entities.extend(self._extract_treatments(text))
+
+        for match in re.findall(r'(\d{2,3})/(\d{2,3})', text):
+            systolic, diastolic = int(match[0]), int(match[1])
+            if 80 <= systolic <= 250 and 40 <= diastolic <= 150:
+                entities.append(MedicalEntity(
+                    text=f"{systolic}/{diastolic}", entity_type='test', value=systolic,
+                    unit='mmHg', normal_range=self.lab_values['bp']['normal']
+                ))
+        return entities
+
+    def _extract_lab_values(self, text: str) -> List[MedicalEntity]:
+        entities = []
+        ca125_found = False
+        for pattern in CA125_VALUE_PATTERNS:
+            for match in re.findall(pattern, text.lower()):
+                value = float(match)
+                entities.append(MedicalEntity(
+                    text=f"CA-125 {value}", entity_type='test', value=value,
+                    unit='U/mL', normal_range=self.lab_values['ca125']['normal']
+                ))
+                ca125_found = True
+
+        if not ca125_found:
+            for pattern in [r'ca\s*-?\s*125', r'ca125', r'ca\s+125']:
+                if re.search(pattern, text.lower()):
+                    entities.append(MedicalEntity(
+                        text="CA-125", entity_type='test', value=None,
+                        unit='U/mL', normal_range=self.lab_values['ca125']['normal']
+                    ))
+                    break
+
+        for marker_key, patterns in TUMOR_MARKERS.items():
+            if any(pattern in text.lower() for pattern in patterns):
+                entities.append(MedicalEntity(
+                    text=self.lab_values[marker_key]['name'], entity_type='test', value=None,
+                    unit=self._extract_unit_from_normal_range(self.lab_values[marker_key]['normal']),
+                    normal_range=self.lab_values[marker_key]['normal']
+                ))
+                break
+
+        for test_key, test_info in self.lab_values.items():
+            if test_key in SPECIAL_LAB_KEYS:
+                continue
+            patterns = [
+                rf'{test_key}\s*:?\s*(\d+\.?\d*)',
+                rf'{test_info["name"].lower()}\s*:?\s*(\d+\.?\d*)',
+            ]
+            if test_key in KOREAN_LAB_NAMES:
+                patterns.append(rf'{KOREAN_LAB_NAMES[test_key]}\s*:?\s*(\d+\.?\d*)')
+
+            for pattern in patterns:
+                for match in re.findall(pattern, text.lower()):
+                    value = float(match)
+                    entities.append(MedicalEntity(
+                        text=f"{test_key.upper()} {value}", entity_type='test', value=value,
+                        unit=self._extract_unit_from_normal_range(test_info['normal']),
+                        normal_range=test_info['normal']
+                    ))
+        return entities
+
+    def _extract_diseases(self, text: str) -> List[MedicalEntity]:
+        entities = []
+        text_lower = text.lower()
+        for korean_pattern in SPECIAL_DISEASE_PATTERNS:
+            if korean_pattern in text:
+                entities.append(MedicalEntity(text=korean_pattern, entity_type='disease'))
+                break
+
+        for korean_disease, english_disease in self.diseases.items():
+            if korean_disease in text and korean_disease not in [e.text for e in entities]:
+                entities.append(MedicalEntity(text=korean_disease, entity_type='disease'))
+            elif english_disease.lower() in text_lower and english_disease not in [e.text for e in entities]:
+                entities.append(MedicalEntity(text=english_disease, entity_type='disease'))
+        return entities
+
+    def _extract_treatments(self, text: str) -> List[MedicalEntity]:
+        text_lower = text.lower()
+        return [
+            MedicalEntity(text=keyword, entity_type=entity_type)
+            for keyword, entity_type in TREATMENT_KEYWORDS.items()
+            if keyword in text_lower
+        ]
+
+    def _extract_medical_terms(self, text: str) -> List[str]:
+        text_lower = text.lower()
+        if 'spinal cord stimulation' in text_lower:
+            return ['spinal cord stimulation', 'chronic pain', 'neuropathic pain', 'pain management']
+        if 'scs' in text_lower and ('치료' in text_lower or '효능' in text_lower):
+            return ['spinal cord stimulation', 'chronic pain', 'neuropathic pain']
+        if '척수자극술' in text_lower:
+            return ['spinal cord stimulation', 'chronic pain', 'neuropathic pain']
+        if 'deep brain stimulation' in text_lower or 'dbs' in text_lower:
+            return ['deep brain stimulation', 'parkinson disease', 'movement disorder']
+        if 'neurostimulation' in text_lower or '신경자극술' in text_lower:
+            return ['neurostimulation', 'chronic pain', 'neuropathic pain']
+
+        medical_terms = [english for korean, english in MEDICAL_VOCABULARY.items() if korean in text_lower]
+        for term in ENGLISH_MEDICAL_TERMS:
+            if term in text_lower and term not in medical_terms:
+                medical_terms.append(term)
+        return list(set(medical_terms))
+
+
+def run(analyzer: MedicalAnalyzer, repeat: int) -> float:
+    """질의 하나당 평균 처리 시간(마이크로초): 개체 추출 + 검색어 생성"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in QUERIES:
+            analyzer._scan.cache_clear()
+            analyzer.generate_search_query(analyzer.analyze_input(query), query)
+    return (time.perf_counter() - start) / (repeat * len(QUERIES)) * 1e6
+
+
+def build_vocabulary(size: int) -> List[str]:
+    """한글 음절을 조합한 가상 용어 (KCD/MeSH 한국어 용어 목록 크기 흉내)"""
+    rng = random.Random(size)
+    syllables = [chr(code) for code in range(0xAC00, 0xAC00 + 400)]
+    vocabulary = set(MEDICAL_VOCABULARY)
+    while len(vocabulary) < size:
+        vocabulary.add(''.join(rng.choice(syllables) for _ in range(rng.randint(2, 6))))
+    return sorted(vocabulary)
+
+
+def bench_vocabulary(sizes: List[int], repeat: int):
+    """사전 크기별 질의당 용어 검색 시간(마이크로초): 용어별 `in` 검사 vs 오토마톤 스캔"""
+    print()
+    print(f"{'terms':>9}{'in-check µs':>15}{'automaton µs':>15}{'speedup':>12}")
+    repeat = max(1, repeat // 10)
+
+    for size in sizes:
+        vocabulary = build_vocabulary(size)
+        engine = EntityEngine([], {'vocabulary': vocabulary})
+
+        for query in QUERIES:
+            lower = query.lower()
+            assert engine.scan(query).found('vocabulary') == {term for term in vocabulary if term in lower}
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for query in QUERIES:
+                lower = query.lower()
+                [term for term in vocabulary if term in lower]
+        in_check_us = (time.perf_counter() - start) / (repeat * len(QUERIES)) * 1e6
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for query in QUERIES:
+                engine.scan(query)
+        automaton_us = (time.perf_counter() - start) / (repeat * len(QUERIES)) * 1e6
+
+        print(f"{size:>9}{in_check_us:>15.1f}{automaton_us:>15.1f}{in_check_us / automaton_us:>11.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MedicalAnalyzer 개체 추출 벤치마크")
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--vocab-sizes', type=int, nargs='+', default=[100, 10000, 50000])
+    args = parser.parse_args()
+
+    legacy = LegacyMedicalAnalyzer()
+    engine = MedicalAnalyzer()
+
+    for query in QUERIES:
+        assert engine.analyze_input(query) == legacy.analyze_input(query), query
+        assert sorted(engine._extract_medical_terms(query)) == sorted(legacy._extract_medical_terms(query)), query
+        assert (engine.generate_search_query(engine.analyze_input(query), query)
+                == legacy.generate_search_query(legacy.analyze_input(query), query)), query
+
+    # 워밍업 (re 모듈 내부 패턴 캐시 등)
+    run(legacy, 5)
+    run(engine, 5)
+
+    legacy_us = run(legacy, args.repeat)
+    engine_us = run(engine, args.repeat)
+
+    print("🧪 MedicalAnalyzer 개체 추출 벤치마크")
+    print("=" * 48)
+    print(f"{'queries':>9}{'legacy µs':>13}{'engine µs':>13}{'speedup':>12}")
+    print(f"{len(QUERIES):>9}{legacy_us:>13.1f}{engine_us:>13.1f}{legacy_us / engine_us:>11.2f}x")
+
+    bench_vocabulary(args.vocab_sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
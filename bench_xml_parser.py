@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+efetch XML 파서 벤치마크
+
+fixtures/efetch_sample.xml의 논문들을 복제해 수 MB 크기의 efetch 응답을 만들고,
+기존 방식(ET.fromstring + './/' 하위 탐색)과 스트리밍 파서(PaperXMLStreamParser)의
+처리 시간과 최대 메모리 사용량을 배치 크기별로 비교합니다.
+
+    python bench_xml_parser.py --sizes 10 1000 10000
+"""
+
+import argparse
+import os
+import re
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+from pubmed_search import iter_papers_xml
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'efetch_sample.xml')
+
+
+def legacy_parse(xml_content: bytes) -> list:
+    """스트리밍 파서 도입 전 PubMedSearcher._parse_paper_xml과 동일한 방식"""
+    papers = []
+    root = ET.fromstring(xml_content)
+
+    for article in root.findall('.//PubmedArticle'):
+        paper = {}
+        pmid_elem = article.find('.//PMID')
+        paper['pmid'] = pmid_elem.text if pmid_elem is not None else ''
+        title_elem = article.find('.//ArticleTitle')
+        paper['title'] = title_elem.text if title_elem is not None else ''
+
+        abstract_parts = []
+        for abs_elem in article.findall('.//AbstractText'):
+            if abs_elem.text:
+                label = abs_elem.get('Label', '')
+                abstract_parts.append(f"{label}: {abs_elem.text}" if label else abs_elem.text)
+        paper['abstract'] = ' '.join(abstract_parts)
+
+        authors = []
+        for author in article.findall('.//Author'):
+            lastname = author.find('LastName')
+            firstname = author.find('ForeName')
+            if lastname is not None and firstname is not None:
+                authors.append(f"{firstname.text} {lastname.text}")
+        paper['authors'] = authors
+
+        journal_elem = article.find('.//Journal/Title')
+        paper['journal'] = journal_elem.text if journal_elem is not None else ''
+
+        pub_date = article.find('.//PubDate')
+        if pub_date is not None:
+            parts = [p.text for p in (pub_date.find('Year'), pub_date.find('Month'), pub_date.find('Day')) if p is not None]
+            paper['publication_date'] = '-'.join(parts)
+        else:
+            paper['publication_date'] = ''
+
+        doi_elem = article.find('.//ELocationID[@EIdType="doi"]')
+        paper['doi'] = doi_elem.text if doi_elem is not None else ''
+        paper['pubmed_url'] = f"https://pubmed.ncbi.nlm.nih.gov/{paper['pmid']}/"
+        papers.append(paper)
+
+    return papers
+
+
+def build_efetch_document(article_count: int) -> bytes:
+    """픽스처의 PubmedArticle을 PMID만 바꿔 article_count개로 복제"""
+    with open(FIXTURE_PATH, 'rb') as f:
+        fixture = f.read().decode('utf-8')
+
+    articles = re.findall(r'<PubmedArticle>.*?</PubmedArticle>', fixture, re.S)
+    body = []
+    for i in range(article_count):
+        template = articles[i % len(articles)]
+        body.append(re.sub(r'<PMID Version="1">\d+</PMID>', f'<PMID Version="1">{40000000 + i}</PMID>', template, count=1))
+
+    return ('<?xml version="1.0" ?>\n<PubmedArticleSet>\n' + '\n'.join(body) + '\n</PubmedArticleSet>\n').encode('utf-8')
+
+
+def measure(func) -> tuple:
+    """(결과, 소요 시간(초), 최대 메모리(바이트)) 반환"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="efetch XML 파서 벤치마크")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 10000])
+    args = parser.parse_args()
+
+    print("🧪 efetch XML 파서 벤치마크")
+    print("=" * 84)
+    print(f"{'articles':>9}{'size MB':>9}{'legacy s':>11}{'legacy MB':>11}{'stream s':>11}{'stream MB':>11}{'speedup':>10}{'mem ratio':>11}")
+
+    for size in args.sizes:
+        document = build_efetch_document(size)
+        with tempfile.NamedTemporaryFile(suffix='.xml', delete=False) as f:
+            f.write(document)
+            path = f.name
+
+        try:
+            def run_legacy():
+                with open(path, 'rb') as fh:
+                    return legacy_parse(fh.read())
+
+            def run_stream():
+                # 논문을 하나씩 처리하고 버리는 소비자 (저장소 적재 등과 같은 패턴)
+                count = 0
+                with open(path, 'rb') as fh:
+                    for _ in iter_papers_xml(fh):
+                        count += 1
+                return count
+
+            legacy_papers, legacy_time, legacy_peak = measure(run_legacy)
+            stream_count, stream_time, stream_peak = measure(run_stream)
+            assert len(legacy_papers) == stream_count == size
+
+            with open(path, 'rb') as fh:
+                assert list(iter_papers_xml(fh)) == legacy_papers
+        finally:
+            os.unlink(path)
+
+        print(f"{size:>9}{len(document) / 1e6:>9.2f}{legacy_time:>11.3f}{legacy_peak / 1e6:>11.2f}"
+              f"{stream_time:>11.3f}{stream_peak / 1e6:>11.2f}{legacy_time / stream_time:>9.2f}x"
+              f"{legacy_peak / stream_peak:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,18 +6,111 @@ load_dotenv()
 class Config:
     # OpenAI 설정
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+    OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "")  # 비우면 기본 OpenAI API, 로컬 대역 서버는 http://127.0.0.1:8765/v1
+    
+    # 논문별 요약 동시 실행 수와 요약 요청당 제한 시간(초)
+    SUMMARY_MAX_CONCURRENCY = int(os.getenv("SUMMARY_MAX_CONCURRENCY", "5"))
+    SUMMARY_TIMEOUT = float(os.getenv("SUMMARY_TIMEOUT", "30"))
+    
+    # LLM 요약 캐시 설정 (메모리 LRU + SQLite)
+    SUMMARY_CACHE_ENABLED = os.getenv("SUMMARY_CACHE_ENABLED", "true").lower() == "true"
+    SUMMARY_CACHE_PATH = os.getenv("SUMMARY_CACHE_PATH", "data/summaries.db")
+    SUMMARY_CACHE_MEMORY_SIZE = int(os.getenv("SUMMARY_CACHE_MEMORY_SIZE", "1024"))
+    SUMMARY_CACHE_TTL = float(os.getenv("SUMMARY_CACHE_TTL", str(30 * 24 * 3600)))  # 초 단위, 0이면 만료 없음
+    SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "100000"))  # 0이면 제한 없음
+    
+    # 검색 결과 캐시 설정 (메모리 LRU + 공유 저장소: sqlite/redis/memory)
+    RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+    RESULT_CACHE_BACKEND = os.getenv("RESULT_CACHE_BACKEND", "sqlite").lower()  # redis는 redis 패키지 필요
+    RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", "data/results.db")
+    RESULT_CACHE_REDIS_URL = os.getenv("RESULT_CACHE_REDIS_URL", "redis://127.0.0.1:6379/0")
+    RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "3600"))  # 초 단위, 0이면 만료 없음
+    RESULT_CACHE_MEMORY_SIZE = int(os.getenv("RESULT_CACHE_MEMORY_SIZE", "256"))  # 워커별 메모리 LRU 항목 수
+    RESULT_CACHE_MEMORY_BYTES = int(os.getenv("RESULT_CACHE_MEMORY_BYTES", str(64 * 1024 * 1024)))  # 0이면 제한 없음
+    RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "10000"))  # sqlite 기준, 0이면 제한 없음
     
     # PubMed API 설정
     PUBMED_EMAIL = os.getenv("PUBMED_EMAIL", "your_email@example.com")
     PUBMED_TOOL_NAME = os.getenv("PUBMED_TOOL_NAME", "PubMedSearchApp")
     
+    # PubMed HTTP 연결 풀 설정
+    PUBMED_POOL_SIZE = int(os.getenv("PUBMED_POOL_SIZE", "10"))
+    PUBMED_CONNECT_TIMEOUT = float(os.getenv("PUBMED_CONNECT_TIMEOUT", "5"))
+    PUBMED_READ_TIMEOUT = float(os.getenv("PUBMED_READ_TIMEOUT", "30"))
+    PUBMED_KEEP_ALIVE = os.getenv("PUBMED_KEEP_ALIVE", "true").lower() == "true"
+    
+    # NCBI API 키 (있으면 초당 10회, 없으면 3회까지 허용)
+    PUBMED_API_KEY = os.getenv("PUBMED_API_KEY", "")
+    
+    # E-utilities 호출 제한 및 히스토리 서버(WebEnv) 배치 설정
+    # PUBMED_REQUESTS_PER_SECOND 미설정 시 API 키 유무로 결정, 0이면 제한 해제
+    PUBMED_REQUESTS_PER_SECOND = float(os.getenv("PUBMED_REQUESTS_PER_SECOND")) if os.getenv("PUBMED_REQUESTS_PER_SECOND") else None
+    PUBMED_RATE_LIMIT_BURST = float(os.getenv("PUBMED_RATE_LIMIT_BURST", "1"))
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")  # memory | file (워커 프로세스 간 공유)
+    RATE_LIMIT_FILE = os.getenv("RATE_LIMIT_FILE", "data/ncbi_rate_limit.state")
+    PUBMED_HISTORY_BATCH_SIZE = int(os.getenv("PUBMED_HISTORY_BATCH_SIZE", "500"))
+    PUBMED_MAX_PARALLEL_FETCHES = int(os.getenv("PUBMED_MAX_PARALLEL_FETCHES", "3"))
+    PUBMED_LINK_BATCH_SIZE = int(os.getenv("PUBMED_LINK_BATCH_SIZE", "100"))  # ELink 한 요청에 넣는 PMID 수
+    
+    # E-utilities 재시도(지수 백오프) 및 서킷 브레이커 설정
+    PUBMED_MAX_RETRIES = int(os.getenv("PUBMED_MAX_RETRIES", "3"))
+    PUBMED_BACKOFF_BASE = float(os.getenv("PUBMED_BACKOFF_BASE", "0.5"))
+    PUBMED_BACKOFF_MAX = float(os.getenv("PUBMED_BACKOFF_MAX", "8"))
+    PUBMED_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("PUBMED_CIRCUIT_FAILURE_THRESHOLD", "5"))
+    PUBMED_CIRCUIT_RECOVERY_TIMEOUT = float(os.getenv("PUBMED_CIRCUIT_RECOVERY_TIMEOUT", "30"))
+    
+    # 논문 로컬 저장소(PMID 캐시) 설정
+    ARTICLE_CACHE_ENABLED = os.getenv("ARTICLE_CACHE_ENABLED", "true").lower() == "true"
+    ARTICLE_CACHE_PATH = os.getenv("ARTICLE_CACHE_PATH", "data/articles.db")
+    ARTICLE_CACHE_TTL = float(os.getenv("ARTICLE_CACHE_TTL", str(30 * 24 * 3600)))  # 초 단위, 0이면 만료 없음
+    ARTICLE_CACHE_MAX_ENTRIES = int(os.getenv("ARTICLE_CACHE_MAX_ENTRIES", "200000"))  # 0이면 제한 없음
+    # SQLite 캐시 정리 주기: 만료/초과 항목 정리는 N초마다(또는 개수 초과 시), 조회 시각(accessed_at)은 N초가 지난 항목만 갱신
+    CACHE_EVICT_INTERVAL = float(os.getenv("CACHE_EVICT_INTERVAL", "60"))
+    CACHE_TOUCH_INTERVAL = float(os.getenv("CACHE_TOUCH_INTERVAL", "600"))
+    
+    # 논문 BM25 역색인 설정 (재정렬 + 반복 주제 로컬 응답)
+    SEARCH_INDEX_ENABLED = os.getenv("SEARCH_INDEX_ENABLED", "true").lower() == "true"
+    SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH", "data/search_index.db")
+    SEARCH_INDEX_TITLE_WEIGHT = float(os.getenv("SEARCH_INDEX_TITLE_WEIGHT", "2.0"))
+    SEARCH_INDEX_ABSTRACT_WEIGHT = float(os.getenv("SEARCH_INDEX_ABSTRACT_WEIGHT", "1.0"))
+    SEARCH_INDEX_BM25_K1 = float(os.getenv("SEARCH_INDEX_BM25_K1", "1.2"))
+    SEARCH_INDEX_BM25_B = float(os.getenv("SEARCH_INDEX_BM25_B", "0.75"))
+    SEARCH_INDEX_TOPIC_TTL = float(os.getenv("SEARCH_INDEX_TOPIC_TTL", str(24 * 3600)))  # 초 단위, 0이면 만료 없음
+    SEARCH_INDEX_COMPACT_INTERVAL = int(os.getenv("SEARCH_INDEX_COMPACT_INTERVAL", "64"))  # 색인 묶음 수마다 백그라운드 압축, 0이면 자동 압축 안 함
+    SEARCH_INDEX_RERANK_WEIGHT = float(os.getenv("SEARCH_INDEX_RERANK_WEIGHT", "0.5"))  # 관련성 점수에 더하는 BM25(0~1 정규화) 비중
+    
+    # 유사 논문 벡터 색인 (TF-IDF → SVD 벡터 + LSH 근사 최근접 이웃, python vector_index.py build로 생성)
+    VECTOR_INDEX_ENABLED = os.getenv("VECTOR_INDEX_ENABLED", "true").lower() == "true"
+    VECTOR_INDEX_PATH = os.getenv("VECTOR_INDEX_PATH", "data/vectors")
+    VECTOR_INDEX_DIM = int(os.getenv("VECTOR_INDEX_DIM", "128"))
+    VECTOR_INDEX_VOCABULARY_SIZE = int(os.getenv("VECTOR_INDEX_VOCABULARY_SIZE", "50000"))
+    VECTOR_INDEX_MIN_DF = int(os.getenv("VECTOR_INDEX_MIN_DF", "2"))
+    VECTOR_INDEX_FIT_SAMPLE = int(os.getenv("VECTOR_INDEX_FIT_SAMPLE", "20000"))  # SVD 학습에 쓰는 논문 수
+    VECTOR_INDEX_LSH_TABLES = int(os.getenv("VECTOR_INDEX_LSH_TABLES", "8"))
+    VECTOR_INDEX_LSH_BITS = int(os.getenv("VECTOR_INDEX_LSH_BITS", "12"))
+    VECTOR_INDEX_EXACT_THRESHOLD = int(os.getenv("VECTOR_INDEX_EXACT_THRESHOLD", "20000"))  # 이하면 LSH 없이 전체 비교
+    
+    # baseline 일괄 적재 / 오프라인 모드 (로컬 미러로 쓸 때는 ARTICLE_CACHE_MAX_ENTRIES=0 권장)
+    PUBMED_OFFLINE = os.getenv("PUBMED_OFFLINE", "false").lower() == "true"  # E-utilities 대신 로컬 저장소/색인에서만 응답
+    INGEST_LOG_PATH = os.getenv("INGEST_LOG_PATH", "data/ingest.db")
+    INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(os.cpu_count() or 1)))
+    INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "1000"))  # 워커가 한 번에 메모리에 올리는 논문 수
+    INGEST_TASKS_PER_WORKER = int(os.getenv("INGEST_TASKS_PER_WORKER", "4"))  # 워커 프로세스를 새로 띄우기 전까지 처리할 파일 수
+    
+    # 요청 프로파일링 (켜면 X-Profile: cprofile|pyinstrument 헤더를 준 요청의 프로파일을 응답으로 반환)
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "40"))  # cProfile 보고서에 넣을 함수 수
+    
     # 앱 설정
     MAX_PAPERS = int(os.getenv("MAX_PAPERS", "10"))
     DEFAULT_LANGUAGE = os.getenv("DEFAULT_LANGUAGE", "ko")
     
-    # PubMed API URL
-    PUBMED_SEARCH_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
-    PUBMED_FETCH_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
-    PUBMED_SUMMARY_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi"
+    # PubMed API URL (로컬 대역 서버 mock_eutils.py를 쓰려면 PUBMED_EUTILS_BASE_URL을 바꿈)
+    PUBMED_EUTILS_BASE_URL = os.getenv("PUBMED_EUTILS_BASE_URL", "https://eutils.ncbi.nlm.nih.gov/entrez/eutils").rstrip("/")
+    PUBMED_SEARCH_URL = os.getenv("PUBMED_SEARCH_URL", f"{PUBMED_EUTILS_BASE_URL}/esearch.fcgi")
+    PUBMED_FETCH_URL = os.getenv("PUBMED_FETCH_URL", f"{PUBMED_EUTILS_BASE_URL}/efetch.fcgi")
+    PUBMED_SUMMARY_URL = os.getenv("PUBMED_SUMMARY_URL", f"{PUBMED_EUTILS_BASE_URL}/esummary.fcgi")
+    PUBMED_LINK_URL = os.getenv("PUBMED_LINK_URL", f"{PUBMED_EUTILS_BASE_URL}/elink.fcgi")
 
 config = Config() 
\ No newline at end of file
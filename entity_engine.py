@@ -0,0 +1,96 @@
+import re
+from typing import Dict, Hashable, Iterable, List, Mapping, Set, Tuple
+from aho_corasick import AhoCorasick
+
+class ScanResult:
+    """EntityEngine.scan 결과"""
+
+    def __init__(self):
+        # 값 패턴 키 → 매치 목록 (re.findall처럼 왼쪽부터 겹치지 않게)
+        self.values: Dict[Hashable, List[re.Match]] = {}
+        # 사전 용어 출현 위치 (시작, 끝, 용어, 종류) - 끝 위치 순서
+        self.spans: List[Tuple[int, int, str, Hashable]] = []
+        # 종류 → 나타난 용어 집합
+        self.kinds: Dict[Hashable, Set[str]] = {}
+
+    def found(self, kind: Hashable) -> Set[str]:
+        """해당 종류로 나타난 용어 집합"""
+        return self.kinds.get(kind, set())
+
+
+class EntityEngine:
+    """값 패턴(정규식)과 사전 용어를 미리 컴파일해 두고 텍스트를 한 번만 훑어 찾는 엔진
+
+    사전 용어는 종류별 어휘(vocabularies)로 받아 하나의 Aho-Corasick 오토마톤으로 만들고,
+    텍스트를 한 글자씩 읽으며 오토마톤을 진행하는 동시에 그 글자로 시작하는 값 패턴을 확인합니다.
+    첫 글자가 고정되지 않은 값 패턴만 따로 한 번씩 검색합니다.
+    용어는 소문자로 등록해야 하며 소문자로 바꾼 텍스트에서 찾습니다.
+    exact_kinds에 속한 종류는 원문에도 대소문자까지 그대로 나타나야 찾은 것으로 봅니다.
+    """
+
+    def __init__(self, value_patterns: Iterable[Tuple[Hashable, str]],
+                 vocabularies: Mapping[Hashable, Iterable[str]], exact_kinds: Iterable[Hashable] = ()):
+        self.exact_kinds = frozenset(exact_kinds)
+
+        # 첫 글자가 고정된 패턴은 그 글자 위치에서만 시도
+        self._patterns_by_char: Dict[str, List[Tuple[Hashable, re.Pattern]]] = {}
+        self._anywhere_patterns: List[Tuple[Hashable, re.Pattern]] = []
+        for key, pattern in value_patterns:
+            compiled = (key, re.compile(pattern))
+            if pattern[0].isalnum():
+                self._patterns_by_char.setdefault(pattern[0], []).append(compiled)
+            else:
+                self._anywhere_patterns.append(compiled)
+
+        self._automaton = AhoCorasick()
+        for kind, terms in vocabularies.items():
+            for term in terms:
+                if term != term.lower():
+                    raise ValueError(f"용어는 소문자여야 합니다: {term!r}")
+                self._automaton.add(term, kind)
+        self._automaton.build()
+
+    def scan(self, text: str) -> ScanResult:
+        """텍스트에서 값 패턴 매치와 사전 용어를 한 번에 찾음"""
+        result = ScanResult()
+        lower = text.lower()
+        # lower()로 길이가 바뀌는 드문 문자가 있으면 원문 위치를 맞출 수 없으므로 exact 용어는 따로 확인
+        aligned = len(lower) == len(text)
+        last_end: Dict[Hashable, int] = {}
+
+        goto, fail, output = self._automaton._goto, self._automaton._fail, self._automaton._output
+        patterns_by_char = self._patterns_by_char
+        state = 0
+
+        for pos, char in enumerate(lower):
+            patterns = patterns_by_char.get(char)
+            if patterns:
+                for key, pattern in patterns:
+                    if pos < last_end.get(key, 0):
+                        continue
+                    match = pattern.match(lower, pos)
+                    if match:
+                        result.values.setdefault(key, []).append(match)
+                        last_end[key] = max(match.end(), pos + 1)
+
+            # 오토마톤 진행 (AhoCorasick.finditer와 같은 전이를 값 패턴 확인과 한 루프에서 수행)
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for term, kind in output[state]:
+                start = pos + 1 - len(term)
+                if kind in self.exact_kinds:
+                    if aligned:
+                        if not text.startswith(term, start):
+                            continue
+                    elif term not in text:
+                        continue
+                result.spans.append((start, pos + 1, term, kind))
+                result.kinds.setdefault(kind, set()).add(term)
+
+        for key, pattern in self._anywhere_patterns:
+            matches = list(pattern.finditer(lower))
+            if matches:
+                result.values[key] = matches
+
+        return result
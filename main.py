@@ -1,18 +1,48 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+from contextlib import asynccontextmanager
+from config import config
 from medical_search_service import MedicalSearchService
+from pubmed_search import PubMedError, PubMedTimeoutError, PubMedUnavailableError
+import json
+import math
+import time
+import tracing
 import uvicorn
 
+# 서비스 초기화
+service = MedicalSearchService()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """앱 종료 시 비동기 연결 풀 정리"""
+    yield
+    await service.aclose()
+
+def pubmed_http_exception(error: PubMedError) -> HTTPException:
+    """PubMed 오류를 HTTP 응답으로 변환 (서킷 open: 503, 타임아웃: 504, 그 외: 502)"""
+    if isinstance(error, PubMedUnavailableError):
+        return HTTPException(
+            status_code=503,
+            detail=str(error),
+            headers={"Retry-After": str(max(1, math.ceil(error.retry_after)))}
+        )
+    if isinstance(error, PubMedTimeoutError):
+        return HTTPException(status_code=504, detail=f"PubMed 응답 시간이 초과되었습니다: {str(error)}")
+    return HTTPException(status_code=502, detail=f"PubMed 요청에 실패했습니다: {str(error)}")
+
 # FastAPI 앱 초기화
 app = FastAPI(
     title="PubMed 의료 검색 API",
     description="질병명이나 검사 수치를 기반으로 PubMed 논문을 검색하고 요약하는 API",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS 설정
@@ -24,17 +54,70 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 서비스 초기화
-service = MedicalSearchService()
+@app.middleware("http")
+async def observe_requests(request: Request, call_next):
+    """요청 처리 시간을 /metrics 히스토그램에 기록하고, X-Profile 헤더가 있으면 프로파일 보고서로 응답"""
+    profile_mode = request.headers.get("x-profile", "").lower() if config.PROFILING_ENABLED else ""
+    if profile_mode in ("cprofile", "pyinstrument"):
+        return await profile_request(request, call_next, profile_mode)
+    
+    start = time.perf_counter()
+    tracing.REQUESTS.begin()
+    
+    def finish(status: int):
+        # 경로 변수(PMID 등)마다 시계열이 생기지 않도록 라우트 템플릿으로 기록
+        route = request.scope.get("route")
+        tracing.REQUESTS.end(request.method, getattr(route, "path", "unmatched"), status, time.perf_counter() - start)
+    
+    try:
+        response = await call_next(request)
+    except BaseException:
+        finish(500)
+        raise
+    
+    # 헤더를 돌려준 시점이 아니라 본문(SSE 스트림 포함)을 다 보낸 시점까지를 처리 시간으로 기록
+    body_iterator = response.body_iterator
+    
+    async def observed_body():
+        try:
+            async for chunk in body_iterator:
+                yield chunk
+        finally:
+            finish(response.status_code)
+    
+    response.body_iterator = observed_body()
+    return response
+
+async def profile_request(request: Request, call_next, mode: str) -> Response:
+    """요청 하나를 프로파일링하고 원래 응답 대신 보고서 반환 (스트리밍 응답도 끝까지 소비)"""
+    profiler = tracing.RequestProfiler(mode, top_n=config.PROFILE_TOP_N)
+    try:
+        profiler.start()
+    except RuntimeError as e:
+        return JSONResponse(status_code=409, content={"detail": str(e)})
+    
+    try:
+        response = await call_next(request)
+        async for _ in response.body_iterator:
+            pass
+    finally:
+        report, media_type = profiler.stop()
+    return Response(content=report, media_type=media_type,
+                    headers={"X-Profile-Mode": profiler.mode, "X-Profiled-Status": str(response.status_code)})
 
 # 요청 모델
 class SearchRequest(BaseModel):
     query: str
     max_results: Optional[int] = 10
+    include_spans: bool = False  # 단계/외부 호출별 소요 시간(spans)을 응답에 포함
 
 class PaperDetailRequest(BaseModel):
     pmid: str
 
+class RelatedPapersRequest(BaseModel):
+    pmids: List[str]
+    max_results: Optional[int] = 5
+
 # 응답 모델
 class EntityResponse(BaseModel):
     text: str
@@ -54,6 +137,7 @@ class PaperResponse(BaseModel):
     ai_summary: str
     original_abstract: str
     relevance_score: float
+    summary_fallback: bool = False
 
 class SearchResponse(BaseModel):
     user_input: str
@@ -63,7 +147,11 @@ class SearchResponse(BaseModel):
     papers: List[PaperResponse]
     total_papers_found: int
     overall_summary: str
+    overall_summary_fallback: bool = False
     processing_time: float
+    stage_timings: Dict[str, float] = {}
+    from_cache: bool = False
+    spans: Optional[List[Dict[str, Any]]] = None
     timestamp: str
 
 # API 엔드포인트
@@ -108,6 +196,14 @@ async def root():
                 </div>
             </div>
             
+            <div class="endpoint">
+                <span class="method">GET</span> <code>/search/stream</code> - 스트리밍 검색 (Server-Sent Events)
+                <div class="example">
+                    <strong>예시:</strong><br>
+                    <code>/search/stream?q=CRP 수치 12.5&max_results=5</code>
+                </div>
+            </div>
+            
             <div class="endpoint">
                 <span class="method">POST</span> <code>/paper-detail</code> - 특정 논문 상세 정보
                 <div class="example">
@@ -124,6 +220,22 @@ async def root():
                 </div>
             </div>
             
+            <div class="endpoint">
+                <span class="method">POST</span> <code>/related</code> - 여러 논문의 관련 논문 일괄 검색
+                <div class="example">
+                    <strong>예시 요청:</strong><br>
+                    <code>{"pmids": ["12345678", "23456789"], "max_results": 5}</code>
+                </div>
+            </div>
+            
+            <div class="endpoint">
+                <span class="method">GET</span> <code>/metrics</code> - 단계/외부 호출별 소요 시간 히스토그램 (Prometheus)
+                <div class="example">
+                    <strong>단계별 spans 포함:</strong><br>
+                    <code>/search?q=CRP 수치 12.5&spans=true</code>
+                </div>
+            </div>
+            
             <h2>📖 문서</h2>
             <p>
                 <a href="/docs" target="_blank">🔗 Swagger UI 문서</a><br>
@@ -156,33 +268,75 @@ async def root():
 async def search_papers(request: SearchRequest):
     """의료 논문 검색 (POST)"""
     try:
-        results = service.search_medical_papers(request.query, request.max_results)
+        results = await service.search_medical_papers_async(request.query, request.max_results,
+                                                            include_spans=request.include_spans)
         return SearchResponse(**results)
+    except PubMedError as e:
+        raise pubmed_http_exception(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"검색 중 오류가 발생했습니다: {str(e)}")
 
 @app.get("/search")
 async def search_papers_get(
     q: str = Query(..., description="검색 쿼리"),
-    max_results: int = Query(10, description="최대 결과 수", ge=1, le=50)
+    max_results: int = Query(10, description="최대 결과 수", ge=1, le=50),
+    spans: bool = Query(False, description="단계/외부 호출별 소요 시간 포함")
 ):
     """의료 논문 검색 (GET - 간단한 검색용)"""
     try:
-        results = service.search_medical_papers(q, max_results)
+        results = await service.search_medical_papers_async(q, max_results, include_spans=spans)
         return results
+    except PubMedError as e:
+        raise pubmed_http_exception(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"검색 중 오류가 발생했습니다: {str(e)}")
 
+def format_sse(event: str, data: dict) -> str:
+    """Server-Sent Events 메시지 형식으로 변환"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.get("/search/stream")
+async def search_papers_stream(
+    q: str = Query(..., description="검색 쿼리"),
+    max_results: int = Query(10, description="최대 결과 수", ge=1, le=50)
+):
+    """의료 논문 검색 (Server-Sent Events 스트리밍)
+    
+    분석 결과(analysis)를 바로 보내고, 이어서 논문(paper), 논문별 요약 토큰(summary_delta)과
+    완성된 요약(summary), 종합 요약 토큰(overall_summary_delta)과 완성된 종합 요약(overall_summary),
+    완료(done) 이벤트를 준비되는 대로 보냅니다. OpenAI 스트리밍이 중간에 끊기면 summary/overall_summary
+    이벤트의 incomplete가 true이고, 그때까지 받은 앞부분만 담깁니다. 첫 토큰 전에 실패해 기본 요약을
+    대신 보낸 경우는 summary_fallback/overall_summary_fallback이 true이고, done 이벤트에도 모아서 보냅니다.
+    """
+    async def event_stream():
+        try:
+            async for event, data in service.stream_medical_papers_async(q, max_results):
+                yield format_sse(event, data)
+        except PubMedError as e:
+            # 스트림 시작 후에는 상태 코드를 바꿀 수 없으므로 error 이벤트로 전달
+            error = pubmed_http_exception(e)
+            yield format_sse("error", {"status_code": error.status_code, "detail": error.detail})
+        except Exception as e:
+            yield format_sse("error", {"status_code": 500, "detail": f"검색 중 오류가 발생했습니다: {str(e)}"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.post("/paper-detail")
 async def get_paper_detail(request: PaperDetailRequest):
     """특정 논문의 상세 정보 조회"""
     try:
-        paper = service.get_paper_detail(request.pmid)
+        paper = await service.get_paper_detail_async(request.pmid)
         if not paper:
             raise HTTPException(status_code=404, detail="논문을 찾을 수 없습니다.")
         return paper
     except HTTPException:
         raise
+    except PubMedError as e:
+        raise pubmed_http_exception(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"논문 조회 중 오류가 발생했습니다: {str(e)}")
 
@@ -193,15 +347,37 @@ async def get_similar_papers(
 ):
     """특정 논문과 유사한 논문 검색"""
     try:
-        similar_papers = service.search_similar_papers(pmid, max_results)
+        similar_papers = await service.search_similar_papers_async(pmid, max_results)
         return {
             "pmid": pmid,
             "similar_papers": similar_papers,
             "count": len(similar_papers)
         }
+    except PubMedError as e:
+        raise pubmed_http_exception(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"유사 논문 검색 중 오류가 발생했습니다: {str(e)}")
 
+@app.post("/related")
+async def get_related_papers(request: RelatedPapersRequest):
+    """여러 논문의 관련 논문 일괄 검색 (ELink를 묶어서 요청)"""
+    if not request.pmids:
+        raise HTTPException(status_code=400, detail="PMID 목록이 비어 있습니다.")
+    if len(request.pmids) > 1000:
+        raise HTTPException(status_code=400, detail="한 번에 최대 1000개 PMID까지 요청할 수 있습니다.")
+    
+    try:
+        max_results = max(1, min(request.max_results or 5, 20))
+        related = await service.search_related_papers_async(request.pmids, max_results)
+        return {
+            "related": related,
+            "count": sum(len(papers) for papers in related.values())
+        }
+    except PubMedError as e:
+        raise pubmed_http_exception(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"관련 논문 검색 중 오류가 발생했습니다: {str(e)}")
+
 @app.get("/health")
 async def health_check():
     """헬스 체크 엔드포인트"""
@@ -211,24 +387,31 @@ async def health_check():
         "version": "1.0.0"
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus 형식 지표 (단계/외부 호출/HTTP 요청 소요 시간 히스토그램, 워커 프로세스 단위)"""
+    return PlainTextResponse(tracing.render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/stats")
 async def get_stats():
-    """API 통계 정보"""
+    """실시간 운영 통계 (이 워커 프로세스 기준)
+    
+    처리량(rps)과 엔드포인트/단계별 지연 분위수, NCBI/OpenAI 호출 수와 오류율,
+    캐시 적중률, 호출 제한 대기 시간, 진행 중인 요청 수를 반환합니다.
+    """
     return {
         "api_name": "PubMed 의료 검색 API",
         "version": "1.0.0",
-        "supported_entities": [
-            "검사 수치 (CRP, HbA1c, 혈압 등)",
-            "질병명 (당뇨병, 고혈압, 파킨슨병 등)",
-            "의료 용어"
-        ],
-        "features": [
-            "PubMed 논문 검색",
-            "의료 개체 인식",
-            "AI 기반 논문 요약",
-            "수치 해석",
-            "건강 팁 제공"
-        ]
+        "requests": tracing.REQUESTS.snapshot(),
+        "stages": tracing.span_stats("stage"),
+        "external": {
+            "ncbi": tracing.call_stats("ncbi"),
+            "openai": tracing.call_stats("openai"),
+            "parse": tracing.span_stats("parse"),
+            "rate_limit_wait": tracing.span_stats("wait")
+        },
+        # 캐시/색인 통계는 SQLite를 조회하므로 이벤트 루프 밖에서 실행
+        **(await run_in_threadpool(service.stats))
     }
 
 if __name__ == "__main__":
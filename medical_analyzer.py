@@ -1,6 +1,8 @@
 import re
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
+from functools import lru_cache
+from entity_engine import EntityEngine, ScanResult
 
 @dataclass
 class MedicalEntity:
@@ -10,6 +12,192 @@ class MedicalEntity:
     unit: Optional[str] = None
     normal_range: Optional[str] = None
 
+# CA-125 수치 패턴 (여러 패턴이 같은 표기를 중복으로 잡는 기존 동작 유지)
+CA125_VALUE_PATTERNS = [
+    r'ca\s*-?\s*125\s*:?\s*(\d+\.?\d*)',
+    r'ca125\s*:?\s*(\d+\.?\d*)',
+    r'ca\s+125\s*:?\s*(\d+\.?\d*)',
+]
+
+# CA-125 언급만 있는 경우 (수치 없음)
+CA125_MENTION_PATTERN = r'ca\s*-?\s*125'
+
+# 혈압 패턴 (수축기/이완기)
+BP_PATTERN = r'(\d{2,3})/(\d{2,3})'
+
+# 수치 없이도 인식하는 종양 표지자
+TUMOR_MARKERS = {
+    'cea': ['cea'],
+    'afp': ['afp', 'alpha fetoprotein'],
+    'psa': ['psa', 'prostate specific antigen'],
+    'ca19-9': ['ca 19-9', 'ca19-9', 'ca 19 9'],
+    'ca15-3': ['ca 15-3', 'ca15-3', 'ca 15 3'],
+    'beta-hcg': ['beta hcg', 'beta-hcg', 'bhcg'],
+    'ldh': ['ldh', 'lactate dehydrogenase']
+}
+
+# 일반 수치 패턴에서 제외하는 검사 (CA-125와 종양 표지자는 위에서 따로 처리)
+SPECIAL_LAB_KEYS = {'ca125', 'ca-125', 'ca 125', 'cea', 'afp', 'psa', 'ca19-9', 'ca15-3', 'beta-hcg', 'ldh'}
+
+# 한국어 검사명
+KOREAN_LAB_NAMES = {
+    'crp': 'c반응성단백',
+    'hba1c': '당화혈색소',
+    'glucose': '혈당',
+    'cholesterol': '콜레스테롤',
+    'bp': '혈압'
+}
+
+# 부분 매칭을 위한 질병 특별 패턴 (첫 번째로 매칭된 것만 사용)
+SPECIAL_DISEASE_PATTERNS = {
+    '파킨슨': 'parkinson disease',
+    '파킨슨병': 'parkinson disease',
+    '알츠하이머': 'alzheimer disease',
+    '치매': 'dementia',
+    '당뇨': 'diabetes mellitus',
+    '고혈압': 'hypertension',
+    '고지혈': 'hyperlipidemia',
+    '심근경색': 'myocardial infarction',
+    '뇌졸중': 'stroke',
+    '관절염': 'arthritis',
+    '천식': 'asthma',
+    '우울증': 'depression',
+    '불안': 'anxiety disorder',
+    '간염': 'hepatitis',
+    '신부전': 'renal failure',
+    '심부전': 'heart failure',
+    '골다공증': 'osteoporosis',
+    '난소암': 'ovarian cancer',
+    '유방암': 'breast cancer',
+    '폐암': 'lung cancer',
+    '대장암': 'colorectal cancer',
+    '위암': 'gastric cancer',
+    '간암': 'liver cancer',
+    '췌장암': 'pancreatic cancer',
+    '전립선암': 'prostate cancer'
+}
+
+# 치료/시술 관련 키워드
+TREATMENT_KEYWORDS = {
+    'spinal cord stimulation': 'treatment',
+    'scs': 'treatment', 
+    '척수자극술': 'treatment',
+    '신경자극술': 'treatment',
+    'neurostimulation': 'treatment',
+    'deep brain stimulation': 'treatment',
+    'dbs': 'treatment',
+    '심부뇌자극술': 'treatment',
+    'vagus nerve stimulation': 'treatment',
+    'vns': 'treatment',
+    '미주신경자극술': 'treatment',
+    'peripheral nerve stimulation': 'treatment',
+    'pns': 'treatment',
+    '말초신경자극술': 'treatment',
+    'tens': 'treatment',
+    '경피전기신경자극술': 'treatment',
+    '수술': 'treatment',
+    '시술': 'treatment',
+    '요법': 'treatment'
+}
+
+# 신경자극술 우선 처리용 용어 (_extract_medical_terms)
+NEUROSTIMULATION_TERMS = [
+    'spinal cord stimulation', 'scs', '척수자극술', 'deep brain stimulation', 'dbs',
+    'neurostimulation', '신경자극술', '치료', '효능'
+]
+
+# 일반적인 의료 용어들 (확장)
+MEDICAL_VOCABULARY = {
+    '치료': 'treatment',
+    '진단': 'diagnosis',
+    '증상': 'symptoms',
+    '환자': 'patient',
+    '임상': 'clinical',
+    '수술': 'surgery',
+    '시술': 'procedure',
+    '요법': 'therapy',
+    '약물': 'drug',
+    '투약': 'medication',
+    '처방': 'prescription',
+    '검사': 'examination',
+    '진료': 'medical care',
+    '병원': 'hospital',
+    '의료': 'medical',
+    '질환': 'disease',
+    '질병': 'disease',
+    '병증': 'syndrome',
+    '증후군': 'syndrome',
+    '장애': 'disorder',
+    '감염': 'infection',
+    '염증': 'inflammation',
+    '종양': 'tumor',
+    '암': 'cancer',
+    '통증': 'pain',
+    '아픔': 'pain',
+    '열': 'fever',
+    '기침': 'cough',
+    '호흡': 'breathing',
+    '심장': 'heart',
+    '혈압': 'blood pressure',
+    '혈당': 'blood glucose',
+    '콜레스테롤': 'cholesterol',
+    '간': 'liver',
+    '신장': 'kidney',
+    '폐': 'lung',
+    '뇌': 'brain',
+    '신경': 'nerve',
+    '근육': 'muscle',
+    '뼈': 'bone',
+    '관절': 'joint',
+    '피부': 'skin',
+    '혈액': 'blood',
+    '소변': 'urine',
+    '변': 'stool',
+    '체중': 'weight',
+    '비만': 'obesity',
+    '당뇨': 'diabetes',
+    '고혈압': 'hypertension',
+    '고지혈': 'hyperlipidemia',
+    '파킨슨': 'parkinson',
+    '알츠하이머': 'alzheimer',
+    
+    # 효능/효과 관련
+    '효능': 'efficacy',
+    '효과': 'effectiveness',
+    '결과': 'outcome',
+    '성과': 'result',
+    '반응': 'response',
+    '개선': 'improvement',
+    '완화': 'relief',
+    '감소': 'reduction',
+    '증가': 'increase',
+    '향상': 'enhancement',
+    
+    # 통증 관련 (spinal cord stimulation과 관련)
+    '만성통증': 'chronic pain',
+    '신경통': 'neuralgia',
+    '신경병증': 'neuropathy',
+    '요통': 'back pain',
+    '목통증': 'neck pain',
+    '두통': 'headache',
+    '편두통': 'migraine',
+    '관절통': 'joint pain',
+    '근육통': 'muscle pain',
+    '복통': 'abdominal pain',
+    '흉통': 'chest pain'
+}
+
+# 영어 의료 용어
+ENGLISH_MEDICAL_TERMS = [
+    'treatment', 'therapy', 'diagnosis', 'clinical', 'patient', 'surgery',
+    'medication', 'drug', 'procedure', 'examination', 'medical', 'disease',
+    'syndrome', 'disorder', 'infection', 'inflammation', 'tumor', 'cancer',
+    'pain', 'fever', 'chronic', 'acute', 'efficacy', 'effectiveness', 'outcome'
+]
+
+# 같은 입력에 대한 스캔 결과 캐시 크기 (analyze_input과 generate_search_query가 같은 스캔을 공유)
+SCAN_CACHE_SIZE = 256
+
 class MedicalAnalyzer:
     def __init__(self):
         # 주요 검사 항목과 정상 범위
@@ -161,11 +349,71 @@ class MedicalAnalyzer:
             '결과': 'outcome',
             '성과': 'outcome'
         }
+        
+        # 모든 패턴/사전을 한 번만 컴파일
+        self._build_engine()
+    
+    def _build_engine(self):
+        """검사 수치 패턴과 질병/치료/의료 용어 사전을 하나의 스캔 엔진으로 컴파일"""
+        value_patterns = [(('ca125', i), pattern) for i, pattern in enumerate(CA125_VALUE_PATTERNS)]
+        value_patterns.append(('ca125_mention', CA125_MENTION_PATTERN))
+        value_patterns.append(('bp', BP_PATTERN))
+        
+        # 검사별 (검사 키, 정보, 단위, 패턴 키 목록) - 기존과 같은 출력 순서를 위해 검사/패턴 순서 유지
+        self._lab_slots = []
+        for test_key, test_info in self.lab_values.items():
+            if test_key in SPECIAL_LAB_KEYS:
+                continue
+            
+            names = [test_key, test_info['name'].lower()]
+            if test_key in KOREAN_LAB_NAMES:
+                names.append(KOREAN_LAB_NAMES[test_key])
+            
+            slot_keys = []
+            for i, name in enumerate(names):
+                slot_key = ('lab', test_key, i)
+                value_patterns.append((slot_key, rf'{re.escape(name)}\s*:?\s*(\d+\.?\d*)'))
+                slot_keys.append(slot_key)
+            
+            unit = self._extract_unit_from_normal_range(test_info['normal'])
+            self._lab_slots.append((test_key, test_info, unit, slot_keys))
+        
+        # 종류별 어휘 (하나의 Aho-Corasick 오토마톤으로 컴파일)
+        # 질병명 사전은 원문 그대로(대소문자 구분) 비교하던 기존 동작 유지
+        vocabularies = {
+            'tumor_marker': [pattern for patterns in TUMOR_MARKERS.values() for pattern in patterns],
+            'special_disease': list(SPECIAL_DISEASE_PATTERNS),
+            'disease': list(self.diseases),
+            'disease_english': list(dict.fromkeys(english.lower() for english in self.diseases.values())),
+            'treatment': list(TREATMENT_KEYWORDS),
+            'vocabulary': list(MEDICAL_VOCABULARY),
+            'english_term': ENGLISH_MEDICAL_TERMS,
+            'neurostimulation': NEUROSTIMULATION_TERMS,
+        }
+        # 찾은 용어를 사전 등록 순서로 돌려주기 위한 순위 (사전 전체를 매번 순회하지 않도록)
+        self._term_rank = {
+            kind: {term: rank for rank, term in enumerate(terms)}
+            for kind, terms in vocabularies.items()
+        }
+        self._marker_by_term = {
+            pattern: marker_key for marker_key, patterns in TUMOR_MARKERS.items() for pattern in patterns
+        }
+        self._disease_items = list(self.diseases.items())
+        self._disease_indices = {}
+        for index, (korean_disease, english_disease) in enumerate(self._disease_items):
+            self._disease_indices.setdefault(korean_disease, []).append(index)
+            self._disease_indices.setdefault(english_disease.lower(), []).append(index)
+        
+        self._engine = EntityEngine(value_patterns, vocabularies, exact_kinds={'special_disease', 'disease'})
+        self._scan = lru_cache(maxsize=SCAN_CACHE_SIZE)(self._engine.scan)
+    
+    def _found_terms(self, scan: ScanResult, kind: str) -> List[str]:
+        """스캔에서 찾은 해당 종류의 용어를 사전 등록 순서로 반환"""
+        return sorted(scan.found(kind), key=self._term_rank[kind].__getitem__)
     
     def analyze_input(self, text: str) -> List[MedicalEntity]:
-        """입력 텍스트에서 의료 개체 추출"""
+        """입력 텍스트에서 의료 개체 추출 (모든 개체 유형을 한 번의 스캔 결과에서 추출)"""
         entities = []
-        text_lower = text.lower()
         
         # 검사 수치 패턴 분석
         entities.extend(self._extract_lab_values(text))
@@ -177,10 +425,8 @@ class MedicalAnalyzer:
         entities.extend(self._extract_treatments(text))
         
         # 혈압 패턴 (특별 처리)
-        bp_pattern = r'(\d{2,3})/(\d{2,3})'
-        bp_matches = re.findall(bp_pattern, text)
-        for match in bp_matches:
-            systolic, diastolic = int(match[0]), int(match[1])
+        for match in self._scan(text).values.get('bp', ()):
+            systolic, diastolic = int(match.group(1)), int(match.group(2))
             if 80 <= systolic <= 250 and 40 <= diastolic <= 150:  # 합리적인 혈압 범위
                 entities.append(MedicalEntity(
                     text=f"{systolic}/{diastolic}",
@@ -195,20 +441,14 @@ class MedicalAnalyzer:
     def _extract_lab_values(self, text: str) -> List[MedicalEntity]:
         """검사 수치 추출"""
         entities = []
+        scan = self._scan(text)
         
         # CA-125 특별 패턴 처리 (우선 처리 - 수치 있음)
-        ca125_value_patterns = [
-            r'ca\s*-?\s*125\s*:?\s*(\d+\.?\d*)',
-            r'ca125\s*:?\s*(\d+\.?\d*)',
-            r'ca\s+125\s*:?\s*(\d+\.?\d*)',
-        ]
-        
         ca125_found = False
-        for pattern in ca125_value_patterns:
-            matches = re.findall(pattern, text.lower())
-            for match in matches:
+        for i in range(len(CA125_VALUE_PATTERNS)):
+            for match in scan.values.get(('ca125', i), ()):
                 try:
-                    value = float(match)
+                    value = float(match.group(1))
                     entities.append(MedicalEntity(
                         text=f"CA-125 {value}",
                         entity_type='test',
@@ -221,86 +461,38 @@ class MedicalAnalyzer:
                     continue
         
         # CA-125 언급만 있는 경우 (수치 없음)
-        if not ca125_found:
-            ca125_mention_patterns = [
-                r'ca\s*-?\s*125',
-                r'ca125',
-                r'ca\s+125'
-            ]
-            
-            for pattern in ca125_mention_patterns:
-                if re.search(pattern, text.lower()):
-                    entities.append(MedicalEntity(
-                        text="CA-125",
-                        entity_type='test',
-                        value=None,
-                        unit='U/mL',
-                        normal_range=self.lab_values['ca125']['normal']
-                    ))
-                    ca125_found = True
-                    break
-        
-        # 다른 종양 표지자들도 수치 없이 인식
-        tumor_markers = {
-            'cea': ['cea'],
-            'afp': ['afp', 'alpha fetoprotein'],
-            'psa': ['psa', 'prostate specific antigen'],
-            'ca19-9': ['ca 19-9', 'ca19-9', 'ca 19 9'],
-            'ca15-3': ['ca 15-3', 'ca15-3', 'ca 15 3'],
-            'beta-hcg': ['beta hcg', 'beta-hcg', 'bhcg'],
-            'ldh': ['ldh', 'lactate dehydrogenase']
-        }
-        
-        for marker_key, patterns in tumor_markers.items():
-            marker_found = False
-            for pattern in patterns:
-                if pattern in text.lower():
-                    entities.append(MedicalEntity(
-                        text=self.lab_values[marker_key]['name'],
-                        entity_type='test',
-                        value=None,
-                        unit=self._extract_unit_from_normal_range(self.lab_values[marker_key]['normal']),
-                        normal_range=self.lab_values[marker_key]['normal']
-                    ))
-                    marker_found = True
-                    break
-            if marker_found:
-                break
-        
-        # 수치 패턴: 숫자 + 단위 또는 단순 숫자 (기존 로직)
-        for test_key, test_info in self.lab_values.items():
-            # CA-125와 종양 표지자들은 이미 처리했으므로 건너뛰기
-            if test_key in ['ca125', 'ca-125', 'ca 125', 'cea', 'afp', 'psa', 'ca19-9', 'ca15-3', 'beta-hcg', 'ldh']:
-                continue
-                
-            # 검사명 패턴 찾기
-            patterns = [
-                rf'{test_key}\s*:?\s*(\d+\.?\d*)',
-                rf'{test_info["name"].lower()}\s*:?\s*(\d+\.?\d*)',
-            ]
-            
-            # 한국어 검사명도 추가
-            korean_names = {
-                'crp': 'c반응성단백',
-                'hba1c': '당화혈색소',
-                'glucose': '혈당',
-                'cholesterol': '콜레스테롤',
-                'bp': '혈압'
-            }
-            
-            if test_key in korean_names:
-                patterns.append(rf'{korean_names[test_key]}\s*:?\s*(\d+\.?\d*)')
-            
-            for pattern in patterns:
-                matches = re.findall(pattern, text.lower())
-                for match in matches:
+        if not ca125_found and scan.values.get('ca125_mention'):
+            entities.append(MedicalEntity(
+                text="CA-125",
+                entity_type='test',
+                value=None,
+                unit='U/mL',
+                normal_range=self.lab_values['ca125']['normal']
+            ))
+        
+        # 다른 종양 표지자들도 수치 없이 인식 (사전 순서상 첫 번째 표지자만)
+        markers = self._found_terms(scan, 'tumor_marker')
+        if markers:
+            marker_key = self._marker_by_term[markers[0]]
+            entities.append(MedicalEntity(
+                text=self.lab_values[marker_key]['name'],
+                entity_type='test',
+                value=None,
+                unit=self._extract_unit_from_normal_range(self.lab_values[marker_key]['normal']),
+                normal_range=self.lab_values[marker_key]['normal']
+            ))
+        
+        # 수치 패턴: 검사 키, 영문 검사명, 한국어 검사명 + 숫자
+        for test_key, test_info, unit, slot_keys in self._lab_slots:
+            for slot_key in slot_keys:
+                for match in scan.values.get(slot_key, ()):
                     try:
-                        value = float(match)
+                        value = float(match.group(1))
                         entities.append(MedicalEntity(
                             text=f"{test_key.upper()} {value}",
                             entity_type='test',
                             value=value,
-                            unit=self._extract_unit_from_normal_range(test_info['normal']),
+                            unit=unit,
                             normal_range=test_info['normal']
                         ))
                     except ValueError:
@@ -311,97 +503,45 @@ class MedicalAnalyzer:
     def _extract_diseases(self, text: str) -> List[MedicalEntity]:
         """질병명 추출 (개선된 버전)"""
         entities = []
-        text_lower = text.lower()
-        
-        # 부분 매칭을 위한 특별 처리
-        special_patterns = {
-            '파킨슨': 'parkinson disease',
-            '파킨슨병': 'parkinson disease',
-            '알츠하이머': 'alzheimer disease',
-            '치매': 'dementia',
-            '당뇨': 'diabetes mellitus',
-            '고혈압': 'hypertension',
-            '고지혈': 'hyperlipidemia',
-            '심근경색': 'myocardial infarction',
-            '뇌졸중': 'stroke',
-            '관절염': 'arthritis',
-            '천식': 'asthma',
-            '우울증': 'depression',
-            '불안': 'anxiety disorder',
-            '간염': 'hepatitis',
-            '신부전': 'renal failure',
-            '심부전': 'heart failure',
-            '골다공증': 'osteoporosis',
-            '난소암': 'ovarian cancer',
-            '유방암': 'breast cancer',
-            '폐암': 'lung cancer',
-            '대장암': 'colorectal cancer',
-            '위암': 'gastric cancer',
-            '간암': 'liver cancer',
-            '췌장암': 'pancreatic cancer',
-            '전립선암': 'prostate cancer'
-        }
-        
-        # 특별 패턴 먼저 확인 (부분 매칭)
-        for korean_pattern, english_disease in special_patterns.items():
-            if korean_pattern in text:
-                entities.append(MedicalEntity(
-                    text=korean_pattern,
-                    entity_type='disease'
-                ))
-                break  # 첫 번째 매칭된 것만 사용
-        
-        # 기존 완전 매칭도 확인
-        for korean_disease, english_disease in self.diseases.items():
-            if korean_disease in text and korean_disease not in [e.text for e in entities]:
+        found = set()
+        scan = self._scan(text)
+        
+        # 특별 패턴 먼저 확인 (부분 매칭, 첫 번째 매칭된 것만 사용)
+        special = self._found_terms(scan, 'special_disease')
+        if special:
+            entities.append(MedicalEntity(
+                text=special[0],
+                entity_type='disease'
+            ))
+            found.add(special[0])
+        
+        # 기존 완전 매칭도 확인 (찾은 용어에 해당하는 질병만 사전 순서대로)
+        korean_found = scan.found('disease')
+        english_found = scan.found('disease_english')
+        indices = sorted({index for term in korean_found | english_found for index in self._disease_indices[term]})
+        for index in indices:
+            korean_disease, english_disease = self._disease_items[index]
+            if korean_disease in korean_found and korean_disease not in found:
                 entities.append(MedicalEntity(
                     text=korean_disease,
                     entity_type='disease'
                 ))
-            elif english_disease.lower() in text_lower and english_disease not in [e.text for e in entities]:
+                found.add(korean_disease)
+            elif english_disease.lower() in english_found and english_disease not in found:
                 entities.append(MedicalEntity(
                     text=english_disease,
                     entity_type='disease'
                 ))
+                found.add(english_disease)
         
         return entities
     
     def _extract_treatments(self, text: str) -> List[MedicalEntity]:
         """치료/시술 용어 추출 (새로 추가)"""
-        entities = []
-        text_lower = text.lower()
-        
-        # 치료/시술 관련 키워드들
-        treatment_keywords = {
-            'spinal cord stimulation': 'treatment',
-            'scs': 'treatment', 
-            '척수자극술': 'treatment',
-            '신경자극술': 'treatment',
-            'neurostimulation': 'treatment',
-            'deep brain stimulation': 'treatment',
-            'dbs': 'treatment',
-            '심부뇌자극술': 'treatment',
-            'vagus nerve stimulation': 'treatment',
-            'vns': 'treatment',
-            '미주신경자극술': 'treatment',
-            'peripheral nerve stimulation': 'treatment',
-            'pns': 'treatment',
-            '말초신경자극술': 'treatment',
-            'tens': 'treatment',
-            '경피전기신경자극술': 'treatment',
-            '수술': 'treatment',
-            '시술': 'treatment',
-            '요법': 'treatment'
-        }
-        
-        for keyword, entity_type in treatment_keywords.items():
-            if keyword in text_lower:
-                entities.append(MedicalEntity(
-                    text=keyword,
-                    entity_type=entity_type
-                ))
-        
-        return entities
+        return [
+            MedicalEntity(text=keyword, entity_type=TREATMENT_KEYWORDS[keyword])
+            for keyword in self._found_terms(self._scan(text), 'treatment')
+        ]
     
     def _extract_unit_from_normal_range(self, normal_range: str) -> str:
         """정상 범위에서 단위 추출"""
@@ -561,126 +701,38 @@ class MedicalAnalyzer:
     def _extract_medical_terms(self, text: str) -> List[str]:
         """텍스트에서 의료 관련 용어 추출"""
         medical_terms = []
-        text_lower = text.lower()
+        scan = self._scan(text)
+        terms = scan.found('neurostimulation')
         
         # spinal cord stimulation 우선 처리
-        if 'spinal cord stimulation' in text_lower:
+        if 'spinal cord stimulation' in terms:
             medical_terms.extend(['spinal cord stimulation', 'chronic pain', 'neuropathic pain', 'pain management'])
             return medical_terms
         
-        if 'scs' in text_lower and ('치료' in text_lower or '효능' in text_lower):
+        if 'scs' in terms and ('치료' in terms or '효능' in terms):
             medical_terms.extend(['spinal cord stimulation', 'chronic pain', 'neuropathic pain'])
             return medical_terms
             
-        if '척수자극술' in text_lower:
+        if '척수자극술' in terms:
             medical_terms.extend(['spinal cord stimulation', 'chronic pain', 'neuropathic pain'])
             return medical_terms
         
         # 기타 신경자극술
-        if 'deep brain stimulation' in text_lower or 'dbs' in text_lower:
+        if 'deep brain stimulation' in terms or 'dbs' in terms:
             medical_terms.extend(['deep brain stimulation', 'parkinson disease', 'movement disorder'])
             return medical_terms
             
-        if 'neurostimulation' in text_lower or '신경자극술' in text_lower:
+        if 'neurostimulation' in terms or '신경자극술' in terms:
             medical_terms.extend(['neurostimulation', 'chronic pain', 'neuropathic pain'])
             return medical_terms
         
-        # 일반적인 의료 용어들 (확장)
-        medical_vocabulary = {
-            '치료': 'treatment',
-            '진단': 'diagnosis',
-            '증상': 'symptoms',
-            '환자': 'patient',
-            '임상': 'clinical',
-            '수술': 'surgery',
-            '시술': 'procedure',
-            '요법': 'therapy',
-            '약물': 'drug',
-            '투약': 'medication',
-            '처방': 'prescription',
-            '검사': 'examination',
-            '진료': 'medical care',
-            '병원': 'hospital',
-            '의료': 'medical',
-            '질환': 'disease',
-            '질병': 'disease',
-            '병증': 'syndrome',
-            '증후군': 'syndrome',
-            '장애': 'disorder',
-            '감염': 'infection',
-            '염증': 'inflammation',
-            '종양': 'tumor',
-            '암': 'cancer',
-            '통증': 'pain',
-            '아픔': 'pain',
-            '열': 'fever',
-            '기침': 'cough',
-            '호흡': 'breathing',
-            '심장': 'heart',
-            '혈압': 'blood pressure',
-            '혈당': 'blood glucose',
-            '콜레스테롤': 'cholesterol',
-            '간': 'liver',
-            '신장': 'kidney',
-            '폐': 'lung',
-            '뇌': 'brain',
-            '신경': 'nerve',
-            '근육': 'muscle',
-            '뼈': 'bone',
-            '관절': 'joint',
-            '피부': 'skin',
-            '혈액': 'blood',
-            '소변': 'urine',
-            '변': 'stool',
-            '체중': 'weight',
-            '비만': 'obesity',
-            '당뇨': 'diabetes',
-            '고혈압': 'hypertension',
-            '고지혈': 'hyperlipidemia',
-            '파킨슨': 'parkinson',
-            '알츠하이머': 'alzheimer',
-            
-            # 효능/효과 관련
-            '효능': 'efficacy',
-            '효과': 'effectiveness',
-            '결과': 'outcome',
-            '성과': 'result',
-            '반응': 'response',
-            '개선': 'improvement',
-            '완화': 'relief',
-            '감소': 'reduction',
-            '증가': 'increase',
-            '향상': 'enhancement',
-            
-            # 통증 관련 (spinal cord stimulation과 관련)
-            '만성통증': 'chronic pain',
-            '신경통': 'neuralgia',
-            '신경병증': 'neuropathy',
-            '요통': 'back pain',
-            '목통증': 'neck pain',
-            '두통': 'headache',
-            '편두통': 'migraine',
-            '관절통': 'joint pain',
-            '근육통': 'muscle pain',
-            '복통': 'abdominal pain',
-            '흉통': 'chest pain'
-        }
-        
         # 텍스트에서 의료 용어 찾기
-        for korean_term, english_term in medical_vocabulary.items():
-            if korean_term in text_lower:
-                medical_terms.append(english_term)
+        for korean_term in self._found_terms(scan, 'vocabulary'):
+            medical_terms.append(MEDICAL_VOCABULARY[korean_term])
         
         # 영어 의료 용어도 확인
-        english_medical_terms = [
-            'treatment', 'therapy', 'diagnosis', 'clinical', 'patient', 'surgery',
-            'medication', 'drug', 'procedure', 'examination', 'medical', 'disease',
-            'syndrome', 'disorder', 'infection', 'inflammation', 'tumor', 'cancer',
-            'pain', 'fever', 'chronic', 'acute', 'efficacy', 'effectiveness', 'outcome'
-        ]
-        
-        for term in english_medical_terms:
-            if term in text_lower and term not in medical_terms:
+        for term in self._found_terms(scan, 'english_term'):
+            if term not in medical_terms:
                 medical_terms.append(term)
         
         return list(set(medical_terms))  # 중복 제거
@@ -1,21 +1,338 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple, AsyncIterator, Iterator
 from pubmed_search import PubMedSearcher
+from async_pubmed_search import AsyncPubMedSearcher
 from medical_analyzer import MedicalAnalyzer
-from paper_summarizer import PaperSummarizer
+from paper_summarizer import PaperSummarizer, SummaryStreamFallback, SummaryStreamInterrupted
+from single_flight import SingleFlight, AsyncSingleFlight
+from result_cache import ResultCache, search_result_key
+from relevance_scorer import SearchRelevanceScorer
+from vector_index import VectorIndex
+from config import config
+from contextlib import contextmanager
+import asyncio
+import numpy as np
 import time
+import tracing
+
+class _StageTimer:
+    """파이프라인 단계별 소요 시간(초) 기록"""
+    
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+    
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            with tracing.span(name, kind='stage'):
+                yield
+        finally:
+            self.timings[name] = round(time.perf_counter() - start, 3)
 
 class MedicalSearchService:
     def __init__(self):
         self.pubmed_searcher = PubMedSearcher()
+        self.async_pubmed_searcher = AsyncPubMedSearcher()
         self.medical_analyzer = MedicalAnalyzer()
         self.paper_summarizer = PaperSummarizer()
+        self.relevance_scorer = SearchRelevanceScorer()
+        self.vector_index = VectorIndex.default()
+        self.result_cache = ResultCache.default()
+        # 동일한 검색이 동시에 들어오면 한 번만 실행하고 결과를 공유
+        self._search_flight = SingleFlight()
+        self._async_search_flight = AsyncSingleFlight()
+    
+    def _search_key(self, user_input: str, max_results: int) -> str:
+        """검색 공유/캐시 키 (대소문자, 공백, 단위 표기 차이는 같은 검색으로 간주)"""
+        summarizer = self.paper_summarizer
+        return search_result_key(user_input, max_results, summarizer.enabled and summarizer.model,
+                                 summarizer.PROMPT_VERSION)
+    
+    def search_medical_papers(self, user_input: str, max_results: int = 10, include_spans: bool = False) -> Dict:
+        """사용자 입력을 분석하여 관련 논문을 검색하고 요약
+        
+        최근 같은 검색의 결과가 캐시에 있으면 바로 반환하고(from_cache=True),
+        같은 검색이 실행 중이면 새로 실행하지 않고 그 결과를 함께 받습니다.
+        include_spans=True면 단계/외부 호출별 소요 시간(spans)을 응답에 넣습니다.
+        """
+        with tracing.trace() as trace:
+            results = self._search(user_input, max_results)
+        return self._with_spans(results, trace) if include_spans else results
+    
+    async def search_medical_papers_async(self, user_input: str, max_results: int = 10,
+                                          include_spans: bool = False) -> Dict:
+        """search_medical_papers의 비동기 버전 (PubMed/OpenAI I/O 동안 이벤트 루프를 막지 않음)"""
+        with tracing.trace() as trace:
+            results = await self._search_async(user_input, max_results)
+        return self._with_spans(results, trace) if include_spans else results
+    
+    def _search(self, user_input: str, max_results: int) -> Dict:
+        key = self._search_key(user_input, max_results)
+        cached = self._cached_result(key, user_input)
+        if cached is not None:
+            return cached
+        
+        def run() -> Dict:
+            return self._cache_result(key, self._run_search(user_input, max_results))
+        
+        return self._search_flight.do(key, run)
+    
+    async def _search_async(self, user_input: str, max_results: int) -> Dict:
+        key = self._search_key(user_input, max_results)
+        # 결과 캐시(SQLite/Redis) 조회와 기록은 이벤트 루프를 막지 않도록 스레드에서 실행
+        cached = await asyncio.to_thread(self._cached_result, key, user_input)
+        if cached is not None:
+            return cached
+        
+        async def run() -> Dict:
+            results = await self._run_search_async(user_input, max_results)
+            return await asyncio.to_thread(self._cache_result, key, results)
+        
+        return await self._async_search_flight.do(key, run)
+    
+    @staticmethod
+    def _with_spans(results: Dict, trace: tracing.Trace) -> Dict:
+        """응답에 spans 추가 (같은 검색을 기다린 호출자들과 결과 dict를 공유하므로 복사본에 넣음)"""
+        return dict(results, spans=trace.to_list())
+    
+    def _cached_result(self, key: str, user_input: str) -> Optional[Dict]:
+        """결과 캐시 조회 (캐시 오류는 미스로 처리)"""
+        if self.result_cache is None:
+            return None
+        try:
+            with tracing.span('result_cache.get', kind='cache') as attrs:
+                results = self.result_cache.get(key)
+                attrs['hit'] = results is not None
+        except Exception as e:
+            print(f"검색 결과 캐시 조회 오류: {e}")
+            return None
+        if results is None:
+            return None
+        results['user_input'] = user_input
+        results['from_cache'] = True
+        return results
+    
+    def _cache_result(self, key: str, results: Dict) -> Dict:
+        """요약이 모두 정상 생성된 결과만 캐시에 기록 (OpenAI 오류 시 대체 요약은 저장하지 않음)"""
+        if self.result_cache is None or not self._is_complete(results):
+            return results
+        try:
+            self.result_cache.put(key, results)
+        except Exception as e:
+            print(f"검색 결과 캐시 기록 오류: {e}")
+        return results
+    
+    @staticmethod
+    def _is_complete(results: Dict) -> bool:
+        """OpenAI 요약 실패로 기본 요약이 들어간 결과가 아닌지 확인 (요약기의 fallback 표시 기준)"""
+        if results.get('overall_summary_fallback'):
+            return False
+        return not any(paper.get('summary_fallback') for paper in results['papers'])
+    
+    def _run_search(self, user_input: str, max_results: int) -> Dict:
+        """검색 파이프라인 실행"""
+        
+        # 시작 시간 기록
+        start_time = time.perf_counter()
+        timer = _StageTimer()
+        
+        # 1~3. 의료 개체 분석, 검색 쿼리 생성, 수치 해석
+        with timer.stage('analyze'):
+            entities, search_query, interpretations = self._analyze(user_input)
+        
+        # 4. PubMed 검색 (더 많은 결과를 가져와서 필터링)
+        with timer.stage('pubmed_search'):
+            papers = self.pubmed_searcher.search_and_fetch(search_query, max_results * 2)
+        
+        # 5. 관련성 점수 계산 및 필터링 (요약 전에 수행해 OpenAI 호출을 상위 max_results개로 제한)
+        with timer.stage('filter'):
+            top_papers = self._filter_papers(papers, entities, user_input, max_results, search_query)
+        
+        # 6. 남은 논문만 요약
+        with timer.stage('summarize'):
+            summaries = self.paper_summarizer.summarize_papers(top_papers, user_input) if top_papers else []
+            summarized_papers = self._merge_summaries(top_papers, summaries)
+        
+        # 7. 전체 요약 생성
+        with timer.stage('overall_summary'):
+            overall_summary, overall_fallback = self.paper_summarizer.generate_overall_summary(
+                summarized_papers, user_input)
+        
+        return self._build_results(user_input, search_query, entities, interpretations,
+                                   papers, summarized_papers, overall_summary, overall_fallback,
+                                   start_time, timer.timings)
     
-    def search_medical_papers(self, user_input: str, max_results: int = 10) -> Dict:
-        """사용자 입력을 분석하여 관련 논문을 검색하고 요약"""
+    async def _run_search_async(self, user_input: str, max_results: int) -> Dict:
+        """검색 파이프라인 실행 (비동기)"""
         
         # 시작 시간 기록
-        start_time = time.time()
+        start_time = time.perf_counter()
+        timer = _StageTimer()
+        
+        # 1~3. 의료 개체 분석, 검색 쿼리 생성, 수치 해석
+        with timer.stage('analyze'):
+            entities, search_query, interpretations = self._analyze(user_input)
+        
+        # 4. PubMed 검색 (더 많은 결과를 가져와서 필터링)
+        with timer.stage('pubmed_search'):
+            papers = await self.async_pubmed_searcher.search_and_fetch(search_query, max_results * 2)
+        
+        # 5. 관련성 점수 계산 및 필터링 (요약 전에 수행해 OpenAI 호출을 상위 max_results개로 제한)
+        with timer.stage('filter'):
+            top_papers = await asyncio.to_thread(self._filter_papers, papers, entities, user_input,
+                                                 max_results, search_query)
         
+        # 6. 남은 논문만 요약
+        with timer.stage('summarize'):
+            summaries = await self.paper_summarizer.summarize_papers_async(top_papers, user_input) if top_papers else []
+            summarized_papers = self._merge_summaries(top_papers, summaries)
+        
+        # 7. 전체 요약 생성
+        with timer.stage('overall_summary'):
+            overall_summary, overall_fallback = await self.paper_summarizer.generate_overall_summary_async(
+                summarized_papers, user_input)
+        
+        return self._build_results(user_input, search_query, entities, interpretations,
+                                   papers, summarized_papers, overall_summary, overall_fallback,
+                                   start_time, timer.timings)
+    
+    def stream_medical_papers(self, user_input: str, max_results: int = 10) -> Iterator[Tuple[str, Dict]]:
+        """검색 파이프라인을 단계별 이벤트 (이벤트 이름, 데이터)로 스트리밍
+        
+        analysis → paper(필터링된 논문마다) → summary_delta/summary(논문별 요약 토큰과 완료)
+        → overall_summary_delta/overall_summary(종합 요약 토큰과 완료) → done 순서로 보내므로,
+        클라이언트는 전체 처리가 끝나기 전에 분석 결과와 논문 목록, 요약 문장을 바로 표시할 수 있습니다.
+        OpenAI 스트리밍이 중간에 끊긴 요약은 summary/overall_summary 이벤트의 incomplete가 True이고,
+        OpenAI 오류로 기본 요약을 대신 보낸 경우는 summary_fallback/overall_summary_fallback이 True입니다
+        (done 이벤트에도 같은 이름으로 모읍니다).
+        """
+        start_time = time.perf_counter()
+        timer = _StageTimer()
+        
+        with timer.stage('analyze'):
+            entities, search_query, interpretations = self._analyze(user_input)
+        yield 'analysis', self._analysis_event(user_input, search_query, entities, interpretations)
+        
+        with timer.stage('pubmed_search'):
+            papers = self.pubmed_searcher.search_and_fetch(search_query, max_results * 2)
+        
+        with timer.stage('filter'):
+            top_papers = self._filter_papers(papers, entities, user_input, max_results, search_query)
+        for index, paper in enumerate(top_papers):
+            yield 'paper', {'index': index, **paper}
+        
+        summarized_papers = list(top_papers)
+        with timer.stage('summarize'):
+            for index, kind, payload in self.paper_summarizer.stream_summaries(top_papers, user_input):
+                yield self._summary_event(summarized_papers, top_papers, index, kind, payload)
+        
+        chunks = []
+        incomplete = fallback = False
+        with timer.stage('overall_summary'):
+            try:
+                for delta in self.paper_summarizer.stream_overall_summary(summarized_papers, user_input):
+                    chunks.append(delta)
+                    yield 'overall_summary_delta', {'delta': delta}
+            except SummaryStreamInterrupted:
+                incomplete = True
+            except SummaryStreamFallback:
+                fallback = True
+        yield 'overall_summary', {'overall_summary': ''.join(chunks), 'incomplete': incomplete,
+                                  'overall_summary_fallback': fallback}
+        
+        yield 'done', self._done_event(papers, summarized_papers, fallback, start_time, timer.timings)
+    
+    async def stream_medical_papers_async(self, user_input: str, max_results: int = 10) -> AsyncIterator[Tuple[str, Dict]]:
+        """stream_medical_papers의 비동기 버전"""
+        start_time = time.perf_counter()
+        timer = _StageTimer()
+        
+        with timer.stage('analyze'):
+            entities, search_query, interpretations = self._analyze(user_input)
+        yield 'analysis', self._analysis_event(user_input, search_query, entities, interpretations)
+        
+        with timer.stage('pubmed_search'):
+            papers = await self.async_pubmed_searcher.search_and_fetch(search_query, max_results * 2)
+        
+        with timer.stage('filter'):
+            top_papers = await asyncio.to_thread(self._filter_papers, papers, entities, user_input,
+                                                 max_results, search_query)
+        for index, paper in enumerate(top_papers):
+            yield 'paper', {'index': index, **paper}
+        
+        summarized_papers = list(top_papers)
+        with timer.stage('summarize'):
+            async for index, kind, payload in self.paper_summarizer.stream_summaries_async(top_papers, user_input):
+                yield self._summary_event(summarized_papers, top_papers, index, kind, payload)
+        
+        chunks = []
+        incomplete = fallback = False
+        with timer.stage('overall_summary'):
+            try:
+                async for delta in self.paper_summarizer.stream_overall_summary_async(summarized_papers, user_input):
+                    chunks.append(delta)
+                    yield 'overall_summary_delta', {'delta': delta}
+            except SummaryStreamInterrupted:
+                incomplete = True
+            except SummaryStreamFallback:
+                fallback = True
+        yield 'overall_summary', {'overall_summary': ''.join(chunks), 'incomplete': incomplete,
+                                  'overall_summary_fallback': fallback}
+        
+        yield 'done', self._done_event(papers, summarized_papers, fallback, start_time, timer.timings)
+    
+    def _analysis_event(self, user_input: str, search_query: str, entities: List, interpretations: List[str]) -> Dict:
+        return {
+            'user_input': user_input,
+            'search_query': search_query,
+            'detected_entities': self._serialize_entities(entities),
+            'interpretations': interpretations
+        }
+    
+    def _summary_event(self, summarized_papers: List[Dict], top_papers: List[Dict],
+                       index: int, kind: str, payload) -> Tuple[str, Dict]:
+        """요약 스트림 항목을 summary_delta/summary 이벤트로 변환 (완료 시 summarized_papers 갱신)"""
+        if kind == 'delta':
+            return 'summary_delta', {'index': index, 'delta': payload}
+        
+        summarized_papers[index] = self._merge_summaries([top_papers[index]], [payload])[0]
+        return 'summary', {
+            'index': index,
+            'pmid': payload.get('pmid', ''),
+            'ai_summary': payload.get('ai_summary', ''),
+            'incomplete': payload.get('incomplete', False),
+            'summary_fallback': payload.get('summary_fallback', False)
+        }
+    
+    @staticmethod
+    def _done_event(papers: List[Dict], summarized_papers: List[Dict], overall_fallback: bool,
+                    start_time: float, stage_timings: Dict[str, float]) -> Dict:
+        return {
+            'total_papers_found': len(papers),
+            'filtered_papers_count': len(summarized_papers),
+            # 논문 요약 중 하나라도/종합 요약이 기본 요약으로 대체됐는지
+            'summary_fallback': any(paper.get('summary_fallback', False) for paper in summarized_papers),
+            'overall_summary_fallback': overall_fallback,
+            'processing_time': round(time.perf_counter() - start_time, 2),
+            'stage_timings': stage_timings,
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+    
+    @staticmethod
+    def _merge_summaries(papers: List[Dict], summaries: List[Dict]) -> List[Dict]:
+        """필터링된 논문 순서를 유지하면서 요약 결과(ai_summary 등)를 합침
+        
+        관련성 점수는 요약기의 점수가 아닌 필터링 단계에서 계산한 점수를 유지합니다.
+        """
+        summary_by_pmid = {summary.get('pmid'): summary for summary in summaries}
+        merged = []
+        for paper in papers:
+            summary = summary_by_pmid.get(paper.get('pmid'), {})
+            merged.append({**paper, **summary, 'relevance_score': paper.get('relevance_score', 0)})
+        return merged
+    
+    def _analyze(self, user_input: str) -> Tuple[List, str, List[str]]:
+        """의료 개체 분석, 검색 쿼리 생성, 수치 해석"""
         # 1. 의료 개체 분석
         entities = self.medical_analyzer.analyze_input(user_input)
         
@@ -25,117 +342,129 @@ class MedicalSearchService:
         # 3. 수치 해석
         interpretations = self.medical_analyzer.interpret_values(entities)
         
-        # 4. PubMed 검색 (더 많은 결과를 가져와서 필터링)
-        papers = self.pubmed_searcher.search_and_fetch(search_query, max_results * 2)
-        
-        # 5. 논문 요약 및 관련성 평가
-        summarized_papers = []
-        if papers:
-            summarized_papers = self.paper_summarizer.summarize_papers(papers, user_input)
-            
-            # 6. 논문 필터링 및 관련성 점수 계산 (최적화)
-            filtered_papers = []
-            min_relevance_threshold = 0.10  # 기본 10%
+        return entities, search_query, interpretations
+    
+    def _filter_papers(self, papers: List[Dict], entities: List, user_input: str, max_results: int,
+                       search_query: Optional[str] = None) -> List[Dict]:
+        """관련성 점수를 계산해 논문을 필터링하고 상위 max_results개 반환
+
+        search_query가 주어지면 BM25 색인 점수를 더해 순서를 정합니다.
+        """
+        filtered_papers = []
+        min_relevance_threshold = 0.10  # 기본 10%
+        
+        # Spinal Cord Stimulation 특별 처리
+        is_scs_search = any(term in user_input.lower() for term in ['spinal cord stimulation', 'scs', '척수자극술'])
+        
+        if is_scs_search:
+            print(f"🎯 SCS 전용 필터링 적용")
+            # SCS 검색의 경우 매우 관대한 필터링
+            for paper in papers:
+                title = paper.get('title', '').lower()
+                abstract = paper.get('abstract', '').lower()
+                content = title + ' ' + abstract
+                
+                # SCS 관련성 점수 계산 (특별 로직)
+                scs_score = 0
+                
+                # 직접적인 SCS 언급
+                if 'spinal cord stimulation' in content:
+                    scs_score += 0.7
+                elif 'scs' in content and ('pain' in content or 'stimulation' in content):
+                    scs_score += 0.5
+                elif 'neurostimulation' in content and 'spinal' in content:
+                    scs_score += 0.4
+                
+                # 관련 의료 용어
+                if any(term in content for term in ['chronic pain', 'neuropathic pain', 'back pain']):
+                    scs_score += 0.2
+                if any(term in content for term in ['implantable', 'device', 'electrode']):
+                    scs_score += 0.1
+                if any(term in content for term in ['efficacy', 'effectiveness', 'outcome']):
+                    scs_score += 0.1
+                
+                # 명백히 관련 없는 내용 제외
+                exclude_terms = ['veterinary', 'animal model only', 'plant', 'agriculture', 'in vitro only']
+                has_exclude = any(term in content for term in exclude_terms)
+                
+                if scs_score >= 0.05 and not has_exclude:  # 매우 낮은 임계값
+                    # 공유된 검색 결과를 건드리지 않도록 복사본에 점수 기록
+                    filtered_papers.append({**paper, 'relevance_score': scs_score})
+        else:
+            # 일반적인 필터링 로직 (모든 후보의 점수와 제외 패턴을 한 번에 계산)
+            relevance_scores, has_exclude_pattern, has_hyperlipidemia_content = \
+                self.relevance_scorer.features(papers, entities, user_input)
             
-            # Spinal Cord Stimulation 특별 처리
-            is_scs_search = any(term in user_input.lower() for term in ['spinal cord stimulation', 'scs', '척수자극술'])
+            # 특별 케이스: 고지혈증 관련 검색의 경우 더 관대한 기준 적용
+            thresholds = np.full(len(papers), min_relevance_threshold)
+            if self.relevance_scorer.is_hyperlipidemia_search(user_input):
+                thresholds[has_hyperlipidemia_content] = 0.08
             
-            if is_scs_search:
-                print(f"🎯 SCS 전용 필터링 적용")
-                # SCS 검색의 경우 매우 관대한 필터링
-                for paper in papers:
-                    title = paper.get('title', '').lower()
-                    abstract = paper.get('abstract', '').lower()
-                    content = title + ' ' + abstract
-                    
-                    # SCS 관련성 점수 계산 (특별 로직)
-                    scs_score = 0
-                    
-                    # 직접적인 SCS 언급
-                    if 'spinal cord stimulation' in content:
-                        scs_score += 0.7
-                    elif 'scs' in content and ('pain' in content or 'stimulation' in content):
-                        scs_score += 0.5
-                    elif 'neurostimulation' in content and 'spinal' in content:
-                        scs_score += 0.4
-                    
-                    # 관련 의료 용어
-                    if any(term in content for term in ['chronic pain', 'neuropathic pain', 'back pain']):
-                        scs_score += 0.2
-                    if any(term in content for term in ['implantable', 'device', 'electrode']):
-                        scs_score += 0.1
-                    if any(term in content for term in ['efficacy', 'effectiveness', 'outcome']):
-                        scs_score += 0.1
-                    
-                    # 명백히 관련 없는 내용 제외
-                    exclude_terms = ['veterinary', 'animal model only', 'plant', 'agriculture', 'in vitro only']
-                    has_exclude = any(term in content for term in exclude_terms)
-                    
-                    if scs_score >= 0.05 and not has_exclude:  # 매우 낮은 임계값
-                        paper['relevance_score'] = scs_score
-                        filtered_papers.append(paper)
-            else:
-                # 일반적인 필터링 로직
-                for paper in papers:
-                    title = paper.get('title', '').lower()
-                    abstract = paper.get('abstract', '').lower()
-                    content = title + ' ' + abstract
-                    
-                    # 관련성 점수 계산
-                    relevance_score = self._calculate_relevance_score(paper, entities, user_input)
-                    paper['relevance_score'] = relevance_score
-                    
-                    # 기본 제외 패턴 (매우 제한적)
-                    exclude_patterns = [
-                        'veterinary medicine', 'animal study only', 'plant biology', 
-                        'agricultural research', 'environmental policy only'
-                    ]
-                    
-                    has_exclude_pattern = any(pattern in content for pattern in exclude_patterns)
-                    is_low_relevance = relevance_score < min_relevance_threshold
-                    
-                    # 특별 케이스: 고지혈증 관련 검색의 경우 더 관대한 기준 적용
-                    is_hyperlipidemia_search = any(term in user_input.lower() for term in ['고지혈', '콜레스테롤', 'cholesterol', 'lipid', 'hyperlipidemia'])
-                    if is_hyperlipidemia_search:
-                        hyperlipidemia_keywords = ['hyperlipidemia', 'dyslipidemia', 'cholesterol', 'lipid', 'triglyceride', 'statin', 'atherosclerosis']
-                        has_hyperlipidemia_content = any(keyword in content for keyword in hyperlipidemia_keywords)
-                        if has_hyperlipidemia_content:
-                            is_low_relevance = relevance_score < 0.08
-                    
-                    # 최종 필터링 조건
-                    should_include = not is_low_relevance and not has_exclude_pattern
-                    
-                    if should_include:
-                        filtered_papers.append(paper)
+            # 최종 필터링 조건
+            should_include = (relevance_scores >= thresholds) & ~has_exclude_pattern
             
-            # 관련성 점수로 재정렬하고 요청된 수만큼만 반환
-            filtered_papers.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
-            summarized_papers = filtered_papers[:max_results]
-        
-        # 7. 전체 요약 생성
-        overall_summary = self.paper_summarizer.generate_overall_summary(summarized_papers, user_input)
-        
+            for index in np.flatnonzero(should_include):
+                filtered_papers.append({**papers[index], 'relevance_score': float(relevance_scores[index])})
+        
+        # 관련성 점수(+ BM25 색인 점수)로 재정렬하고 요청된 수만큼만 반환
+        self._add_bm25_scores(filtered_papers, search_query)
+        rerank_weight = config.SEARCH_INDEX_RERANK_WEIGHT
+        filtered_papers.sort(
+            key=lambda x: x.get('relevance_score', 0) + rerank_weight * x.get('bm25_score', 0),
+            reverse=True
+        )
+        return filtered_papers[:max_results]
+    
+    def _add_bm25_scores(self, papers: List[Dict], search_query: Optional[str]):
+        """색인의 BM25 점수를 후보 중 최고점 기준 0~1로 정규화해 bm25_score로 기록"""
+        search_index = self.pubmed_searcher.search_index
+        if search_index is None or not search_query or not papers:
+            return
+        try:
+            scores = search_index.score(search_query, [paper.get('pmid', '') for paper in papers])
+        except Exception as e:
+            print(f"검색 색인 점수 계산 오류: {e}")
+            return
+        
+        best = max(scores.values(), default=0.0)
+        if best <= 0:
+            return
+        for paper in papers:
+            paper['bm25_score'] = round(scores.get(paper.get('pmid', ''), 0.0) / best, 4)
+    
+    @staticmethod
+    def _serialize_entities(entities: List) -> List[Dict]:
+        """감지된 의료 개체를 응답용 딕셔너리로 변환"""
+        return [
+            {
+                'text': entity.text,
+                'type': entity.entity_type,
+                'value': entity.value,
+                'unit': entity.unit,
+                'normal_range': entity.normal_range
+            } for entity in entities
+        ]
+    
+    def _build_results(self, user_input: str, search_query: str, entities: List, interpretations: List[str],
+                       papers: List[Dict], summarized_papers: List[Dict], overall_summary: str,
+                       overall_fallback: bool, start_time: float, stage_timings: Dict[str, float]) -> Dict:
+        """검색 결과 응답 구성"""
         # 처리 시간 계산
-        processing_time = round(time.time() - start_time, 2)
+        processing_time = round(time.perf_counter() - start_time, 2)
         
         return {
             'user_input': user_input,
             'search_query': search_query,
-            'detected_entities': [
-                {
-                    'text': entity.text,
-                    'type': entity.entity_type,
-                    'value': entity.value,
-                    'unit': entity.unit,
-                    'normal_range': entity.normal_range
-                } for entity in entities
-            ],
+            'detected_entities': self._serialize_entities(entities),
             'interpretations': interpretations,
             'papers': summarized_papers,
             'total_papers_found': len(papers),  # 원본 검색 결과 수
             'filtered_papers_count': len(summarized_papers),  # 필터링 후 수
             'overall_summary': overall_summary,
+            'overall_summary_fallback': overall_fallback,  # OpenAI 오류로 기본 종합 요약을 넣었는지
             'processing_time': processing_time,
+            'stage_timings': stage_timings,  # 단계별 소요 시간(초)
+            'from_cache': False,
             'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
         }
     
@@ -147,102 +476,131 @@ class MedicalSearchService:
         return None
     
     def search_similar_papers(self, pmid: str, max_results: int = 5) -> List[Dict]:
-        """특정 논문과 유사한 논문 검색"""
-        # 원본 논문 정보 가져오기
-        original_paper = self.get_paper_detail(pmid)
-        if not original_paper:
-            return []
-        
-        # 제목과 초록에서 키워드 추출하여 검색
-        title = original_paper.get('title', '')
-        abstract = original_paper.get('abstract', '')
+        """특정 논문과 유사한 논문 검색
         
-        # 간단한 키워드 추출 (실제로는 더 정교한 방법 사용 가능)
-        keywords = self._extract_keywords_from_text(title + ' ' + abstract)
-        search_query = ' AND '.join([f'"{kw}"' for kw in keywords[:3]])
+        벡터 색인에 있는 논문은 네트워크 호출 없이 이웃을 찾고, 없는 논문은 NCBI가 계산해 둔
+        ELink 관련 논문(요청 1번, 결과는 저장소에 캐시)을 씁니다. ELink에도 없으면 원본을 가져와
+        같은 모델로 벡터화해 찾습니다.
+        """
+        neighbors = self._indexed_neighbors(pmid, max_results)
+        if neighbors:
+            papers = self.pubmed_searcher.fetch_paper_details([neighbor for neighbor, _ in neighbors])
+            return self._with_similarity(papers, neighbors)
         
-        # 검색 및 원본 논문 제외
-        papers = self.pubmed_searcher.search_and_fetch(search_query, max_results + 1)
-        similar_papers = [p for p in papers if p.get('pmid') != pmid][:max_results]
+        related = self.pubmed_searcher.fetch_related_papers([pmid], max_results)[pmid]
+        if related:
+            return related
         
-        return similar_papers
+        original_paper = self.get_paper_detail(pmid)
+        if not original_paper:
+            return []
+        neighbors = self._folded_neighbors(original_paper, max_results)
+        if not neighbors:
+            return []
+        papers = self.pubmed_searcher.fetch_paper_details([neighbor for neighbor, _ in neighbors])
+        return self._with_similarity(papers, neighbors)
     
-    def _extract_keywords_from_text(self, text: str) -> List[str]:
-        """텍스트에서 주요 키워드 추출 (간단한 버전)"""
-        import re
+    def search_related_papers(self, pmids: List[str], max_results: int = 5) -> Dict[str, List[Dict]]:
+        """여러 논문의 관련 논문을 한꺼번에 검색 (ELink를 묶어서 요청)"""
+        return self.pubmed_searcher.fetch_related_papers(pmids, max_results)
+    
+    def _indexed_neighbors(self, pmid: str, max_results: int) -> Optional[List[Tuple[str, float]]]:
+        """벡터 색인에 있는 논문의 이웃 (색인이 없거나 PMID가 색인에 없으면 None)"""
+        if self.vector_index is None or not self.vector_index.ready:
+            return None
+        try:
+            return self.vector_index.similar(pmid, max_results)
+        except Exception as e:
+            print(f"벡터 색인 조회 오류: {e}")
+            return None
+    
+    def _folded_neighbors(self, paper: Dict, max_results: int) -> List[Tuple[str, float]]:
+        """색인에 없는 논문을 벡터화해 찾은 이웃 (색인이 없으면 빈 목록)"""
+        if self.vector_index is None or not self.vector_index.ready:
+            return []
+        try:
+            return self.vector_index.similar_to_paper(paper, max_results)
+        except Exception as e:
+            print(f"벡터 색인 조회 오류: {e}")
+            return []
+    
+    @staticmethod
+    def _with_similarity(papers: List[Dict], neighbors: List[Tuple[str, float]]) -> List[Dict]:
+        """이웃 순서대로 논문에 유사도 점수를 붙임"""
+        scores = dict(neighbors)
+        return [{**paper, 'similarity_score': scores[paper['pmid']]} for paper in papers if paper.get('pmid') in scores]
+    
+    async def get_paper_detail_async(self, pmid: str) -> Optional[Dict]:
+        """특정 논문의 상세 정보 조회 (비동기)"""
+        papers = await self.async_pubmed_searcher.fetch_paper_details([pmid])
+        if papers:
+            return papers[0]
+        return None
+    
+    async def search_similar_papers_async(self, pmid: str, max_results: int = 5) -> List[Dict]:
+        """특정 논문과 유사한 논문 검색 (비동기)
         
-        # 기본적인 전처리
-        text = text.lower()
-        words = re.findall(r'\b[a-zA-Z]{4,}\b', text)  # 4글자 이상 영어 단어
+        벡터 색인 조회는 락, memmap 페이지 읽기, 행렬 곱을 하므로 이벤트 루프를 막지 않도록 스레드에서 실행합니다.
+        """
+        neighbors = await asyncio.to_thread(self._indexed_neighbors, pmid, max_results)
+        if neighbors:
+            papers = await self.async_pubmed_searcher.fetch_paper_details([neighbor for neighbor, _ in neighbors])
+            return self._with_similarity(papers, neighbors)
         
-        # 의학 용어로 보이는 단어들 우선선별
-        medical_keywords = []
-        common_words = {'with', 'from', 'they', 'this', 'that', 'were', 'been', 'have', 'more', 'such', 'also', 'than', 'only', 'these', 'may', 'can', 'between', 'after', 'before', 'during', 'study', 'studies', 'analysis', 'results', 'methods', 'patients', 'data', 'using', 'used', 'show', 'showed', 'found', 'observed'}
+        related = (await self.async_pubmed_searcher.fetch_related_papers([pmid], max_results))[pmid]
+        if related:
+            return related
         
-        for word in words:
-            if word not in common_words and len(word) >= 4:
-                medical_keywords.append(word)
-                if len(medical_keywords) >= 5:  # 최대 5개 키워드
-                    break
+        original_paper = await self.get_paper_detail_async(pmid)
+        if not original_paper:
+            return []
+        neighbors = await asyncio.to_thread(self._folded_neighbors, original_paper, max_results)
+        if not neighbors:
+            return []
+        papers = await self.async_pubmed_searcher.fetch_paper_details([neighbor for neighbor, _ in neighbors])
+        return self._with_similarity(papers, neighbors)
+    
+    async def search_related_papers_async(self, pmids: List[str], max_results: int = 5) -> Dict[str, List[Dict]]:
+        """여러 논문의 관련 논문을 한꺼번에 검색 (비동기)"""
+        return await self.async_pubmed_searcher.fetch_related_papers(pmids, max_results)
+    
+    def stats(self) -> Dict:
+        """캐시 적중률, 호출 제한/서킷 상태, 동시 실행 공유 통계 (이 워커 프로세스 기준)"""
+        searcher = self.pubmed_searcher
+        components = {
+            'article': searcher.article_store,
+            'summary': self.paper_summarizer.summary_cache,
+            'result': self.result_cache,
+            'search_index': searcher.search_index,
+            'vector_index': self.vector_index
+        }
+        caches = {}
+        for name, component in components.items():
+            try:
+                caches[name] = component.stats() if component is not None else None
+            except Exception as e:
+                print(f"{name} 통계 조회 오류: {e}")
+                caches[name] = None
         
-        return medical_keywords
+        return {
+            'caches': caches,
+            'rate_limiter': searcher.rate_limiter.stats() if searcher.rate_limiter is not None else None,
+            'circuit_breaker': searcher.circuit_breaker.stats(),
+            'single_flight': {
+                'search': self._search_flight.stats(),
+                'search_async': self._async_search_flight.stats(),
+                'efetch': searcher._fetch_flight.stats(),
+                'efetch_async': self.async_pubmed_searcher._afetch_flight.stats()
+            }
+        }
+    
+    async def aclose(self):
+        """비동기 연결 풀 정리"""
+        await self.async_pubmed_searcher.aclose()
     
     def _calculate_relevance_score(self, paper: Dict, entities: List, user_input: str) -> float:
         """논문의 관련성 점수 계산"""
-        score = 0.0
-        title = paper.get('title', '').lower()
-        abstract = paper.get('abstract', '').lower()
-        content = title + ' ' + abstract
-        user_lower = user_input.lower()
-        
-        # 1. 사용자 입력과의 직접적인 매칭
-        user_words = user_lower.split()
-        for word in user_words:
-            if len(word) > 2:  # 2글자 이상의 단어만
-                if word in title:
-                    score += 0.05  # 제목에 있으면 5%
-                elif word in abstract:
-                    score += 0.02  # 초록에 있으면 2%
-        
-        # 2. 감지된 엔티티와의 매칭
-        for entity in entities:
-            entity_text = entity.text.lower()
-            if entity_text in content:
-                if entity.entity_type == 'disease':
-                    score += 0.04  # 질병명 매칭
-                elif entity.entity_type == 'test':
-                    score += 0.03  # 검사명 매칭
-                elif entity.entity_type == 'treatment':
-                    score += 0.04  # 치료법 매칭
-        
-        # 3. 한국어 의료 용어 인식
-        korean_medical_terms = {
-            '당뇨병': 'diabetes', '고혈압': 'hypertension', '파킨슨': 'parkinson',
-            '암': 'cancer', '종양': 'tumor', '심장': 'heart', '뇌': 'brain',
-            '치료': 'treatment', '진단': 'diagnosis', '수술': 'surgery',
-            '효능': 'efficacy', '효과': 'effectiveness'
-        }
-        
-        for korean, english in korean_medical_terms.items():
-            if korean in user_lower and english in content:
-                score += 0.03
-        
-        # 4. 기본 의료 키워드 보너스
-        medical_keywords = [
-            'patient', 'clinical', 'treatment', 'therapy', 'diagnosis', 'disease',
-            'medical', 'health', 'study', 'trial', 'efficacy', 'outcome', 'hospital'
-        ]
-        
-        for keyword in medical_keywords:
-            if keyword in content:
-                score += 0.01
-        
-        # 5. CA-125 특별 처리
-        if any(term in user_lower for term in ['ca 125', 'ca-125', 'ca125']):
-            if any(term in content for term in ['ca-125', 'ca 125', 'tumor marker', 'ovarian cancer']):
-                score += 0.1  # 높은 보너스
-        
-        return min(score, 1.0)  # 최대 1.0으로 제한
+        return float(self.relevance_scorer.score([paper], entities, user_input)[0])
     
     def get_health_tips(self, entities: List) -> List[str]:
         """감지된 의료 개체를 기반으로 건강 팁 제공"""
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+E-utilities / OpenAI 채팅 API 로컬 대역 서버
+
+NCBI나 OpenAI를 부르지 않고 부하 테스트와 벤치마크를 재현할 수 있도록
+녹화해 둔 efetch XML(fixtures/*.xml)로 esearch/efetch/esummary/elink에 응답하고,
+OpenAI 채팅 완성(/v1/chat/completions, stream 포함)은 고정된 요약문으로 응답합니다.
+지연 시간, 오류 비율, 초당 호출 제한(초과 시 429)을 조절할 수 있습니다.
+
+    python mock_eutils.py --port 8765 --latency 0.2 --error-rate 0.05 --rate-limit 3
+    PUBMED_EUTILS_BASE_URL=http://127.0.0.1:8765/entrez/eutils \\
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=mock uvicorn main:app
+
+    python mock_eutils.py record "ovarian cancer CA-125" --max-results 20   # 실제 NCBI 응답을 fixtures/에 녹화
+"""
+
+import argparse
+import asyncio
+import contextlib
+import glob
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, List, Optional
+from xml.sax.saxutils import escape
+
+import requests
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from pubmed_search import _extract_paper
+from search_index import query_terms, tokenize
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+NCBI_EUTILS_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+XML_MEDIA_TYPE = "text/xml; charset=UTF-8"
+
+
+class FixtureCorpus:
+    """녹화된 efetch XML의 PubmedArticle을 PMID별로 보관하고 검색/조회에 응답"""
+
+    def __init__(self, fixtures_dir: str = None):
+        self.articles: Dict[str, bytes] = {}
+        self.papers: Dict[str, Dict] = {}
+        self._tokens: Dict[str, set] = {}
+
+        for path in sorted(glob.glob(os.path.join(fixtures_dir or FIXTURES_DIR, '*.xml'))):
+            for _, elem in ET.iterparse(path):
+                if elem.tag != 'PubmedArticle':
+                    continue
+                paper = _extract_paper(elem)
+                if paper['pmid'] and paper['pmid'] not in self.articles:
+                    self.articles[paper['pmid']] = ET.tostring(elem, encoding='utf-8')
+                    self.papers[paper['pmid']] = paper
+                    self._tokens[paper['pmid']] = set(tokenize(f"{paper['title']} {paper['abstract']}"))
+                elem.clear()
+
+    def search(self, term: str) -> List[str]:
+        """검색어가 많이 겹치는 순서로 PMID 목록
+
+        일치하는 논문이 없으면 전체를 돌려줘 부하 테스트 경로가 항상 efetch까지 이어지게 합니다.
+        """
+        terms = set(query_terms(term))
+        scored = [(len(terms & tokens), pmid) for pmid, tokens in self._tokens.items()]
+        matched = [pmid for score, pmid in sorted(scored, key=lambda item: -item[0]) if score > 0]
+        return matched or list(self.articles)
+
+    def related(self, pmid: str) -> List[tuple]:
+        """겹치는 용어 수를 점수로 한 관련 논문 [(pmid, 점수), ...] (ELink처럼 자기 자신을 첫 번째로 포함)"""
+        tokens = self._tokens.get(pmid)
+        if tokens is None:
+            return []
+        scored = [(other, len(tokens & other_tokens)) for other, other_tokens in self._tokens.items()]
+        return sorted([item for item in scored if item[1] > 0], key=lambda item: -item[1])
+
+    def elink_xml(self, pmids: List[str]) -> bytes:
+        link_sets = []
+        for pmid in pmids:
+            links = ''.join(f'<Link><Id>{other}</Id><Score>{score * 1000}</Score></Link>'
+                            for other, score in self.related(pmid))
+            link_set_db = (f'<LinkSetDb><DbTo>pubmed</DbTo><LinkName>pubmed_pubmed</LinkName>{links}</LinkSetDb>'
+                           if links else '')
+            link_sets.append(f'<LinkSet><DbFrom>pubmed</DbFrom><IdList><Id>{pmid}</Id></IdList>{link_set_db}</LinkSet>')
+        return f'<?xml version="1.0" ?>\n<eLinkResult>{"".join(link_sets)}</eLinkResult>\n'.encode('utf-8')
+
+    def efetch_xml(self, pmids: List[str]) -> bytes:
+        body = b''.join(self.articles[pmid] for pmid in pmids if pmid in self.articles)
+        return b'<?xml version="1.0" ?>\n<PubmedArticleSet>\n' + body + b'</PubmedArticleSet>\n'
+
+    def esummary_xml(self, pmids: List[str]) -> bytes:
+        docs = []
+        for pmid in pmids:
+            paper = self.papers.get(pmid)
+            if paper is None:
+                continue
+            authors = ''.join(f'<Item Name="Author" Type="String">{escape(author)}</Item>' for author in paper['authors'])
+            docs.append(
+                f'<DocSum><Id>{pmid}</Id>'
+                f'<Item Name="PubDate" Type="Date">{escape(paper["publication_date"])}</Item>'
+                f'<Item Name="Source" Type="String">{escape(paper["journal"])}</Item>'
+                f'<Item Name="AuthorList" Type="List">{authors}</Item>'
+                f'<Item Name="Title" Type="String">{escape(paper["title"])}</Item>'
+                f'<Item Name="FullJournalName" Type="String">{escape(paper["journal"])}</Item>'
+                f'<Item Name="DOI" Type="String">{escape(paper["doi"])}</Item>'
+                f'</DocSum>'
+            )
+        return f'<?xml version="1.0" ?>\n<eSummaryResult>{"".join(docs)}</eSummaryResult>\n'.encode('utf-8')
+
+
+class MockBehavior:
+    """응답 지연, 무작위 오류, NCBI식 초당 호출 제한을 흉내 냄"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 rate_limit: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self._random = random.Random(seed)
+        self._window_start = 0.0
+        self._window_count = 0
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+
+    async def check(self) -> Optional[Response]:
+        """지연을 적용하고, 오류를 흉내 내야 하면 그 응답을 반환 (정상이면 None)"""
+        self.requests += 1
+
+        if self.rate_limit > 0:
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start, self._window_count = now, 0
+            self._window_count += 1
+            if self._window_count > self.rate_limit:
+                self.rate_limited += 1
+                return JSONResponse(
+                    status_code=429,
+                    content={'error': 'API rate limit exceeded', 'count': str(self._window_count),
+                             'limit': str(self.rate_limit)},
+                    headers={'Retry-After': '1'}
+                )
+
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self.error_rate > 0 and self._random.random() < self.error_rate:
+            self.errors += 1
+            status = self._random.choice((500, 502, 503))
+            return Response(status_code=status, content=f"mock error {status}")
+        return None
+
+    def stats(self) -> Dict:
+        return {'requests': self.requests, 'errors': self.errors, 'rate_limited': self.rate_limited}
+
+
+def mock_summary(messages: List[Dict]) -> str:
+    """요약 프롬프트의 제목을 넣은 고정 요약문"""
+    prompt = messages[-1].get('content', '') if messages else ''
+    match = re.search(r'Title: (.*)', prompt)
+    title = match.group(1).strip() if match else '여러 논문'
+    return (f"1. 핵심 내용: {title}에 대한 연구입니다.\n"
+            "2. 사용자 질문과의 관련성: 질문한 검사 수치나 질환과 관련된 결과를 다룹니다.\n"
+            "3. 주요 결과나 결론: (로컬 대역 서버의 고정 요약)\n"
+            "4. 임상적 의미: 담당 의료진과 상의하세요.")
+
+
+def create_app(fixtures_dir: str = None, eutils: MockBehavior = None, chat: MockBehavior = None,
+               token_delay: float = 0.0) -> FastAPI:
+    """대역 서버 앱 생성 (E-utilities는 /entrez/eutils, OpenAI는 /v1 아래)"""
+    corpus = FixtureCorpus(fixtures_dir)
+    eutils = eutils or MockBehavior()
+    chat = chat or MockBehavior()
+    history: Dict[str, List[str]] = {}
+    app = FastAPI(title="Mock E-utilities / OpenAI")
+
+    async def params_of(request: Request) -> Dict[str, str]:
+        """GET 쿼리와 POST 폼 파라미터를 합침 (긴 id 목록은 POST로 옴)"""
+        params = dict(request.query_params)
+        if request.method == 'POST':
+            params.update((key, value) for key, value in (await request.form()).items())
+        return params
+
+    def id_list(params: Dict[str, str]) -> List[str]:
+        if params.get('WebEnv'):
+            pmids = history.get(params['WebEnv'], [])
+            start = int(params.get('retstart', 0))
+            return pmids[start:start + int(params.get('retmax', 20))]
+        return [pmid.strip() for pmid in params.get('id', '').split(',') if pmid.strip()]
+
+    @app.api_route('/entrez/eutils/esearch.fcgi', methods=['GET', 'POST'])
+    async def esearch(request: Request):
+        error = await eutils.check()
+        if error is not None:
+            return error
+        params = await params_of(request)
+        pmids = corpus.search(params.get('term', ''))
+
+        if params.get('usehistory') == 'y':
+            webenv = f"MCID_mock_{len(history) + 1}"
+            history[webenv] = pmids
+            body = (f'<eSearchResult><Count>{len(pmids)}</Count><RetMax>0</RetMax><RetStart>0</RetStart>'
+                    f'<QueryKey>1</QueryKey><WebEnv>{webenv}</WebEnv><IdList/></eSearchResult>')
+        else:
+            retmax = int(params.get('retmax', 20))
+            ids = ''.join(f'<Id>{pmid}</Id>' for pmid in pmids[:retmax])
+            body = (f'<eSearchResult><Count>{len(pmids)}</Count><RetMax>{min(retmax, len(pmids))}</RetMax>'
+                    f'<RetStart>0</RetStart><IdList>{ids}</IdList></eSearchResult>')
+        return Response(content='<?xml version="1.0" ?>\n' + body, media_type=XML_MEDIA_TYPE)
+
+    @app.api_route('/entrez/eutils/efetch.fcgi', methods=['GET', 'POST'])
+    async def efetch(request: Request):
+        error = await eutils.check()
+        if error is not None:
+            return error
+        return Response(content=corpus.efetch_xml(id_list(await params_of(request))), media_type=XML_MEDIA_TYPE)
+
+    @app.api_route('/entrez/eutils/esummary.fcgi', methods=['GET', 'POST'])
+    async def esummary(request: Request):
+        error = await eutils.check()
+        if error is not None:
+            return error
+        return Response(content=corpus.esummary_xml(id_list(await params_of(request))), media_type=XML_MEDIA_TYPE)
+
+    @app.api_route('/entrez/eutils/elink.fcgi', methods=['GET', 'POST'])
+    async def elink(request: Request):
+        error = await eutils.check()
+        if error is not None:
+            return error
+        # id를 반복하면 PMID마다 LinkSet을 따로 돌려줌
+        values = request.query_params.getlist('id')
+        if request.method == 'POST':
+            values += (await request.form()).getlist('id')
+        pmids = [pmid.strip() for value in values for pmid in value.split(',') if pmid.strip()]
+        return Response(content=corpus.elink_xml(pmids), media_type=XML_MEDIA_TYPE)
+
+    @app.post('/v1/chat/completions')
+    async def chat_completions(request: Request):
+        # 지연 전에 본문을 읽어 둠 (시간 제한으로 클라이언트가 먼저 끊어도 ClientDisconnect가 나지 않도록)
+        body = await request.json()
+        error = await chat.check()
+        if error is not None:
+            return error
+        model = body.get('model', 'mock')
+        text = mock_summary(body.get('messages', []))
+        created = int(time.time())
+        completion_id = f"chatcmpl-mock{chat.requests}"
+
+        if not body.get('stream'):
+            return {
+                'id': completion_id, 'object': 'chat.completion', 'created': created, 'model': model,
+                'choices': [{'index': 0, 'finish_reason': 'stop',
+                             'message': {'role': 'assistant', 'content': text}}],
+                'usage': {'prompt_tokens': 0, 'completion_tokens': len(text.split()), 'total_tokens': len(text.split())}
+            }
+
+        async def events():
+            def chunk(delta: Dict, finish_reason: Optional[str] = None) -> str:
+                payload = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': created, 'model': model,
+                           'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]}
+                return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+            yield chunk({'role': 'assistant', 'content': ''})
+            for token in re.findall(r'\S+\s*', text):
+                if token_delay > 0:
+                    await asyncio.sleep(token_delay)
+                yield chunk({'content': token})
+            yield chunk({}, 'stop')
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type='text/event-stream')
+
+    @app.get('/mock/stats')
+    async def mock_stats():
+        return {'articles': len(corpus.articles), 'eutils': eutils.stats(), 'chat': chat.stats()}
+
+    return app
+
+
+@contextlib.contextmanager
+def serve_in_thread(app: FastAPI, host: str = '127.0.0.1', port: int = 0) -> Iterator[str]:
+    """테스트/벤치마크용으로 백그라운드 스레드에서 서버를 띄우고 기본 URL을 반환"""
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level='warning'))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    try:
+        while not server.started:
+            if not thread.is_alive():
+                raise RuntimeError("대역 서버를 시작하지 못했습니다")
+            time.sleep(0.01)
+        bound_port = server.servers[0].sockets[0].getsockname()[1]
+        yield f"http://{host}:{bound_port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+
+
+def record(query: str, max_results: int = 20, output: str = None) -> str:
+    """실제 NCBI에서 검색 결과의 efetch XML을 받아 fixture 파일로 저장"""
+    base = {'db': 'pubmed', 'tool': 'PubMedSearchApp'}
+    search = requests.get(f"{NCBI_EUTILS_URL}/esearch.fcgi", timeout=30,
+                          params={**base, 'term': query, 'retmax': max_results, 'retmode': 'xml'})
+    search.raise_for_status()
+    pmids = [elem.text for elem in ET.fromstring(search.content).findall('.//Id')]
+    if not pmids:
+        raise ValueError(f"검색 결과가 없습니다: {query}")
+
+    fetch = requests.get(f"{NCBI_EUTILS_URL}/efetch.fcgi", timeout=60,
+                         params={**base, 'id': ','.join(pmids), 'retmode': 'xml', 'rettype': 'abstract'})
+    fetch.raise_for_status()
+
+    slug = re.sub(r'[^a-z0-9]+', '_', query.lower()).strip('_') or 'recorded'
+    output = output or os.path.join(FIXTURES_DIR, f"efetch_{slug}.xml")
+    with open(output, 'wb') as f:
+        f.write(fetch.content)
+    return output
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'record':
+        parser = argparse.ArgumentParser(description="실제 NCBI 응답을 fixture로 녹화")
+        parser.add_argument('command')
+        parser.add_argument('query')
+        parser.add_argument('--max-results', type=int, default=20)
+        parser.add_argument('--output', default=None)
+        args = parser.parse_args()
+        print(f"💾 저장: {record(args.query, args.max_results, args.output)}")
+        return
+
+    parser = argparse.ArgumentParser(description="E-utilities / OpenAI 로컬 대역 서버")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fixtures', default=FIXTURES_DIR)
+    parser.add_argument('--latency', type=float, default=0.0, help="E-utilities 응답 지연(초)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="지연에 더하는 0~jitter초 무작위 값")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="E-utilities 5xx 응답 비율 (0~1)")
+    parser.add_argument('--rate-limit', type=float, default=0.0, help="초당 허용 호출 수 (초과 시 429, 0이면 제한 없음)")
+    parser.add_argument('--chat-latency', type=float, default=0.0, help="채팅 완성 첫 응답 지연(초)")
+    parser.add_argument('--chat-error-rate', type=float, default=0.0)
+    parser.add_argument('--token-delay', type=float, default=0.0, help="스트리밍 토큰 사이 지연(초)")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    app = create_app(
+        args.fixtures,
+        eutils=MockBehavior(args.latency, args.jitter, args.error_rate, args.rate_limit, args.seed),
+        chat=MockBehavior(args.chat_latency, 0.0, args.chat_error_rate, 0.0, args.seed),
+        token_delay=args.token_delay
+    )
+    print(f"🧪 대역 서버: http://{args.host}:{args.port}/entrez/eutils, http://{args.host}:{args.port}/v1")
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
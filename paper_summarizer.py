@@ -1,27 +1,53 @@
-from openai import OpenAI
-from typing import List, Dict, Optional
+from openai import OpenAI, AsyncOpenAI
+from concurrent.futures import ThreadPoolExecutor
+import queue
+from typing import List, Dict, Optional, AsyncIterator, Iterator, Tuple, Callable
 from config import config
+from summary_cache import SummaryCache, paper_summary_key, overall_summary_key
+from relevance_scorer import SummaryRelevanceScorer
+import tracing
+import asyncio
 import json
 
-class PaperSummarizer:
+class SummaryStreamInterrupted(Exception):
+    """요약 토큰을 일부 보낸 뒤 스트리밍이 끊김 (partial: 그때까지 보낸 텍스트)"""
+    
+    def __init__(self, partial: str):
+        super().__init__("요약 스트리밍이 중간에 끊겼습니다")
+        self.partial = partial
+
+class SummaryStreamFallback(Exception):
+    """첫 토큰 전에 OpenAI 요청이 실패해 기본 요약을 대신 보냄 (기본 요약은 이미 delta로 전달됨)"""
+    
     def __init__(self):
+        super().__init__("OpenAI 요약 대신 기본 요약을 보냈습니다")
+
+class PaperSummarizer:
+    # 프롬프트(_build_paper_messages/_build_overall_messages)를 바꾸면 올려서 기존 캐시를 무효화
+    PROMPT_VERSION = '1'
+    
+    # 키워드 집합을 미리 만들어 둔 관련성 점수 계산기 (인스턴스 간 공유)
+    relevance_scorer = SummaryRelevanceScorer()
+    
+    def __init__(self, summary_cache: Optional[SummaryCache] = None):
+        self.model = config.OPENAI_MODEL
+        self.summary_cache = summary_cache if summary_cache is not None else SummaryCache.default()
         if config.OPENAI_API_KEY:
-            self.client = OpenAI(api_key=config.OPENAI_API_KEY)
+            base_url = config.OPENAI_BASE_URL or None
+            self.client = OpenAI(api_key=config.OPENAI_API_KEY, base_url=base_url)
+            self.async_client = AsyncOpenAI(api_key=config.OPENAI_API_KEY, base_url=base_url)
             self.enabled = True
         else:
             self.client = None
+            self.async_client = None
             self.enabled = False
     
-    def summarize_paper(self, paper: Dict, user_query: str) -> Dict:
-        """단일 논문 요약"""
-        if not self.enabled:
-            return self._create_basic_summary(paper, user_query)
+    def _build_paper_messages(self, paper: Dict, user_query: str) -> List[Dict]:
+        """단일 논문 요약 프롬프트 구성"""
+        # 논문 제목과 초록을 결합
+        paper_content = f"Title: {paper.get('title', '')}\n\nAbstract: {paper.get('abstract', '')}"
         
-        try:
-            # 논문 제목과 초록을 결합
-            paper_content = f"Title: {paper.get('title', '')}\n\nAbstract: {paper.get('abstract', '')}"
-            
-            prompt = f"""
+        prompt = f"""
 다음 의학 논문을 사용자의 질문 "{user_query}"와 관련하여 한국어로 요약해주세요:
 
 {paper_content}
@@ -34,165 +60,442 @@ class PaperSummarizer:
 
 간결하고 이해하기 쉽게 작성해주세요.
 """
-
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "당신은 의학 논문을 요약하는 전문가입니다. 일반인도 이해할 수 있도록 명확하고 간결하게 설명해주세요."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=500,
-                temperature=0.3
-            )
+        return [
+            {"role": "system", "content": "당신은 의학 논문을 요약하는 전문가입니다. 일반인도 이해할 수 있도록 명확하고 간결하게 설명해주세요."},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _build_summary_result(self, paper: Dict, summary: str, user_query: str, fallback: bool = False) -> Dict:
+        """요약 결과 딕셔너리 구성 (fallback: OpenAI 오류로 기본 요약을 대신 넣었는지)"""
+        return {
+            'title': paper.get('title', ''),
+            'authors': paper.get('authors', []),
+            'journal': paper.get('journal', ''),
+            'publication_date': paper.get('publication_date', ''),
+            'pmid': paper.get('pmid', ''),
+            'pubmed_url': paper.get('pubmed_url', ''),
+            'doi': paper.get('doi', ''),
+            'ai_summary': summary,
+            'original_abstract': paper.get('abstract', ''),
+            'relevance_score': self._calculate_relevance_score(paper, user_query),
+            'summary_fallback': fallback
+        }
+    
+    def _cache_get(self, key: str) -> Optional[str]:
+        """요약 캐시 조회 (캐시 오류는 미스로 처리)"""
+        if self.summary_cache is None:
+            return None
+        try:
+            return self.summary_cache.get(key)
+        except Exception as e:
+            print(f"요약 캐시 조회 오류: {e}")
+            return None
+    
+    def _cache_put(self, key: str, summary: str):
+        """LLM이 생성한 요약만 캐시에 기록 (오류 시 대체 요약은 저장하지 않음)"""
+        if self.summary_cache is None or not summary:
+            return
+        try:
+            self.summary_cache.put(key, summary)
+        except Exception as e:
+            print(f"요약 캐시 기록 오류: {e}")
+    
+    def summarize_paper(self, paper: Dict, user_query: str) -> Dict:
+        """단일 논문 요약"""
+        if not self.enabled:
+            return self._create_basic_summary(paper, user_query)
+        
+        cache_key = paper_summary_key(paper, user_query, self.model, self.PROMPT_VERSION)
+        summary = self._cache_get(cache_key)
+        if summary is not None:
+            return self._build_summary_result(paper, summary, user_query)
+        
+        try:
+            with tracing.span('openai.paper_summary', kind='openai'):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._build_paper_messages(paper, user_query),
+                    max_tokens=500,
+                    temperature=0.3,
+                    timeout=config.SUMMARY_TIMEOUT
+                )
             
             summary = response.choices[0].message.content
+            self._cache_put(cache_key, summary)
             
-            return {
-                'title': paper.get('title', ''),
-                'authors': paper.get('authors', []),
-                'journal': paper.get('journal', ''),
-                'publication_date': paper.get('publication_date', ''),
-                'pmid': paper.get('pmid', ''),
-                'pubmed_url': paper.get('pubmed_url', ''),
-                'doi': paper.get('doi', ''),
-                'ai_summary': summary,
-                'original_abstract': paper.get('abstract', ''),
-                'relevance_score': self._calculate_relevance_score(paper, user_query)
-            }
+            return self._build_summary_result(paper, summary, user_query)
             
         except Exception as e:
             print(f"요약 생성 오류: {e}")
+            return self._create_basic_summary(paper, user_query, fallback=True)
+    
+    async def summarize_paper_async(self, paper: Dict, user_query: str) -> Dict:
+        """단일 논문 요약 (비동기)"""
+        if not self.enabled:
             return self._create_basic_summary(paper, user_query)
+        
+        cache_key = paper_summary_key(paper, user_query, self.model, self.PROMPT_VERSION)
+        summary = await asyncio.to_thread(self._cache_get, cache_key)
+        if summary is not None:
+            return self._build_summary_result(paper, summary, user_query)
+        
+        try:
+            with tracing.span('openai.paper_summary', kind='openai'):
+                response = await self.async_client.chat.completions.create(
+                    model=self.model,
+                    messages=self._build_paper_messages(paper, user_query),
+                    max_tokens=500,
+                    temperature=0.3,
+                    timeout=config.SUMMARY_TIMEOUT
+                )
+            
+            summary = response.choices[0].message.content
+            await asyncio.to_thread(self._cache_put, cache_key, summary)
+            
+            return self._build_summary_result(paper, summary, user_query)
+            
+        except Exception as e:
+            print(f"요약 생성 오류: {e}")
+            return self._create_basic_summary(paper, user_query, fallback=True)
     
     def summarize_papers(self, papers: List[Dict], user_query: str) -> List[Dict]:
-        """여러 논문 요약"""
-        summarized_papers = []
+        """여러 논문 요약 (최대 SUMMARY_MAX_CONCURRENCY개씩 스레드로 동시 요청)"""
+        if not papers:
+            return []
         
-        for paper in papers:
-            summarized_paper = self.summarize_paper(paper, user_query)
-            summarized_papers.append(summarized_paper)
+        max_workers = max(1, min(config.SUMMARY_MAX_CONCURRENCY, len(papers)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # map은 입력 순서대로 결과를 돌려주므로 완료 순서와 무관하게 결과가 결정적
+            summarize = tracing.bind(lambda paper: self.summarize_paper(paper, user_query))
+            summarized_papers = list(executor.map(summarize, papers))
         
         # 관련성 점수로 정렬
         summarized_papers.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
         
         return summarized_papers
     
-    def _create_basic_summary(self, paper: Dict, user_query: str) -> Dict:
-        """OpenAI API가 없을 때 기본 요약 생성"""
-        # 기본적인 논문 정보 정리
-        abstract = paper.get('abstract', '')
+    async def summarize_papers_async(self, papers: List[Dict], user_query: str) -> List[Dict]:
+        """여러 논문 요약 (비동기, 최대 SUMMARY_MAX_CONCURRENCY개 동시 요청)"""
+        # 완료 순서와 무관하게 입력 순서대로 결과를 모음
+        summarized_papers = [None] * len(papers)
+        async for index, summarized_paper in self.iter_summaries_async(papers, user_query):
+            summarized_papers[index] = summarized_paper
+        
+        # 관련성 점수로 정렬
+        summarized_papers.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
+        
+        return summarized_papers
+    
+    async def iter_summaries_async(self, papers: List[Dict], user_query: str) -> AsyncIterator[Tuple[int, Dict]]:
+        """논문들을 동시에 요약하며 완료되는 순서대로 (입력 인덱스, 요약 결과) 반환"""
+        semaphore = asyncio.Semaphore(max(1, config.SUMMARY_MAX_CONCURRENCY))
+        
+        async def summarize(index: int, paper: Dict) -> Tuple[int, Dict]:
+            async with semaphore:
+                return index, await self.summarize_paper_async(paper, user_query)
+        
+        tasks = [asyncio.ensure_future(summarize(index, paper)) for index, paper in enumerate(papers)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # 소비자가 중간에 멈추면(클라이언트 연결 종료 등) 남은 요약 요청 취소
+            for task in tasks:
+                task.cancel()
+    
+    def stream_paper_summary(self, paper: Dict, user_query: str) -> Iterator[str]:
+        """단일 논문 요약을 토큰 단위로 스트리밍 (캐시 적중/기본 요약은 한 번에 반환)"""
+        if not self.enabled:
+            yield self._basic_summary_text(paper)
+            return
+        
+        yield from self._stream_completion(
+            self._build_paper_messages(paper, user_query), 500,
+            paper_summary_key(paper, user_query, self.model, self.PROMPT_VERSION),
+            lambda: self._basic_summary_text(paper), 'openai.paper_summary'
+        )
+    
+    async def stream_paper_summary_async(self, paper: Dict, user_query: str) -> AsyncIterator[str]:
+        """단일 논문 요약을 토큰 단위로 스트리밍 (비동기)"""
+        if not self.enabled:
+            yield self._basic_summary_text(paper)
+            return
+        
+        async for delta in self._astream_completion(
+            self._build_paper_messages(paper, user_query), 500,
+            paper_summary_key(paper, user_query, self.model, self.PROMPT_VERSION),
+            lambda: self._basic_summary_text(paper), 'openai.paper_summary'
+        ):
+            yield delta
+    
+    def stream_summaries(self, papers: List[Dict], user_query: str) -> Iterator[Tuple[int, str, object]]:
+        """여러 논문을 동시에 스트리밍 요약
+        
+        (인덱스, 'delta', 토큰)을 도착하는 대로 보내고, 논문 하나가 끝나면
+        (인덱스, 'done', 요약 결과)를 보냅니다. 스트리밍이 중간에 끊긴 요약은
+        결과의 incomplete가, OpenAI 오류로 기본 요약을 대신 보낸 경우는 summary_fallback이 True입니다.
+        """
+        if not papers:
+            return
         
+        events = queue.Queue()
+        
+        def summarize(index: int, paper: Dict):
+            chunks = []
+            incomplete = fallback = False
+            try:
+                for delta in self.stream_paper_summary(paper, user_query):
+                    chunks.append(delta)
+                    events.put((index, 'delta', delta))
+            except SummaryStreamInterrupted:
+                incomplete = True
+            except SummaryStreamFallback:
+                fallback = True
+            finally:
+                result = self._build_summary_result(paper, ''.join(chunks), user_query, fallback)
+                events.put((index, 'done', {**result, 'incomplete': incomplete}))
+        
+        executor = ThreadPoolExecutor(max_workers=max(1, min(config.SUMMARY_MAX_CONCURRENCY, len(papers))))
+        try:
+            for index, paper in enumerate(papers):
+                executor.submit(tracing.bind(summarize), index, paper)
+            
+            remaining = len(papers)
+            while remaining:
+                event = events.get()
+                if event[1] == 'done':
+                    remaining -= 1
+                yield event
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    async def stream_summaries_async(self, papers: List[Dict], user_query: str) -> AsyncIterator[Tuple[int, str, object]]:
+        """stream_summaries의 비동기 버전"""
+        if not papers:
+            return
+        
+        events = asyncio.Queue()
+        semaphore = asyncio.Semaphore(max(1, config.SUMMARY_MAX_CONCURRENCY))
+        
+        async def summarize(index: int, paper: Dict):
+            chunks = []
+            incomplete = fallback = False
+            async with semaphore:
+                try:
+                    async for delta in self.stream_paper_summary_async(paper, user_query):
+                        chunks.append(delta)
+                        events.put_nowait((index, 'delta', delta))
+                except SummaryStreamInterrupted:
+                    incomplete = True
+                except SummaryStreamFallback:
+                    fallback = True
+                finally:
+                    result = self._build_summary_result(paper, ''.join(chunks), user_query, fallback)
+                    events.put_nowait((index, 'done', {**result, 'incomplete': incomplete}))
+        
+        tasks = [asyncio.ensure_future(summarize(index, paper)) for index, paper in enumerate(papers)]
+        try:
+            remaining = len(papers)
+            while remaining:
+                event = await events.get()
+                if event[1] == 'done':
+                    remaining -= 1
+                yield event
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    def _stream_completion(self, messages: List[Dict], max_tokens: int, cache_key: str,
+                           fallback: Callable[[], str], span_name: str) -> Iterator[str]:
+        """stream=True 채팅 완성 토큰을 그대로 전달하고, 끝까지 받으면 전체 텍스트를 캐시
+        
+        첫 토큰 전에 실패하면 기본 요약을 보낸 뒤 SummaryStreamFallback을, 일부를 보낸 뒤 끊기면
+        SummaryStreamInterrupted를 발생시킵니다.
+        """
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        chunks = []
+        try:
+            with tracing.span(span_name, kind='openai', stream=True):
+                stream = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=0.3,
+                    timeout=config.SUMMARY_TIMEOUT,
+                    stream=True
+                )
+                for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        chunks.append(delta)
+                        yield delta
+        
+        except Exception as e:
+            print(f"요약 스트리밍 오류: {e}")
+            # 아직 아무것도 보내지 않았다면 기본 요약으로 대체하고 알림 (일부만 받은 요약은 캐시하지 않음)
+            if not chunks:
+                yield fallback()
+                raise SummaryStreamFallback() from e
+            # 이미 보낸 앞부분이 완성된 요약처럼 보이지 않도록 소비자에게 알림
+            raise SummaryStreamInterrupted(''.join(chunks)) from e
+        
+        self._cache_put(cache_key, ''.join(chunks))
+    
+    async def _astream_completion(self, messages: List[Dict], max_tokens: int, cache_key: str,
+                                  fallback: Callable[[], str], span_name: str) -> AsyncIterator[str]:
+        """_stream_completion의 비동기 버전"""
+        cached = await asyncio.to_thread(self._cache_get, cache_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        chunks = []
+        try:
+            with tracing.span(span_name, kind='openai', stream=True):
+                stream = await self.async_client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=0.3,
+                    timeout=config.SUMMARY_TIMEOUT,
+                    stream=True
+                )
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        chunks.append(delta)
+                        yield delta
+        
+        except Exception as e:
+            print(f"요약 스트리밍 오류: {e}")
+            if not chunks:
+                yield fallback()
+                raise SummaryStreamFallback() from e
+            raise SummaryStreamInterrupted(''.join(chunks)) from e
+        
+        await asyncio.to_thread(self._cache_put, cache_key, ''.join(chunks))
+    
+    def _create_basic_summary(self, paper: Dict, user_query: str, fallback: bool = False) -> Dict:
+        """OpenAI API가 없거나 (fallback=True) 요청이 실패했을 때 기본 요약 생성"""
+        return self._build_summary_result(paper, self._basic_summary_text(paper), user_query, fallback)
+    
+    def _basic_summary_text(self, paper: Dict) -> str:
+        """초록 앞부분으로 만든 기본 요약 문장"""
         # 초록을 문장 단위로 나누고 처음 2-3문장만 사용
-        sentences = abstract.split('. ')[:3]
+        sentences = paper.get('abstract', '').split('. ')[:3]
         basic_summary = '. '.join(sentences)
         
         if basic_summary and not basic_summary.endswith('.'):
             basic_summary += '.'
         
-        return {
-            'title': paper.get('title', ''),
-            'authors': paper.get('authors', []),
-            'journal': paper.get('journal', ''),
-            'publication_date': paper.get('publication_date', ''),
-            'pmid': paper.get('pmid', ''),
-            'pubmed_url': paper.get('pubmed_url', ''),
-            'doi': paper.get('doi', ''),
-            'ai_summary': basic_summary or "요약을 생성할 수 없습니다.",
-            'original_abstract': abstract,
-            'relevance_score': self._calculate_relevance_score(paper, user_query)
-        }
+        return basic_summary or "요약을 생성할 수 없습니다."
     
     def _calculate_relevance_score(self, paper: Dict, user_query: str) -> float:
         """논문과 사용자 질문의 관련성 점수 계산 (개선된 버전)"""
-        title = paper.get('title', '').lower()
-        abstract = paper.get('abstract', '').lower()
-        journal = paper.get('journal', '').lower()
-        
-        # 즉시 제외 패턴들 (명백히 비의료적인 것만)
-        immediate_exclusion_patterns = [
-            'autophagy in plants', 'plant autophagy', 'vegetable growth models',
-            'health system review', 'luxembourg health', 'north macedonia health',
-            'research advance on vegetable', 'agricultural research', 'plant biology',
-            'veterinary medicine', 'animal disease', 'livestock health'
-        ]
-        
-        # 점수 계산
-        score = 0
-        content = (title + ' ' + abstract).lower()
-        
-        # 1. 즉시 제외 패턴 확인 (최우선)
-        for pattern in immediate_exclusion_patterns:
-            if pattern in content:
-                return 0.0  # 즉시 제외
-        
-        # 2. 사용자 쿼리와의 직접 매칭 (높은 점수)
-        query_words = [word.lower().strip() for word in user_query.split() if len(word.strip()) > 2]
-        for word in query_words:
-            if word in title:
-                score += 5  # 제목에서 매칭되면 높은 점수
-            elif word in abstract:
-                score += 2  # 초록에서 매칭되면 중간 점수
-        
-        # 3. 의료 키워드 점수 (기본 점수)
-        medical_keywords = [
-            'patient', 'clinical', 'treatment', 'therapy', 'diagnosis', 'therapeutic',
-            'medical', 'hospital', 'surgery', 'drug', 'medication', 'medicine',
-            'disease', 'disorder', 'syndrome', 'infection', 'cancer', 'tumor',
-            'cardiovascular', 'diabetes', 'hypertension', 'inflammation',
-            'pharmacological', 'pathology', 'symptoms', 'prognosis', 'mortality',
-            'intervention', 'randomized', 'trial', 'efficacy', 'safety', 'outcome',
-            'healthcare', 'health care', 'medical care', 'patient care', 'nursing',
-            'physician', 'doctor', 'nurse', 'clinic', 'emergency', 'intensive care',
-            'blood', 'serum', 'plasma', 'laboratory', 'biomarker', 'screening',
-            'hemoglobin', 'anemia', 'dizziness', 'fatigue', 'weakness'  # 헤모글로빈 관련 추가
-        ]
+        return float(self.relevance_scorer.score([paper], user_query)[0])
+    
+    def generate_overall_summary(self, papers: List[Dict], user_query: str) -> Tuple[str, bool]:
+        """전체 검색 결과에 대한 종합 요약
         
-        for keyword in medical_keywords:
-            if keyword in content:
-                score += 1
+        (요약, fallback) 반환 - fallback은 OpenAI 오류로 기본 요약을 대신 돌려줬는지 여부
+        """
+        if not self.enabled or not papers:
+            return self._create_basic_overall_summary(papers, user_query), False
         
-        # 4. 한국어 의료 용어 (추가 점수)
-        korean_medical_terms = [
-            '치료', '진단', '환자', '질병', '질환', '증상', '검사', '수치',
-            '헤모글로빈', '빈혈', '어지러움', '피로', '무력감'
-        ]
+        cache_key = overall_summary_key(papers[:3], user_query, self.model, self.PROMPT_VERSION)
+        summary = self._cache_get(cache_key)
+        if summary is not None:
+            return summary, False
         
-        for term in korean_medical_terms:
-            if term in user_query:
-                score += 3  # 한국어 의료 용어 매칭시 높은 점수
+        try:
+            with tracing.span('openai.overall_summary', kind='openai'):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._build_overall_messages(papers, user_query),
+                    max_tokens=400,
+                    temperature=0.3,
+                    timeout=config.SUMMARY_TIMEOUT
+                )
+            
+            summary = response.choices[0].message.content
+            self._cache_put(cache_key, summary)
+            return summary, False
+            
+        except Exception as e:
+            print(f"종합 요약 생성 오류: {e}")
+            return self._create_basic_overall_summary(papers, user_query), True
+    
+    async def generate_overall_summary_async(self, papers: List[Dict], user_query: str) -> Tuple[str, bool]:
+        """전체 검색 결과에 대한 종합 요약 (비동기)
         
-        # 5. 비의료 키워드 감점 (핵심만)
-        non_medical_keywords = [
-            'autophagy in plants', 'plant biology', 'agricultural research',
-            'health system review', 'veterinary medicine', 'livestock',
-            'narcissism', 'political', 'social media', 'artificial intelligence'
-        ]
+        (요약, fallback) 반환 - fallback은 OpenAI 오류로 기본 요약을 대신 돌려줬는지 여부
+        """
+        if not self.enabled or not papers:
+            return self._create_basic_overall_summary(papers, user_query), False
         
-        for keyword in non_medical_keywords:
-            if keyword in content:
-                score -= 3
+        cache_key = overall_summary_key(papers[:3], user_query, self.model, self.PROMPT_VERSION)
+        summary = await asyncio.to_thread(self._cache_get, cache_key)
+        if summary is not None:
+            return summary, False
         
-        # 6. 최종 점수 정규화 (0~1 범위로)
-        max_possible_score = 30  # 예상 최대 점수
-        normalized_score = max(0.0, min(1.0, score / max_possible_score))
+        try:
+            with tracing.span('openai.overall_summary', kind='openai'):
+                response = await self.async_client.chat.completions.create(
+                    model=self.model,
+                    messages=self._build_overall_messages(papers, user_query),
+                    max_tokens=400,
+                    temperature=0.3,
+                    timeout=config.SUMMARY_TIMEOUT
+                )
+            
+            summary = response.choices[0].message.content
+            await asyncio.to_thread(self._cache_put, cache_key, summary)
+            return summary, False
+            
+        except Exception as e:
+            print(f"종합 요약 생성 오류: {e}")
+            return self._create_basic_overall_summary(papers, user_query), True
+    
+    def stream_overall_summary(self, papers: List[Dict], user_query: str) -> Iterator[str]:
+        """종합 요약을 토큰 단위로 스트리밍 (기본 요약으로 대체하면 SummaryStreamFallback, 일부를 보낸 뒤 끊기면 SummaryStreamInterrupted 발생)"""
+        if not self.enabled or not papers:
+            yield self._create_basic_overall_summary(papers, user_query)
+            return
         
-        return normalized_score
+        yield from self._stream_completion(
+            self._build_overall_messages(papers, user_query), 400,
+            overall_summary_key(papers[:3], user_query, self.model, self.PROMPT_VERSION),
+            lambda: self._create_basic_overall_summary(papers, user_query), 'openai.overall_summary'
+        )
     
-    def generate_overall_summary(self, papers: List[Dict], user_query: str) -> str:
-        """전체 검색 결과에 대한 종합 요약"""
+    async def stream_overall_summary_async(self, papers: List[Dict], user_query: str) -> AsyncIterator[str]:
+        """종합 요약을 토큰 단위로 스트리밍 (비동기)"""
         if not self.enabled or not papers:
-            return self._create_basic_overall_summary(papers, user_query)
+            yield self._create_basic_overall_summary(papers, user_query)
+            return
         
-        try:
-            # 상위 3개 논문의 제목과 요약 정보 수집
-            top_papers = papers[:3]
-            papers_info = ""
-            
-            for i, paper in enumerate(top_papers, 1):
-                papers_info += f"{i}. {paper.get('title', '')}\n"
-                papers_info += f"   요약: {paper.get('ai_summary', '')[:200]}...\n\n"
-            
-            prompt = f"""
+        async for delta in self._astream_completion(
+            self._build_overall_messages(papers, user_query), 400,
+            overall_summary_key(papers[:3], user_query, self.model, self.PROMPT_VERSION),
+            lambda: self._create_basic_overall_summary(papers, user_query), 'openai.overall_summary'
+        ):
+            yield delta
+    
+    def _build_overall_messages(self, papers: List[Dict], user_query: str) -> List[Dict]:
+        """종합 요약 프롬프트 구성"""
+        # 상위 3개 논문의 제목과 요약 정보 수집
+        top_papers = papers[:3]
+        papers_info = ""
+        
+        for i, paper in enumerate(top_papers, 1):
+            papers_info += f"{i}. {paper.get('title', '')}\n"
+            papers_info += f"   요약: {paper.get('ai_summary', '')[:200]}...\n\n"
+        
+        prompt = f"""
 사용자가 "{user_query}"에 대해 질문했고, 다음과 같은 관련 논문들을 찾았습니다:
 
 {papers_info}
@@ -206,22 +509,10 @@ class PaperSummarizer:
 
 300자 이내로 간결하게 작성해주세요.
 """
-
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "당신은 의학 연구 동향을 분석하는 전문가입니다."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=400,
-                temperature=0.3
-            )
-            
-            return response.choices[0].message.content
-            
-        except Exception as e:
-            print(f"종합 요약 생성 오류: {e}")
-            return self._create_basic_overall_summary(papers, user_query)
+        return [
+            {"role": "system", "content": "당신은 의학 연구 동향을 분석하는 전문가입니다."},
+            {"role": "user", "content": prompt}
+        ]
     
     def _create_basic_overall_summary(self, papers: List[Dict], user_query: str) -> str:
         """기본 종합 요약"""
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+PubMed baseline 일괄 적재
+
+NCBI가 배포하는 baseline 파일(pubmed25n0001.xml.gz 등)을 efetch와 같은 스트리밍 파서로 읽어
+로컬 논문 저장소(ArticleStore)와 BM25 색인(SearchIndex)에 적재합니다.
+파일 단위로 프로세스 풀에서 병렬 처리하고, 각 워커는 batch-size개씩만 메모리에 올립니다.
+완료한 파일은 적재 기록(data/ingest.db)에 남기므로 중단 후 다시 실행하면 남은 파일만 처리합니다.
+
+--update는 매일 나오는 updatefiles를 이름(=발행) 순서대로 하나씩 적용합니다.
+파일에 담긴 논문만 덮어쓰고 DeleteCitation의 PMID를 지우므로, 전체를 다시 색인하지 않습니다.
+색인 압축은 전체 포스팅을 다시 쓰므로 업데이트 때는 하지 않고 --compact를 줄 때만 합니다.
+
+    python pubmed_ingest.py baseline/*.xml.gz --workers 4
+    python pubmed_ingest.py baseline/ --batch-size 500 --no-resume
+    python pubmed_ingest.py --update updatefiles/
+    python pubmed_ingest.py --update updatefiles/ --compact
+"""
+
+import argparse
+import glob
+import gzip
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional
+
+from config import config
+from article_store import ArticleStore
+from pubmed_search import PaperXMLStreamParser, iter_papers_xml
+from search_index import SearchIndex
+
+
+class IngestLog:
+    """적재를 마친 파일 기록 (파일 이름 + 크기로 같은 파일인지 판단)"""
+
+    def __init__(self, path: str = None):
+        self.path = path or config.INGEST_LOG_PATH
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS ingested_files (
+                name TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                papers INTEGER NOT NULL,
+                deleted INTEGER NOT NULL DEFAULT 0,
+                completed_at REAL NOT NULL
+            )
+        ''')
+        self._conn.commit()
+
+    def is_done(self, path: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT size FROM ingested_files WHERE name = ?', (os.path.basename(path),)
+            ).fetchone()
+        return row is not None and row[0] == os.path.getsize(path)
+
+    def mark_done(self, path: str, papers: int, deleted: int = 0):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO ingested_files (name, size, papers, deleted, completed_at) VALUES (?, ?, ?, ?, ?)',
+                (os.path.basename(path), os.path.getsize(path), papers, deleted, time.time())
+            )
+            self._conn.commit()
+
+    def done_files(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute('SELECT name FROM ingested_files ORDER BY name')]
+
+    def last_file(self) -> Optional[str]:
+        """마지막(이름순)으로 적용한 파일 이름"""
+        with self._lock:
+            row = self._conn.execute('SELECT MAX(name) FROM ingested_files').fetchone()
+        return row[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def expand_paths(paths: List[str]) -> List[str]:
+    """파일/디렉터리/글롭 패턴을 *.xml.gz 파일 목록으로 (이름순)"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(glob.glob(os.path.join(path, '*.xml.gz')))
+        elif any(char in path for char in '*?['):
+            files.extend(glob.glob(path))
+        else:
+            files.append(path)
+    return sorted(dict.fromkeys(files), key=os.path.basename)
+
+
+def iter_paper_batches(path: str, batch_size: int, parser: PaperXMLStreamParser = None) -> Iterator[List[Dict]]:
+    """gz 파일을 풀면서 스트리밍 파싱해 batch_size개씩 반환 (파일 전체를 메모리에 올리지 않음)"""
+    batch = []
+    with gzip.open(path, 'rb') as source:
+        for paper in iter_papers_xml(source, parser=parser):
+            batch.append(paper)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def ingest_file(path: str, store_path: Optional[str], index_path: Optional[str], batch_size: int) -> Dict:
+    """파일 하나를 저장소와 색인에 적재하고 DeleteCitation의 PMID를 삭제 (프로세스 풀 워커에서도 실행)"""
+    start = time.perf_counter()
+    # 로컬 미러 데이터는 만료/개수 제한 없이 보관, 색인 압축은 필요할 때 따로 한 번만
+    store = ArticleStore(path=store_path, ttl=0, max_entries=0) if store_path else None
+    index = SearchIndex(path=index_path, compact_interval=0) if index_path else None
+    parser = PaperXMLStreamParser()
+    papers = 0
+
+    try:
+        # 파일에 담긴 PMID만 덮어씀 (색인은 기존 문서를 지우고 해당 논문만 다시 색인)
+        for batch in iter_paper_batches(path, batch_size, parser):
+            if store is not None:
+                store.put_many(batch, ttl=0)
+            if index is not None:
+                index.add_papers(batch, replace=True)
+            papers += len(batch)
+
+        deleted = list(dict.fromkeys(parser.deleted_pmids))
+        for offset in range(0, len(deleted), batch_size):
+            chunk = deleted[offset:offset + batch_size]
+            if store is not None:
+                store.delete_many(chunk)
+            if index is not None:
+                index.delete(chunk)
+    finally:
+        if store is not None:
+            store.close()
+        if index is not None:
+            index.close()
+
+    return {'file': path, 'papers': papers, 'deleted': len(deleted),
+            'seconds': round(time.perf_counter() - start, 2)}
+
+
+def _compact_index(index_path: str):
+    """파일마다 쌓인 포스팅 블록을 용어별로 합치고 삭제된 문서를 정리"""
+    index = SearchIndex(path=index_path, compact_interval=0)
+    try:
+        index.compact()
+    finally:
+        index.close()
+
+
+def ingest(paths: List[str], workers: int = None, batch_size: int = None, resume: bool = True,
+           store_path: Optional[str] = None, index_path: Optional[str] = None,
+           log_path: Optional[str] = None) -> Dict:
+    """baseline 파일들을 병렬 적재하고 요약 통계 반환"""
+    workers = workers or config.INGEST_WORKERS
+    batch_size = batch_size or config.INGEST_BATCH_SIZE
+    store_path = store_path or config.ARTICLE_CACHE_PATH
+    index_path = index_path or config.SEARCH_INDEX_PATH
+
+    log = IngestLog(log_path)
+    files = expand_paths(paths)
+    pending = [path for path in files if not (resume and log.is_done(path))]
+    print(f"📦 적재 대상 {len(pending)}개 파일 (전체 {len(files)}개, 이미 완료 {len(files) - len(pending)}개)")
+
+    total_papers = 0
+    failed = []
+    start = time.perf_counter()
+
+    try:
+        if pending:
+            # 워커는 파일 몇 개마다 새로 띄워 파서/SQLite 캐시가 쌓이지 않도록 함
+            with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=config.INGEST_TASKS_PER_WORKER) as executor:
+                futures = {
+                    executor.submit(ingest_file, path, store_path, index_path, batch_size): path
+                    for path in pending
+                }
+                for future in as_completed(futures):
+                    path = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"❌ {os.path.basename(path)} 적재 실패: {e}")
+                        failed.append(path)
+                        continue
+                    log.mark_done(path, result['papers'], result['deleted'])
+                    total_papers += result['papers']
+                    print(f"✅ {os.path.basename(path)}: 논문 {result['papers']}개 ({result['seconds']}초)")
+
+            _compact_index(index_path)
+    finally:
+        log.close()
+
+    return {
+        'files': len(pending) - len(failed),
+        'skipped': len(files) - len(pending),
+        'failed': failed,
+        'papers': total_papers,
+        'seconds': round(time.perf_counter() - start, 2)
+    }
+
+
+def update(paths: List[str], batch_size: int = None, compact: bool = False,
+           store_path: Optional[str] = None, index_path: Optional[str] = None,
+           log_path: Optional[str] = None) -> Dict:
+    """updatefiles를 이름 순서대로 하나씩 적용 (같은 PMID의 최신 버전이 남도록 병렬 처리하지 않음)"""
+    batch_size = batch_size or config.INGEST_BATCH_SIZE
+    store_path = store_path or config.ARTICLE_CACHE_PATH
+    index_path = index_path or config.SEARCH_INDEX_PATH
+
+    log = IngestLog(log_path)
+    files = expand_paths(paths)
+    last = log.last_file()
+    pending, out_of_order = [], []
+    for path in files:
+        if log.is_done(path):
+            continue
+        # 이미 적용한 파일보다 앞선 파일을 나중에 적용하면 최신 레코드를 옛 버전으로 덮어씀
+        if last is not None and os.path.basename(path) < last:
+            out_of_order.append(path)
+        else:
+            pending.append(path)
+    for path in out_of_order:
+        print(f"⚠️ {os.path.basename(path)}: 마지막 적용 파일({last})보다 앞선 파일이라 건너뜀")
+    print(f"🔄 적용 대상 {len(pending)}개 파일 (전체 {len(files)}개)")
+
+    total_papers = 0
+    total_deleted = 0
+    failed = []
+    applied = 0
+    start = time.perf_counter()
+
+    try:
+        for path in pending:
+            try:
+                result = ingest_file(path, store_path, index_path, batch_size)
+            except Exception as e:
+                # 순서가 중요하므로 실패한 파일 뒤로는 적용하지 않음 (다음 실행에서 이 파일부터 재개)
+                print(f"❌ {os.path.basename(path)} 적용 실패: {e}")
+                failed.append(path)
+                break
+            log.mark_done(path, result['papers'], result['deleted'])
+            applied += 1
+            total_papers += result['papers']
+            total_deleted += result['deleted']
+            print(f"✅ {os.path.basename(path)}: 갱신 {result['papers']}개, 삭제 {result['deleted']}개 ({result['seconds']}초)")
+
+        if compact:
+            _compact_index(index_path)
+    finally:
+        log.close()
+
+    return {
+        'files': applied,
+        'skipped': len(files) - len(pending),
+        'failed': failed,
+        'papers': total_papers,
+        'deleted': total_deleted,
+        'seconds': round(time.perf_counter() - start, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PubMed baseline 일괄 적재")
+    parser.add_argument('paths', nargs='+', help="*.xml.gz 파일, 디렉터리 또는 글롭 패턴")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--batch-size', type=int, default=None)
+    parser.add_argument('--no-resume', action='store_true', help="적재 기록을 무시하고 모든 파일을 다시 처리")
+    parser.add_argument('--update', action='store_true', help="updatefiles를 순서대로 적용 (수정/삭제 반영)")
+    parser.add_argument('--compact', action='store_true', help="업데이트 후 색인 압축")
+    parser.add_argument('--store-path', default=None)
+    parser.add_argument('--index-path', default=None)
+    parser.add_argument('--log-path', default=None)
+    args = parser.parse_args()
+
+    paths = dict(store_path=args.store_path, index_path=args.index_path, log_path=args.log_path)
+    if args.update:
+        result = update(args.paths, batch_size=args.batch_size, compact=args.compact, **paths)
+        print(f"\n📚 완료: 파일 {result['files']}개, 갱신 {result['papers']}개, 삭제 {result['deleted']}개, "
+              f"건너뜀 {result['skipped']}개, 실패 {len(result['failed'])}개 ({result['seconds']}초)")
+        return
+
+    result = ingest(args.paths, workers=args.workers, batch_size=args.batch_size, resume=not args.no_resume, **paths)
+    print(f"\n📚 완료: 파일 {result['files']}개, 논문 {result['papers']}개, "
+          f"건너뜀 {result['skipped']}개, 실패 {len(result['failed'])}개 ({result['seconds']}초)")
+
+
+if __name__ == "__main__":
+    main()
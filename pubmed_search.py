@@ -1,157 +1,752 @@
 import requests
+from requests.adapters import HTTPAdapter
 import xml.etree.ElementTree as ET
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Iterator, Iterable, BinaryIO, Callable, Tuple, TypeVar
 from config import config
+from article_store import ArticleStore
+from search_index import SearchIndex
+from rate_limiter import TokenBucket, get_rate_limiter
+from resilience import RetryPolicy, CircuitBreaker, parse_retry_after
+from single_flight import SingleFlight
+import os
 import re
+import threading
 import time
+import tracing
 
-class PubMedSearcher:
+T = TypeVar('T')
+
+def eutils_endpoint(url: str) -> str:
+    """E-utilities URL → span 이름에 쓰는 유틸리티 이름 (예: .../efetch.fcgi → efetch)"""
+    return os.path.basename(url.rstrip('/')).split('.')[0]
+
+class PubMedError(Exception):
+    """E-utilities 호출 실패 ('결과 없음'과 구분하기 위한 기본 예외)"""
+    retryable = False
+
+
+class PubMedHTTPError(PubMedError):
+    """E-utilities가 오류 상태 코드로 응답"""
+    
+    def __init__(self, status_code: int, message: str = '', retry_after: Optional[float] = None):
+        super().__init__(message or f"E-utilities HTTP {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.retryable = status_code in RetryPolicy.RETRYABLE_STATUS
+
+
+class PubMedTimeoutError(PubMedError):
+    """E-utilities 응답 시간 초과"""
+    retryable = True
+
+
+class PubMedConnectionError(PubMedError):
+    """E-utilities 연결 실패 또는 응답 수신 중 연결 끊김"""
+    retryable = True
+
+
+class PubMedResponseError(PubMedError):
+    """E-utilities 응답을 해석할 수 없음 (잘못된 XML 등)"""
+
+
+class PubMedUnavailableError(PubMedError):
+    """서킷 브레이커가 열려 있어 호출을 보내지 않음 (NCBI 장애 중 빠른 실패)"""
+    
+    def __init__(self, retry_after: float = 0.0):
+        super().__init__(f"PubMed 서비스를 일시적으로 사용할 수 없습니다 ({retry_after:.0f}초 후 재시도)")
+        self.retry_after = retry_after
+
+
+# efetch 응답 스트리밍 시 한 번에 읽을 바이트 수
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# 관련 논문 상세 정보를 efetch할 때 한 요청에 넣는 PMID 수 (GET URL 길이 제한)
+RELATED_FETCH_CHUNK = 200
+
+
+class PaperXMLStreamParser:
+    """efetch XML을 청크 단위로 받아 PubmedArticle이 끝날 때마다 논문 정보를 반환하는 파서
+
+    완성된 PubmedArticle은 추출 직후 트리에서 제거하므로, 배치에 논문이
+    10개든 10,000개든 메모리 사용량은 논문 한 편 크기 수준으로 유지됩니다.
+    updatefiles의 DeleteCitation에 나온 PMID는 deleted_pmids에 모읍니다
+    (DTD상 DeleteCitation은 파일 끝, 모든 PubmedArticle 뒤에 옴).
+    """
+    
     def __init__(self):
+        self._parser = ET.XMLPullParser(events=('start', 'end'))
+        self._root = None
+        self.deleted_pmids: List[str] = []
+    
+    def feed(self, chunk: bytes) -> List[Dict]:
+        """청크를 입력하고 지금까지 완성된 논문 목록 반환"""
+        self._parser.feed(chunk)
+        return self._drain()
+    
+    def close(self) -> List[Dict]:
+        """입력을 마치고 남은 논문 목록 반환"""
+        self._parser.close()
+        return self._drain()
+    
+    def _drain(self) -> List[Dict]:
+        papers = []
+        
+        for event, elem in self._parser.read_events():
+            if event == 'start':
+                if self._root is None:
+                    self._root = elem
+                continue
+            
+            if elem.tag == 'PubmedArticle':
+                papers.append(_extract_paper(elem))
+                # 처리가 끝난 논문을 루트에서 떼어내 메모리 해제
+                self._root.clear()
+            elif elem.tag == 'PubmedData':
+                # 참고문헌 목록 등 사용하지 않는 대용량 하위 트리는 바로 비움
+                elem.clear()
+            elif elem.tag == 'DeleteCitation':
+                self.deleted_pmids.extend(pmid.text.strip() for pmid in elem.iter('PMID') if pmid.text)
+                self._root.clear()
+        
+        return papers
+
+
+def iter_papers_xml(source: BinaryIO, chunk_size: int = STREAM_CHUNK_SIZE,
+                    parser: PaperXMLStreamParser = None) -> Iterator[Dict]:
+    """파일 객체(efetch 응답, baseline 파일 등)에서 논문을 하나씩 스트리밍
+
+    삭제된 PMID가 필요하면 parser를 넘기고 순회가 끝난 뒤 parser.deleted_pmids를 확인합니다.
+    """
+    parser = parser or PaperXMLStreamParser()
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+def _element_text(parent, path: str) -> str:
+    elem = parent.find(path)
+    return elem.text if elem is not None else ''
+
+
+def _extract_paper(article) -> Dict:
+    """PubmedArticle 요소에서 논문 정보 추출 (하위 트리 전체 탐색 없이 고정 경로로 조회)"""
+    paper = {}
+    citation = article.find('MedlineCitation')
+    if citation is None:
+        citation = article
+    article_elem = citation.find('Article')
+    if article_elem is None:
+        article_elem = citation
+    journal = article_elem.find('Journal')
+    
+    # PMID
+    paper['pmid'] = _element_text(citation, 'PMID')
+    
+    # 제목
+    paper['title'] = _element_text(article_elem, 'ArticleTitle')
+    
+    # 초록 (본 초록 + 번역 등 OtherAbstract)
+    abstract_parts = []
+    abstract_elems = article_elem.findall('Abstract/AbstractText') + citation.findall('OtherAbstract/AbstractText')
+    for abs_elem in abstract_elems:
+        if abs_elem.text:
+            # 라벨이 있는 경우 (예: BACKGROUND:, METHODS: 등)
+            label = abs_elem.get('Label', '')
+            if label:
+                abstract_parts.append(f"{label}: {abs_elem.text}")
+            else:
+                abstract_parts.append(abs_elem.text)
+    
+    paper['abstract'] = ' '.join(abstract_parts)
+    
+    # 저자
+    authors = []
+    for author in article_elem.iterfind('AuthorList/Author'):
+        lastname = author.find('LastName')
+        firstname = author.find('ForeName')
+        if lastname is not None and firstname is not None:
+            authors.append(f"{firstname.text} {lastname.text}")
+    
+    paper['authors'] = authors
+    
+    # 저널
+    paper['journal'] = _element_text(journal, 'Title') if journal is not None else ''
+    
+    # 발행일
+    pub_date = journal.find('JournalIssue/PubDate') if journal is not None else None
+    if pub_date is not None:
+        date_parts = [
+            part.text for part in (pub_date.find('Year'), pub_date.find('Month'), pub_date.find('Day'))
+            if part is not None
+        ]
+        paper['publication_date'] = '-'.join(date_parts)
+    else:
+        paper['publication_date'] = ''
+    
+    # DOI
+    paper['doi'] = _element_text(article_elem, 'ELocationID[@EIdType="doi"]')
+    
+    # PubMed URL
+    paper['pubmed_url'] = f"https://pubmed.ncbi.nlm.nih.gov/{paper['pmid']}/"
+    
+    return paper
+
+
+class PubMedSearcher:
+    # 모든 인스턴스가 공유하는 연결 풀 세션 (TCP/TLS 핸드셰이크 재사용)
+    _session: Optional[requests.Session] = None
+    _session_lock = threading.Lock()
+    
+    # NCBI 장애 감지용 서킷 브레이커 (프로세스 전체 공유)
+    circuit_breaker = CircuitBreaker(
+        failure_threshold=config.PUBMED_CIRCUIT_FAILURE_THRESHOLD,
+        recovery_timeout=config.PUBMED_CIRCUIT_RECOVERY_TIMEOUT
+    )
+    
+    # 같은 PMID 집합에 대한 동시 efetch를 한 번으로 합침 (프로세스 전체 공유)
+    _fetch_flight = SingleFlight()
+    
+    def __init__(self, article_store: Optional[ArticleStore] = None,
+                 rate_limiter: Optional[TokenBucket] = None,
+                 search_index: Optional[SearchIndex] = None):
         self.email = config.PUBMED_EMAIL
         self.tool = config.PUBMED_TOOL_NAME
+        self.timeout = (config.PUBMED_CONNECT_TIMEOUT, config.PUBMED_READ_TIMEOUT)
+        self.api_key = config.PUBMED_API_KEY
+        self.article_store = article_store if article_store is not None else ArticleStore.default()
+        self.search_index = search_index if search_index is not None else SearchIndex.default()
+        # 모든 E-utilities 호출이 공유하는 토큰 버킷 (스레드/워커 간 공유)
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter()
+        self.retry_policy = RetryPolicy(
+            max_retries=config.PUBMED_MAX_RETRIES,
+            backoff_base=config.PUBMED_BACKOFF_BASE,
+            backoff_max=config.PUBMED_BACKOFF_MAX
+        )
+    
+    @classmethod
+    def _get_session(cls) -> requests.Session:
+        """프로세스 전체에서 공유하는 keep-alive 세션 반환"""
+        if cls._session is None:
+            with cls._session_lock:
+                if cls._session is None:
+                    cls._session = cls._create_session()
+        return cls._session
+    
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """연결 풀 크기와 keep-alive 설정을 적용한 세션 생성"""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=config.PUBMED_POOL_SIZE,
+            pool_block=True  # 풀이 가득 차면 새 연결 대신 대기
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
         
-    def search_papers(self, query: str, max_results: int = None) -> List[str]:
-        """PubMed에서 논문 검색"""
-        if max_results is None:
-            max_results = config.MAX_PAPERS
+        if not config.PUBMED_KEEP_ALIVE:
+            session.headers['Connection'] = 'close'
+        
+        return session
+    
+    @classmethod
+    def close_session(cls):
+        """공유 세션 종료 (설정 변경 후 재생성이 필요할 때)"""
+        with cls._session_lock:
+            if cls._session is not None:
+                cls._session.close()
+                cls._session = None
+    
+    def _get(self, url: str, params: Dict, stream: bool = False) -> requests.Response:
+        """공유 세션으로 E-utilities GET 요청 (실패는 PubMedError로 변환)"""
+        try:
+            response = self._get_session().get(url, params=params, timeout=self.timeout, stream=stream)
+        except requests.Timeout as e:
+            raise PubMedTimeoutError(str(e)) from e
+        except requests.RequestException as e:
+            raise PubMedConnectionError(str(e)) from e
+        
+        if response.status_code >= 400:
+            response.close()
+            raise PubMedHTTPError(
+                response.status_code,
+                f"E-utilities HTTP {response.status_code}: {response.reason}",
+                parse_retry_after(response.headers.get('Retry-After'))
+            )
+        return response
+    
+    def _call(self, operation: Callable[[], T]) -> T:
+        """호출 제한, 재시도(지수 백오프), 서킷 브레이커를 적용해 E-utilities 작업 실행"""
+        attempt = 0
+        while True:
+            if not self.circuit_breaker.allow_request():
+                raise PubMedUnavailableError(self.circuit_breaker.retry_after())
             
+            try:
+                if self.rate_limiter is not None:
+                    wait = self.rate_limiter.acquire()
+                    if wait > 0:
+                        tracing.record('ncbi.rate_limit_wait', 'wait', wait)
+                result = operation()
+            except PubMedError as e:
+                delay = self._handle_failure(e, attempt)
+                time.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                # PubMedError가 아닌 예외(코드 오류, 인터럽트 등)는 NCBI 장애로 세지 않고 시험 호출만 반납
+                self.circuit_breaker.release_trial()
+                raise
+            
+            self.circuit_breaker.record_success()
+            return result
+    
+    def _handle_failure(self, error: PubMedError, attempt: int) -> float:
+        """실패를 기록하고 재시도 대기 시간을 반환 (재시도하지 않을 오류면 다시 발생)"""
+        if not error.retryable:
+            # 4xx, 해석할 수 없는 응답 등은 NCBI 장애가 아니므로 서킷에 반영하지 않음
+            self.circuit_breaker.release_trial()
+            raise error
+        
+        self.circuit_breaker.record_failure()
+        if attempt >= self.retry_policy.max_retries:
+            raise error
+        
+        delay = self.retry_policy.delay(attempt, getattr(error, 'retry_after', None))
+        print(f"⚠️ E-utilities 재시도 {attempt + 1}/{self.retry_policy.max_retries} ({delay:.2f}초 후): {error}")
+        return delay
+    
+    def _get_xml(self, url: str, params: Dict, parse: Callable[[bytes], T]) -> T:
+        """GET 요청 후 응답 XML을 파싱 (재시도 포함)"""
+        def operation():
+            with tracing.span(f'ncbi.{eutils_endpoint(url)}', kind='ncbi'):
+                response = self._get(url, params)
+                content = response.content
+            try:
+                with tracing.span(f'{eutils_endpoint(url)}_xml_parse', kind='parse'):
+                    return parse(content)
+            except (ET.ParseError, ValueError, TypeError) as e:
+                raise PubMedResponseError(f"E-utilities XML 파싱 오류: {e}") from e
+        
+        return self._call(operation)
+    
+    def _base_params(self) -> Dict:
+        """모든 E-utilities 요청에 공통으로 들어가는 파라미터"""
         params = {
             'db': 'pubmed',
+            'email': self.email,
+            'tool': self.tool
+        }
+        if self.api_key:
+            params['api_key'] = self.api_key
+        return params
+    
+    def _search_params(self, query: str, max_results: int) -> Dict:
+        """esearch 요청 파라미터"""
+        return {
+            **self._base_params(),
             'term': query,
             'retmax': max_results,
             'retmode': 'xml',
-            'sort': 'relevance',
-            'email': self.email,
-            'tool': self.tool
+            'sort': 'relevance'
         }
+    
+    def _history_search_params(self, query: str) -> Dict:
+        """히스토리 서버에 결과를 저장하는 esearch 요청 파라미터"""
+        params = self._search_params(query, 0)
+        params['usehistory'] = 'y'
+        return params
+    
+    def _history_fetch_params(self, webenv: str, query_key: str, retstart: int, retmax: int) -> Dict:
+        """WebEnv/query_key 기반 efetch 배치 요청 파라미터"""
+        return {
+            **self._base_params(),
+            'WebEnv': webenv,
+            'query_key': query_key,
+            'retstart': retstart,
+            'retmax': retmax,
+            'retmode': 'xml',
+            'rettype': 'abstract'
+        }
+    
+    def _fetch_params(self, pmids: List[str]) -> Dict:
+        """efetch 요청 파라미터"""
+        return {
+            **self._base_params(),
+            'id': ','.join(pmids),
+            'retmode': 'xml',
+            'rettype': 'abstract'
+        }
+    
+    def _summary_params(self, pmids: List[str]) -> Dict:
+        """esummary 요청 파라미터"""
+        return {
+            **self._base_params(),
+            'id': ','.join(pmids),
+            'retmode': 'xml'
+        }
+    
+    def _link_params(self, pmids: List[str]) -> Dict:
+        """ELink 관련 논문(pubmed_pubmed) 요청 파라미터
         
+        id를 쉼표로 합치면 이웃이 하나로 합쳐지므로 PMID마다 id 파라미터를 반복해 PMID별 LinkSet을 받습니다.
+        """
+        return {
+            **self._base_params(),
+            'dbfrom': 'pubmed',
+            'linkname': 'pubmed_pubmed',
+            'cmd': 'neighbor_score',
+            'id': list(pmids),
+            'retmode': 'xml'
+        }
+        
+    def search_papers(self, query: str, max_results: int = None) -> List[str]:
+        """PubMed에서 논문 검색 (실패 시 PubMedError 발생)"""
+        if max_results is None:
+            max_results = config.MAX_PAPERS
+        
+        return self._get_xml(config.PUBMED_SEARCH_URL, self._search_params(query, max_results), self._parse_search_xml)
+    
+    def fetch_paper_details(self, pmids: List[str]) -> List[Dict]:
+        """논문 상세 정보 가져오기 (로컬 저장소에 없는 PMID만 efetch)"""
+        if not pmids:
+            return []
+        
+        cached = self._get_cached_papers(pmids)
+        missing = [pmid for pmid in pmids if pmid not in cached]
+        
+        fetched = []
+        if missing and not config.PUBMED_OFFLINE:
+            fetched = self._fetch_flight.do(frozenset(missing), lambda: self._fetch_missing(missing))
+        
+        return self._merge_in_order(pmids, cached, fetched)
+    
+    def _fetch_missing(self, missing: List[str]) -> List[Dict]:
+        """저장소에 없는 PMID들을 efetch하고 저장소에 기록"""
+        fetched = self._fetch_paper_stream(config.PUBMED_FETCH_URL, self._fetch_params(missing))
+        self._store_papers(fetched)
+        return fetched
+    
+    def _get_cached_papers(self, pmids: List[str]) -> Dict[str, Dict]:
+        """로컬 저장소에서 논문 조회 (저장소 오류는 캐시 미스로 처리)"""
+        if self.article_store is None:
+            return {}
         try:
-            response = requests.get(config.PUBMED_SEARCH_URL, params=params)
-            response.raise_for_status()
-            
-            root = ET.fromstring(response.content)
-            id_list = []
-            
-            for id_elem in root.findall('.//Id'):
-                id_list.append(id_elem.text)
-                
-            return id_list
-            
+            return self.article_store.get_many(pmids)
+        except Exception as e:
+            print(f"논문 저장소 조회 오류: {e}")
+            return {}
+    
+    def _get_cached_related(self, pmids: List[str]) -> Dict[str, List[Tuple[str, float]]]:
+        """로컬 저장소에서 관련 논문 목록 조회 (저장소 오류는 캐시 미스로 처리)"""
+        if self.article_store is None:
+            return {}
+        try:
+            return self.article_store.get_related(pmids)
+        except Exception as e:
+            print(f"논문 저장소 조회 오류: {e}")
+            return {}
+    
+    def _store_related(self, related: Dict[str, List[Tuple[str, float]]]):
+        """ELink 결과를 로컬 저장소에 기록"""
+        if self.article_store is None or not related:
+            return
+        try:
+            self.article_store.put_related(related)
+        except Exception as e:
+            print(f"논문 저장소 기록 오류: {e}")
+    
+    @staticmethod
+    def _limit_related(pmids: List[str], related: Dict[str, List[Tuple[str, float]]],
+                       max_per_pmid: Optional[int]) -> Dict[str, List[Tuple[str, float]]]:
+        return {pmid: related.get(pmid, [])[:max_per_pmid] if max_per_pmid else related.get(pmid, []) for pmid in pmids}
+    
+    @staticmethod
+    def _related_papers(related: Dict[str, List[Tuple[str, float]]], papers: List[Dict]) -> Dict[str, List[Dict]]:
+        """관련 논문 목록에 상세 정보를 붙임 (가져오지 못한 논문은 제외)"""
+        by_pmid = {paper['pmid']: paper for paper in papers}
+        return {
+            pmid: [{**by_pmid[linked], 'similarity_score': score} for linked, score in links if linked in by_pmid]
+            for pmid, links in related.items()
+        }
+    
+    def _store_papers(self, papers: List[Dict]):
+        """efetch 결과를 로컬 저장소에 기록하고 색인에 반영"""
+        if not papers:
+            return
+        if self.article_store is not None:
+            try:
+                self.article_store.put_many(papers)
+            except Exception as e:
+                print(f"논문 저장소 기록 오류: {e}")
+        self._index_papers(papers)
+    
+    def _index_papers(self, papers: List[Dict], replace: bool = True):
+        """논문을 BM25 색인에 반영 (색인 오류는 검색을 막지 않음)"""
+        if self.search_index is None or not papers:
+            return
+        try:
+            self.search_index.add_papers(papers, replace=replace)
+        except Exception as e:
+            print(f"검색 색인 기록 오류: {e}")
+    
+    def _local_topic_results(self, query: str, max_results: int) -> Optional[List[Dict]]:
+        """최근에 검색한 주제면 기록된 PMID 순서대로 로컬 저장소에서 논문 반환 (하나라도 없으면 None)"""
+        if self.search_index is None:
+            return None
+        try:
+            pmids = self.search_index.topic_pmids(query, max_results)
         except Exception as e:
-            print(f"검색 오류: {e}")
+            print(f"검색 색인 조회 오류: {e}")
+            return None
+        if pmids is None:
+            return None
+        
+        cached = self._get_cached_papers(pmids) if pmids else {}
+        if len(cached) < len(pmids):
+            return None
+        return [cached[pmid] for pmid in pmids]
+    
+    def _offline_results(self, query: str, max_results: int) -> List[Dict]:
+        """로컬 BM25 색인에서 상위 논문을 찾아 저장소에서 반환 (오프라인 모드)"""
+        if self.search_index is None:
+            return []
+        try:
+            pmids = [pmid for pmid, _ in self.search_index.search(query, max_results)]
+        except Exception as e:
+            print(f"검색 색인 조회 오류: {e}")
             return []
+        cached = self._get_cached_papers(pmids) if pmids else {}
+        return [cached[pmid] for pmid in pmids if pmid in cached]
     
-    def fetch_paper_details(self, pmids: List[str]) -> List[Dict]:
-        """논문 상세 정보 가져오기"""
+    def _remember_topic(self, query: str, max_results: int, pmids: List[str], papers: List[Dict]):
+        """검색 결과를 주제로 기록 (저장소에서 가져온 논문도 색인에 없으면 추가)"""
+        if self.search_index is None:
+            return
+        self._index_papers(papers, replace=False)
+        try:
+            self.search_index.remember_topic(query, max_results, pmids)
+        except Exception as e:
+            print(f"검색 색인 기록 오류: {e}")
+    
+    @staticmethod
+    def _merge_in_order(pmids: List[str], cached: Dict[str, Dict], fetched: List[Dict]) -> List[Dict]:
+        """캐시 적중분과 새로 가져온 논문을 요청한 PMID 순서대로 합침"""
+        if not cached:
+            return fetched
+        by_pmid = dict(cached)
+        by_pmid.update((paper['pmid'], paper) for paper in fetched)
+        return [by_pmid[pmid] for pmid in pmids if pmid in by_pmid]
+    
+    def _fetch_paper_stream(self, url: str, params: Dict) -> List[Dict]:
+        """efetch 응답을 전부 메모리에 올리지 않고 받는 대로 파싱 (재시도 포함)"""
+        def operation():
+            # 응답 수신과 파싱이 번갈아 일어나므로 파싱 시간은 _parse_paper_stream에서 따로 합산
+            with tracing.span(f'ncbi.{eutils_endpoint(url)}', kind='ncbi'), \
+                    self._get(url, params, stream=True) as response:
+                try:
+                    return self._parse_paper_stream(response.iter_content(STREAM_CHUNK_SIZE))
+                except requests.RequestException as e:
+                    raise PubMedConnectionError(f"efetch 응답 수신 중 연결 오류: {e}") from e
+                except ET.ParseError as e:
+                    raise PubMedResponseError(f"efetch XML 파싱 오류: {e}") from e
+        
+        return self._call(operation)
+    
+    def fetch_summaries(self, pmids: List[str]) -> List[Dict]:
+        """esummary로 논문 요약 메타데이터(초록 제외) 가져오기"""
         if not pmids:
             return []
+        
+        return self._get_xml(config.PUBMED_SUMMARY_URL, self._summary_params(pmids), self._parse_summary_xml)
+    
+    def fetch_related(self, pmids: List[str], max_per_pmid: int = None) -> Dict[str, List[Tuple[str, float]]]:
+        """ELink로 PMID별 관련 논문 [(pmid, 점수), ...]를 점수 순으로 가져오기
+        
+        저장소에 없는 PMID만 PUBMED_LINK_BATCH_SIZE개씩 한 요청으로 묶어 묻고 결과를 저장소에 기록합니다.
+        점수는 원본 논문 자신의 점수로 나눠 0~1로 맞춥니다.
+        """
+        pmids = list(dict.fromkeys(pmids))
+        related = self._get_cached_related(pmids)
+        missing = [pmid for pmid in pmids if pmid not in related]
+        
+        batch_size = max(1, config.PUBMED_LINK_BATCH_SIZE)
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start:start + batch_size]
+            links = self._get_xml(config.PUBMED_LINK_URL, self._link_params(batch), self._parse_link_xml)
+            # 관련 논문이 없는 PMID도 빈 목록으로 기록해 다시 묻지 않음
+            fetched = {pmid: links.get(pmid, []) for pmid in batch}
+            self._store_related(fetched)
+            related.update(fetched)
+        
+        return self._limit_related(pmids, related, max_per_pmid)
+    
+    def fetch_related_papers(self, pmids: List[str], max_per_pmid: int = 5) -> Dict[str, List[Dict]]:
+        """PMID별 관련 논문 상세 정보 (ELink 한 번 + 저장소에 없는 관련 논문만 묶어서 efetch)"""
+        related = self.fetch_related(pmids, max_per_pmid)
+        linked = list(dict.fromkeys(pmid for links in related.values() for pmid, _ in links))
+        papers = []
+        for start in range(0, len(linked), RELATED_FETCH_CHUNK):
+            papers.extend(self.fetch_paper_details(linked[start:start + RELATED_FETCH_CHUNK]))
+        return self._related_papers(related, papers)
+    
+    def search_with_history(self, query: str) -> Dict:
+        """esearch 결과를 히스토리 서버에 저장하고 WebEnv/query_key/전체 건수 반환"""
+        return self._get_xml(config.PUBMED_SEARCH_URL, self._history_search_params(query), self._parse_history_xml)
+    
+    def fetch_history_batch(self, webenv: str, query_key: str, retstart: int, retmax: int) -> List[Dict]:
+        """히스토리 서버에서 retstart부터 retmax개 논문 상세 정보 가져오기"""
+        papers = self._fetch_paper_stream(
+            config.PUBMED_FETCH_URL,
+            self._history_fetch_params(webenv, query_key, retstart, retmax)
+        )
+        self._store_papers(papers)
+        return papers
+    
+    def iter_history_batches(self, webenv: str, query_key: str, total: int,
+                             batch_size: int = None, max_workers: int = None) -> Iterator[List[Dict]]:
+        """히스토리 서버 결과를 배치 단위로 병렬 요청하여 순서대로 반환"""
+        batch_size = batch_size or config.PUBMED_HISTORY_BATCH_SIZE
+        max_workers = max_workers or config.PUBMED_MAX_PARALLEL_FETCHES
+        starts = list(range(0, total, batch_size))
+        
+        # 동시에 진행 중인 배치를 max_workers개로 제한해 메모리 사용량 유지
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = []
+            for retstart in starts:
+                retmax = min(batch_size, total - retstart)
+                pending.append(executor.submit(tracing.bind(self.fetch_history_batch), webenv, query_key, retstart, retmax))
+                if len(pending) >= max_workers:
+                    yield pending.pop(0).result()
             
-        # API 호출 제한을 위한 지연
-        time.sleep(0.1)
+            for future in pending:
+                yield future.result()
+    
+    def iter_search_results(self, query: str, max_results: int = None,
+                            batch_size: int = None) -> Iterator[List[Dict]]:
+        """히스토리 서버를 사용해 대량 검색 결과를 배치 단위로 스트리밍"""
+        history = self.search_with_history(query)
+        if history['count'] == 0:
+            return
         
-        pmid_str = ','.join(pmids)
-        params = {
-            'db': 'pubmed',
-            'id': pmid_str,
-            'retmode': 'xml',
-            'rettype': 'abstract',
-            'email': self.email,
-            'tool': self.tool
+        total = history['count'] if max_results is None else min(max_results, history['count'])
+        yield from self.iter_history_batches(history['webenv'], history['query_key'], total, batch_size)
+    
+    def _parse_search_xml(self, xml_content: bytes) -> List[str]:
+        """esearch 응답에서 PMID 목록 추출"""
+        root = ET.fromstring(xml_content)
+        return [id_elem.text for id_elem in root.findall('.//Id')]
+    
+    def _parse_history_xml(self, xml_content: bytes) -> Dict:
+        """usehistory=y esearch 응답에서 WebEnv/query_key/Count 추출"""
+        root = ET.fromstring(xml_content)
+        return {
+            'count': int(root.findtext('Count', default='0')),
+            'webenv': root.findtext('WebEnv', default=''),
+            'query_key': root.findtext('QueryKey', default='')
         }
+    
+    def _parse_summary_xml(self, xml_content: bytes) -> List[Dict]:
+        """esummary 응답(DocSum)을 파싱하여 메타데이터 추출"""
+        summaries = []
+        root = ET.fromstring(xml_content)
         
-        try:
-            response = requests.get(config.PUBMED_FETCH_URL, params=params)
-            response.raise_for_status()
+        for doc in root.findall('DocSum'):
+            pmid = doc.findtext('Id', default='')
+            items = {item.get('Name'): item for item in doc.findall('Item')}
             
-            return self._parse_paper_xml(response.content)
+            authors = []
+            author_list = items.get('AuthorList')
+            if author_list is not None:
+                authors = [a.text for a in author_list.findall('Item') if a.text]
             
-        except Exception as e:
-            print(f"상세 정보 가져오기 오류: {e}")
-            return []
+            def item_text(name: str) -> str:
+                elem = items.get(name)
+                return elem.text or '' if elem is not None else ''
+            
+            summaries.append({
+                'pmid': pmid,
+                'title': item_text('Title'),
+                'authors': authors,
+                'journal': item_text('FullJournalName') or item_text('Source'),
+                'publication_date': item_text('PubDate'),
+                'doi': item_text('DOI'),
+                'pubmed_url': f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/"
+            })
+        
+        return summaries
+    
+    def _parse_link_xml(self, xml_content: bytes) -> Dict[str, List[Tuple[str, float]]]:
+        """ELink neighbor_score 응답에서 PMID별 관련 논문 [(pmid, 정규화 점수), ...] 추출 (자기 자신 제외)"""
+        related = {}
+        root = ET.fromstring(xml_content)
+        
+        for link_set in root.findall('LinkSet'):
+            source = link_set.findtext('IdList/Id', default='')
+            links = []
+            for link_set_db in link_set.findall('LinkSetDb'):
+                if link_set_db.findtext('LinkName') != 'pubmed_pubmed':
+                    continue
+                for link in link_set_db.findall('Link'):
+                    links.append((link.findtext('Id', default=''), float(link.findtext('Score', default='0'))))
+            
+            scores = dict(links)
+            top = scores.pop(source, None) or max(scores.values(), default=0.0) or 1.0
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+            related[source] = [(pmid, round(score / top, 4)) for pmid, score in ranked if pmid]
+        
+        return related
     
     def _parse_paper_xml(self, xml_content: bytes) -> List[Dict]:
         """XML 응답을 파싱하여 논문 정보 추출"""
+        return self._parse_paper_stream([xml_content])
+    
+    def _parse_paper_stream(self, chunks: Iterable[bytes]) -> List[Dict]:
+        """청크 단위로 도착하는 efetch 응답을 점진적으로 파싱"""
         papers = []
+        parser = PaperXMLStreamParser()
+        parse_time = 0.0
         
-        try:
-            root = ET.fromstring(xml_content)
-            
-            for article in root.findall('.//PubmedArticle'):
-                paper = {}
-                
-                # PMID
-                pmid_elem = article.find('.//PMID')
-                paper['pmid'] = pmid_elem.text if pmid_elem is not None else ''
-                
-                # 제목
-                title_elem = article.find('.//ArticleTitle')
-                paper['title'] = title_elem.text if title_elem is not None else ''
-                
-                # 초록
-                abstract_elems = article.findall('.//AbstractText')
-                abstract_parts = []
-                for abs_elem in abstract_elems:
-                    if abs_elem.text:
-                        # 라벨이 있는 경우 (예: BACKGROUND:, METHODS: 등)
-                        label = abs_elem.get('Label', '')
-                        text = abs_elem.text
-                        if label:
-                            abstract_parts.append(f"{label}: {text}")
-                        else:
-                            abstract_parts.append(text)
-                
-                paper['abstract'] = ' '.join(abstract_parts)
-                
-                # 저자
-                authors = []
-                for author in article.findall('.//Author'):
-                    lastname = author.find('LastName')
-                    firstname = author.find('ForeName')
-                    if lastname is not None and firstname is not None:
-                        authors.append(f"{firstname.text} {lastname.text}")
-                        
-                paper['authors'] = authors
-                
-                # 저널
-                journal_elem = article.find('.//Journal/Title')
-                paper['journal'] = journal_elem.text if journal_elem is not None else ''
-                
-                # 발행일
-                pub_date = article.find('.//PubDate')
-                if pub_date is not None:
-                    year = pub_date.find('Year')
-                    month = pub_date.find('Month')
-                    day = pub_date.find('Day')
-                    
-                    date_parts = []
-                    if year is not None:
-                        date_parts.append(year.text)
-                    if month is not None:
-                        date_parts.append(month.text)
-                    if day is not None:
-                        date_parts.append(day.text)
-                    
-                    paper['publication_date'] = '-'.join(date_parts)
-                else:
-                    paper['publication_date'] = ''
-                
-                # DOI
-                doi_elem = article.find('.//ELocationID[@EIdType="doi"]')
-                paper['doi'] = doi_elem.text if doi_elem is not None else ''
-                
-                # PubMed URL
-                paper['pubmed_url'] = f"https://pubmed.ncbi.nlm.nih.gov/{paper['pmid']}/"
-                
-                papers.append(paper)
-                
-        except Exception as e:
-            print(f"XML 파싱 오류: {e}")
-            
+        for chunk in chunks:
+            start = time.perf_counter()
+            papers.extend(parser.feed(chunk))
+            parse_time += time.perf_counter() - start
+        start = time.perf_counter()
+        papers.extend(parser.close())
+        parse_time += time.perf_counter() - start
+        
+        tracing.record('efetch_xml_parse', 'parse', parse_time, papers=len(papers))
         return papers
     
-    def search_and_fetch(self, query: str, max_results: int = None) -> List[Dict]:
-        """검색과 상세 정보 가져오기를 한번에 수행"""
+    def search_and_fetch(self, query: str, max_results: int = None, use_history: bool = False) -> List[Dict]:
+        """검색과 상세 정보 가져오기를 한번에 수행
+
+        use_history=True이면 PMID 목록을 URL에 넣지 않고 히스토리 서버(WebEnv)에서
+        배치 단위로 가져오므로 수천 건 이상의 결과도 처리할 수 있습니다.
+        오프라인 모드(PUBMED_OFFLINE)에서는 baseline을 적재한 로컬 색인/저장소에서만 찾습니다.
+        """
+        if config.PUBMED_OFFLINE:
+            return self._offline_results(query, max_results or config.MAX_PAPERS)
+        
+        if use_history:
+            papers = []
+            for batch in self.iter_search_results(query, max_results):
+                papers.extend(batch)
+            return papers
+        
+        if max_results is None:
+            max_results = config.MAX_PAPERS
+        
+        # 최근에 검색한 주제는 NCBI 호출 없이 로컬 저장소에서 응답
+        local = self._local_topic_results(query, max_results)
+        if local is not None:
+            return local
+        
         pmids = self.search_papers(query, max_results)
-        if pmids:
-            return self.fetch_paper_details(pmids)
-        return [] 
\ No newline at end of file
+        papers = self.fetch_paper_details(pmids) if pmids else []
+        self._remember_topic(query, max_results, pmids, papers)
+        return papers 
\ No newline at end of file
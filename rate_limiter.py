@@ -0,0 +1,152 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, Optional
+from config import config
+
+try:
+    import fcntl
+except ImportError:  # Windows 등 fcntl이 없는 환경
+    fcntl = None
+
+class TokenBucket:
+    """스레드 간에 공유되는 토큰 버킷 호출 제한기
+
+    reserve()는 토큰을 먼저 차감(부족하면 빚으로 기록)하고 기다려야 할 시간을 반환합니다.
+    호출자는 그 시간만큼만 대기하므로, 제한 안에서 가능한 최대 속도로 요청이 나갑니다.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+        self.total_wait = 0.0
+        self.acquired = 0
+        self.waited = 0
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """토큰을 예약하고 대기해야 할 시간(초) 반환"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.total_wait += wait
+            self.acquired += 1
+            self.waited += wait > 0
+        return wait
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """토큰을 얻을 때까지 대기하고 대기한 시간(초) 반환"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        """토큰을 얻을 때까지 대기하고 대기한 시간(초) 반환 (이벤트 루프는 막지 않음)"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def stats(self) -> Dict:
+        """이 프로세스의 호출 제한 대기 통계"""
+        return {
+            'rate': self.rate,
+            'acquired': self.acquired,
+            'waited': self.waited,
+            'total_wait_seconds': round(self.total_wait, 3),
+            'avg_wait_ms': round(self.total_wait / self.acquired * 1000, 2) if self.acquired else 0.0
+        }
+
+
+class FileTokenBucket(TokenBucket):
+    """상태 파일과 flock으로 여러 프로세스(uvicorn 워커)가 공유하는 토큰 버킷
+
+    프로세스 간에 비교할 수 있도록 벽시계 시간(time.time)을 기준으로 토큰을 계산합니다.
+    """
+
+    def __init__(self, path: str, rate: float, capacity: float = 1.0):
+        super().__init__(rate, capacity)
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """파일 잠금 안에서 공유 상태를 갱신하고 대기 시간(초) 반환"""
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                now = time.time()
+                available, updated_at = self._read_state(now)
+                available = min(self.capacity, available + max(0.0, now - updated_at) * self.rate)
+                available -= tokens
+                self._write_state(available, now)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+            wait = -available / self.rate if available < 0 else 0.0
+            self.total_wait += wait
+            self.acquired += 1
+            self.waited += wait > 0
+        return wait
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        """토큰을 얻을 때까지 대기하고 대기한 시간(초) 반환 (파일 잠금은 스레드에서 대기)"""
+        wait = await asyncio.to_thread(self.reserve, tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def _read_state(self, now: float):
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        raw = os.read(self._fd, 64).decode('ascii', errors='ignore').split()
+        try:
+            return float(raw[0]), float(raw[1])
+        except (IndexError, ValueError):
+            return self.capacity, now
+
+    def _write_state(self, available: float, now: float):
+        data = f"{available:.6f} {now:.6f}".ljust(64).encode('ascii')
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        os.write(self._fd, data)
+
+    def close(self):
+        os.close(self._fd)
+
+
+_default_limiter: Optional[TokenBucket] = None
+_default_lock = threading.Lock()
+
+
+def ncbi_rate_limit() -> float:
+    """설정된 초당 호출 수 (미설정 시 API 키 유무에 따라 NCBI 허용치 10 또는 3)"""
+    if config.PUBMED_REQUESTS_PER_SECOND is not None:
+        return config.PUBMED_REQUESTS_PER_SECOND
+    return 10.0 if config.PUBMED_API_KEY else 3.0
+
+
+def get_rate_limiter() -> Optional[TokenBucket]:
+    """모든 E-utilities 호출이 공유하는 호출 제한기 반환 (제한 해제 시 None)"""
+    global _default_limiter
+
+    rate = ncbi_rate_limit()
+    if rate <= 0:
+        return None
+
+    if _default_limiter is None:
+        with _default_lock:
+            if _default_limiter is None:
+                if config.RATE_LIMIT_BACKEND == 'file' and fcntl is not None:
+                    _default_limiter = FileTokenBucket(config.RATE_LIMIT_FILE, rate, config.PUBMED_RATE_LIMIT_BURST)
+                else:
+                    if config.RATE_LIMIT_BACKEND == 'file':
+                        print("⚠️ fcntl을 사용할 수 없어 프로세스 내부 호출 제한기를 사용합니다.")
+                    _default_limiter = TokenBucket(rate, config.PUBMED_RATE_LIMIT_BURST)
+    return _default_limiter
@@ -0,0 +1,217 @@
+from itertools import repeat
+from operator import contains
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+
+
+def term_incidence(texts: Sequence[str], terms: Sequence[str]) -> np.ndarray:
+    """texts × terms 부분 문자열 포함 여부 행렬 (bool)
+
+    열마다 map(contains, ...)로 채우므로 텍스트 검사는 모두 C 수준의 `term in text`로 처리됩니다.
+    """
+    matrix = np.empty((len(terms), len(texts)), dtype=bool)
+    for column, term in enumerate(terms):
+        matrix[column] = np.fromiter(map(contains, texts, repeat(term)), dtype=bool, count=len(texts))
+    return matrix.T
+
+
+class KeywordMatcher:
+    """고정 키워드 집합(중복 제거)과 열 번호를 만들어 두고 논문 텍스트별 포함 여부 행렬을 계산"""
+
+    def __init__(self, terms: Sequence[str]):
+        self.terms = list(dict.fromkeys(terms))
+        self.index = {term: column for column, term in enumerate(self.terms)}
+
+    def columns(self, terms: Sequence[str]) -> List[int]:
+        """키워드 목록의 열 번호"""
+        return [self.index[term] for term in terms]
+
+    def incidence(self, texts: Sequence[str]) -> np.ndarray:
+        """texts × 키워드 포함 여부 행렬"""
+        return term_incidence(texts, self.terms)
+
+
+def _query_words(query: str) -> List[str]:
+    """질의에서 3글자 이상 단어 (중복 포함 - 단어마다 점수를 더하던 기존 방식 유지)"""
+    return [word.lower().strip() for word in query.split() if len(word.strip()) > 2]
+
+
+def _title_abstract_points(titles: List[str], abstracts: List[str], words: List[str],
+                           title_points: int, abstract_points: int) -> np.ndarray:
+    """질의 단어가 제목에 있으면 title_points, 제목에 없고 초록에 있으면 abstract_points"""
+    if not words:
+        return np.zeros(len(titles), dtype=np.int64)
+    in_title = term_incidence(titles, words)
+    in_abstract = term_incidence(abstracts, words) & ~in_title
+    return (in_title * title_points + in_abstract * abstract_points).sum(axis=1)
+
+
+def _paper_texts(papers: Sequence[Dict]) -> Tuple[List[str], List[str], List[str]]:
+    titles = [paper.get('title', '').lower() for paper in papers]
+    abstracts = [paper.get('abstract', '').lower() for paper in papers]
+    contents = [f"{title} {abstract}" for title, abstract in zip(titles, abstracts)]
+    return titles, abstracts, contents
+
+
+class SummaryRelevanceScorer:
+    """PaperSummarizer용 관련성 점수 (질의 단어 + 의료 키워드 - 비의료 키워드, 0~1)"""
+
+    # 즉시 제외 패턴들 (명백히 비의료적인 것만)
+    IMMEDIATE_EXCLUSION_PATTERNS = [
+        'autophagy in plants', 'plant autophagy', 'vegetable growth models',
+        'health system review', 'luxembourg health', 'north macedonia health',
+        'research advance on vegetable', 'agricultural research', 'plant biology',
+        'veterinary medicine', 'animal disease', 'livestock health'
+    ]
+
+    # 의료 키워드 (1점씩)
+    MEDICAL_KEYWORDS = [
+        'patient', 'clinical', 'treatment', 'therapy', 'diagnosis', 'therapeutic',
+        'medical', 'hospital', 'surgery', 'drug', 'medication', 'medicine',
+        'disease', 'disorder', 'syndrome', 'infection', 'cancer', 'tumor',
+        'cardiovascular', 'diabetes', 'hypertension', 'inflammation',
+        'pharmacological', 'pathology', 'symptoms', 'prognosis', 'mortality',
+        'intervention', 'randomized', 'trial', 'efficacy', 'safety', 'outcome',
+        'healthcare', 'health care', 'medical care', 'patient care', 'nursing',
+        'physician', 'doctor', 'nurse', 'clinic', 'emergency', 'intensive care',
+        'blood', 'serum', 'plasma', 'laboratory', 'biomarker', 'screening',
+        'hemoglobin', 'anemia', 'dizziness', 'fatigue', 'weakness'  # 헤모글로빈 관련 추가
+    ]
+
+    # 질의에 있으면 3점씩 더하는 한국어 의료 용어
+    KOREAN_MEDICAL_TERMS = [
+        '치료', '진단', '환자', '질병', '질환', '증상', '검사', '수치',
+        '헤모글로빈', '빈혈', '어지러움', '피로', '무력감'
+    ]
+
+    # 비의료 키워드 감점 (핵심만, 3점씩)
+    NON_MEDICAL_KEYWORDS = [
+        'autophagy in plants', 'plant biology', 'agricultural research',
+        'health system review', 'veterinary medicine', 'livestock',
+        'narcissism', 'political', 'social media', 'artificial intelligence'
+    ]
+
+    MAX_POSSIBLE_SCORE = 30  # 예상 최대 점수
+
+    def __init__(self):
+        self.matcher = KeywordMatcher(
+            self.IMMEDIATE_EXCLUSION_PATTERNS + self.MEDICAL_KEYWORDS + self.NON_MEDICAL_KEYWORDS
+        )
+        self.exclusion_columns = self.matcher.columns(self.IMMEDIATE_EXCLUSION_PATTERNS)
+        # 키워드 점수 가중치 (의료 +1, 비의료 -3; 두 목록에 모두 있으면 합산)
+        self.keyword_weights = np.zeros(len(self.matcher.terms), dtype=np.int64)
+        np.add.at(self.keyword_weights, self.matcher.columns(self.MEDICAL_KEYWORDS), 1)
+        np.add.at(self.keyword_weights, self.matcher.columns(self.NON_MEDICAL_KEYWORDS), -3)
+
+    def score(self, papers: Sequence[Dict], user_query: str) -> np.ndarray:
+        """논문별 관련성 점수 (0~1)"""
+        if not papers:
+            return np.zeros(0)
+
+        titles, abstracts, contents = _paper_texts(papers)
+        keywords = self.matcher.incidence(contents)
+
+        score = _title_abstract_points(titles, abstracts, _query_words(user_query), 5, 2)
+        score = score + keywords.astype(np.int64) @ self.keyword_weights
+        score = score + 3 * sum(term in user_query for term in self.KOREAN_MEDICAL_TERMS)
+
+        normalized = np.clip(score / self.MAX_POSSIBLE_SCORE, 0.0, 1.0)
+        # 즉시 제외 패턴이 있으면 0점
+        normalized[keywords[:, self.exclusion_columns].any(axis=1)] = 0.0
+        return normalized
+
+
+class SearchRelevanceScorer:
+    """MedicalSearchService용 관련성 점수와 필터링 특징 (0~1)
+
+    점수는 0.01 단위 정수로 합산한 뒤 100으로 나눠, 실수 누적 오차 없이 임계값과 비교합니다.
+    """
+
+    # 감지된 개체 유형별 점수 (0.01 단위)
+    ENTITY_POINTS = {'disease': 4, 'test': 3, 'treatment': 4}
+
+    # 한국어 질의 용어 → 논문에서 찾을 영어 용어 (3점)
+    KOREAN_MEDICAL_TERMS = {
+        '당뇨병': 'diabetes', '고혈압': 'hypertension', '파킨슨': 'parkinson',
+        '암': 'cancer', '종양': 'tumor', '심장': 'heart', '뇌': 'brain',
+        '치료': 'treatment', '진단': 'diagnosis', '수술': 'surgery',
+        '효능': 'efficacy', '효과': 'effectiveness'
+    }
+
+    # 기본 의료 키워드 보너스 (1점씩)
+    MEDICAL_KEYWORDS = [
+        'patient', 'clinical', 'treatment', 'therapy', 'diagnosis', 'disease',
+        'medical', 'health', 'study', 'trial', 'efficacy', 'outcome', 'hospital'
+    ]
+
+    # CA-125 질의일 때 논문에 있으면 10점
+    CA125_QUERY_TERMS = ['ca 125', 'ca-125', 'ca125']
+    CA125_CONTENT_TERMS = ['ca-125', 'ca 125', 'tumor marker', 'ovarian cancer']
+
+    # 기본 제외 패턴 (매우 제한적)
+    EXCLUDE_PATTERNS = [
+        'veterinary medicine', 'animal study only', 'plant biology',
+        'agricultural research', 'environmental policy only'
+    ]
+
+    # 고지혈증 관련 검색이면 이 키워드가 있는 논문에 더 관대한 기준 적용
+    HYPERLIPIDEMIA_QUERY_TERMS = ['고지혈', '콜레스테롤', 'cholesterol', 'lipid', 'hyperlipidemia']
+    HYPERLIPIDEMIA_KEYWORDS = ['hyperlipidemia', 'dyslipidemia', 'cholesterol', 'lipid', 'triglyceride', 'statin', 'atherosclerosis']
+
+    def __init__(self):
+        self.matcher = KeywordMatcher(
+            list(self.KOREAN_MEDICAL_TERMS.values()) + self.MEDICAL_KEYWORDS + self.CA125_CONTENT_TERMS
+            + self.EXCLUDE_PATTERNS + self.HYPERLIPIDEMIA_KEYWORDS
+        )
+        self.medical_weights = np.zeros(len(self.matcher.terms), dtype=np.int64)
+        np.add.at(self.medical_weights, self.matcher.columns(self.MEDICAL_KEYWORDS), 1)
+        self.ca125_columns = self.matcher.columns(self.CA125_CONTENT_TERMS)
+        self.exclude_columns = self.matcher.columns(self.EXCLUDE_PATTERNS)
+        self.hyperlipidemia_columns = self.matcher.columns(self.HYPERLIPIDEMIA_KEYWORDS)
+
+    def _query_weights(self, user_lower: str) -> np.ndarray:
+        """질의에 나타난 한국어 용어의 영어 대응어 열에 3점씩 더한 가중치"""
+        weights = self.medical_weights.copy()
+        for korean, english in self.KOREAN_MEDICAL_TERMS.items():
+            if korean in user_lower:
+                weights[self.matcher.index[english]] += 3
+        return weights
+
+    def score(self, papers: Sequence[Dict], entities: List, user_input: str) -> np.ndarray:
+        """논문별 관련성 점수 (0~1)"""
+        return self.features(papers, entities, user_input)[0]
+
+    def features(self, papers: Sequence[Dict], entities: List, user_input: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(관련성 점수, 제외 패턴 포함 여부, 고지혈증 키워드 포함 여부) - 논문별 배열"""
+        if not papers:
+            empty = np.zeros(0, dtype=bool)
+            return np.zeros(0), empty, empty
+
+        user_lower = user_input.lower()
+        titles, abstracts, contents = _paper_texts(papers)
+        keywords = self.matcher.incidence(contents)
+
+        # 1. 사용자 입력과의 직접적인 매칭 (제목 5, 초록 2)
+        points = _title_abstract_points(titles, abstracts, [word for word in user_lower.split() if len(word) > 2], 5, 2)
+
+        # 2. 감지된 엔티티와의 매칭
+        entity_terms = [entity.text.lower() for entity in entities]
+        if entity_terms:
+            entity_weights = np.array([self.ENTITY_POINTS.get(entity.entity_type, 0) for entity in entities], dtype=np.int64)
+            points = points + term_incidence(contents, entity_terms).astype(np.int64) @ entity_weights
+
+        # 3. 한국어 의료 용어 인식 + 4. 기본 의료 키워드 보너스
+        points = points + keywords.astype(np.int64) @ self._query_weights(user_lower)
+
+        # 5. CA-125 특별 처리 (높은 보너스)
+        if any(term in user_lower for term in self.CA125_QUERY_TERMS):
+            points = points + 10 * keywords[:, self.ca125_columns].any(axis=1)
+
+        scores = np.minimum(points / 100, 1.0)  # 최대 1.0으로 제한
+        excluded = keywords[:, self.exclude_columns].any(axis=1)
+        hyperlipidemia = keywords[:, self.hyperlipidemia_columns].any(axis=1)
+        return scores, excluded, hyperlipidemia
+
+    def is_hyperlipidemia_search(self, user_input: str) -> bool:
+        user_lower = user_input.lower()
+        return any(term in user_lower for term in self.HYPERLIPIDEMIA_QUERY_TERMS)
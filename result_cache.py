@@ -0,0 +1,303 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from config import config
+from sqlite_cache import CacheEviction
+
+try:
+    import redis
+except ImportError:  # redis 백엔드를 쓰지 않으면 필요 없음
+    redis = None
+
+# 같은 단위의 여러 표기 → 대표 표기 (casefold/NFKC 이후 적용)
+_UNIT_SPELLINGS = [
+    (re.compile(r'(?<![a-z])mg\s*(?:/|per)\s*dl\b'), 'mg/dl'),
+    (re.compile(r'(?<![a-z])mg\s*(?:/|per)\s*l\b'), 'mg/l'),
+    (re.compile(r'(?<![a-z])g\s*(?:/|per)\s*dl\b'), 'g/dl'),
+    (re.compile(r'(?<![a-z])mmol\s*(?:/|per)\s*l\b'), 'mmol/l'),
+    (re.compile(r'(?<![a-z])mm\s*/?\s*hg\b'), 'mmhg'),
+    (re.compile(r'(?<![a-z])(m?iu)\s*(?:/|per)\s*ml\b'), r'\1/ml'),
+    (re.compile(r'(?<![a-z])units?\s*(?:/|per)\s*(ml|l)\b'), r'u/\1'),
+    (re.compile(r'(?<![a-z])u\s*(?:/|per)\s*(ml|l)\b'), r'u/\1'),
+    (re.compile(r'/\s*(?:μl|ul|mcl)\b'), '/μl'),
+    (re.compile(r'(\d)\s*(?:percent|퍼센트|프로)(?!\w)'), r'\1%'),
+]
+_UNIT_PATTERN = r'(?:mg/dl|mg/l|g/dl|mmol/l|mmhg|miu/ml|iu/ml|u/ml|u/l|/μl|%)'
+
+
+def canonical_query(text: str) -> str:
+    """검색 결과 캐시 키용 입력 정규화
+
+    대소문자/공백, 전각 문자, 단위 표기(mg/dL·mg per dl, mmHg·mm Hg 등),
+    숫자와 단위 사이 띄어쓰기, 소수점 뒤 0을 통일합니다.
+    """
+    text = unicodedata.normalize('NFKC', text).casefold()
+    for pattern, replacement in _UNIT_SPELLINGS:
+        text = pattern.sub(replacement, text)
+    # 126mg/dl, 126 mg/dl → 126 mg/dl / 7.8 % → 7.8% / 180 / 120 → 180/120
+    text = re.sub(rf'(\d)\s*({_UNIT_PATTERN})', r'\1 \2', text)
+    text = re.sub(r'(\d) %', r'\1%', text)
+    text = re.sub(r'(\d)\s*/\s*(\d)', r'\1/\2', text)
+    text = re.sub(r'(\d+\.\d*?)0+\b', r'\1', text)
+    text = re.sub(r'(\d+)\.(?!\d)', r'\1', text)
+    return ' '.join(text.split())
+
+
+def search_result_key(user_input: str, max_results: int, *variant) -> str:
+    """검색 결과 캐시 키 (정규화된 입력 + max_results + 모델/프롬프트 버전 등 결과를 바꾸는 설정)"""
+    parts = ['search', canonical_query(user_input), max_results, *variant]
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class _SQLiteResults:
+    """SQLite 파일에 저장하는 공유 저장소 (같은 머신의 여러 워커가 공유, 정리 주기는 CacheEviction)"""
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self._eviction = CacheEviction('results', 'key', max_entries)
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                accessed_at REAL NOT NULL,
+                expires_at REAL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_results_accessed ON results(accessed_at)')
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[str, Optional[float]]]:
+        """(직렬화된 결과, 만료 시각) 반환"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT result, accessed_at, expires_at FROM results '
+                'WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)',
+                (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            result, accessed_at, expires_at = row
+            if self._eviction.is_stale(accessed_at, now):
+                self._conn.execute('UPDATE results SET accessed_at = ? WHERE key = ?', (now, key))
+                self._conn.commit()
+        return result, expires_at
+
+    def put(self, key: str, value: str, expires_at: Optional[float]):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO results (key, result, accessed_at, expires_at) VALUES (?, ?, ?, ?)',
+                (key, value, now, expires_at)
+            )
+            self._conn.commit()
+            self._eviction.written(self._conn, 1, now)
+
+    @property
+    def evictions(self) -> int:
+        return self._eviction.evictions
+
+    @property
+    def approx_count(self) -> Optional[int]:
+        """이 프로세스가 마지막으로 정리할 때 센 항목 수 + 이후 기록 수 (아직 세지 않았으면 None)"""
+        return self._eviction.approx_count
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM results')
+            self._conn.commit()
+            self._eviction.cleared()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _RedisResults:
+    """Redis(또는 호환 서버)에 저장하는 공유 저장소 (여러 머신의 워커가 공유)
+
+    만료는 키 TTL로, 개수 제한은 서버의 maxmemory-policy(allkeys-lru 등)로 처리합니다.
+    항목 수는 키 공간 전체를 SCAN해야 알 수 있으므로 통계에서 세지 않습니다.
+    """
+
+    prefix = 'pubmed:result:'
+    approx_count = None
+
+    def __init__(self, url: str):
+        self.url = url
+        self.evictions = 0
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[Tuple[str, Optional[float]]]:
+        with self._client.pipeline() as pipe:
+            value, ttl = pipe.get(self.prefix + key).pttl(self.prefix + key).execute()
+        if value is None:
+            return None
+        expires_at = time.time() + ttl / 1000 if ttl and ttl > 0 else None
+        return value.decode('utf-8'), expires_at
+
+    def put(self, key: str, value: str, expires_at: Optional[float]):
+        ttl_ms = int((expires_at - time.time()) * 1000) if expires_at else None
+        if ttl_ms is not None and ttl_ms <= 0:
+            return
+        self._client.set(self.prefix + key, value.encode('utf-8'), px=ttl_ms)
+
+    def clear(self):
+        keys = list(self._client.scan_iter(match=self.prefix + '*', count=500))
+        for offset in range(0, len(keys), 500):
+            self._client.delete(*keys[offset:offset + 500])
+
+    def close(self):
+        self._client.close()
+
+
+class ResultCache:
+    """검색 결과 전체(분석 + 논문 + 요약)를 정규화된 입력 키로 저장하는 캐시
+
+    1단계는 워커 프로세스 메모리의 LRU(항목 수/바이트 제한), 2단계는 워커들이 공유하는
+    저장소(sqlite 파일 또는 redis)입니다. backend='memory'면 2단계 없이 워커별로만 캐시합니다.
+    결과는 JSON 문자열로 보관해 조회할 때마다 새 dict를 돌려주므로 호출자가 수정해도 안전합니다.
+    """
+
+    _default: Optional['ResultCache'] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, backend: str = None, path: str = None, redis_url: str = None, ttl: float = None,
+                 memory_size: int = None, memory_bytes: int = None, max_entries: int = None):
+        self.backend = (backend or config.RESULT_CACHE_BACKEND).lower()
+        self.ttl = config.RESULT_CACHE_TTL if ttl is None else ttl
+        self.memory_size = config.RESULT_CACHE_MEMORY_SIZE if memory_size is None else memory_size
+        self.memory_bytes = config.RESULT_CACHE_MEMORY_BYTES if memory_bytes is None else memory_bytes
+        self.memory_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # 키 → (직렬화된 결과, 만료 시각)
+        self._memory: 'OrderedDict[str, Tuple[str, Optional[float]]]' = OrderedDict()
+        self._memory_used = 0
+        self._lock = threading.Lock()
+
+        if self.backend == 'redis' and redis is None:
+            print("⚠️ redis 패키지가 없어 검색 결과 캐시를 sqlite에 저장합니다")
+            self.backend = 'sqlite'
+        if self.backend == 'redis':
+            self._shared = _RedisResults(redis_url or config.RESULT_CACHE_REDIS_URL)
+        elif self.backend == 'sqlite':
+            max_entries = config.RESULT_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+            self._shared = _SQLiteResults(path or config.RESULT_CACHE_PATH, max_entries)
+        elif self.backend == 'memory':
+            self._shared = None
+        else:
+            raise ValueError(f"지원하지 않는 결과 캐시 백엔드: {self.backend}")
+
+    @classmethod
+    def default(cls) -> Optional['ResultCache']:
+        """설정에 따라 프로세스 전체에서 공유하는 캐시 반환 (비활성화 시 None)"""
+        if not config.RESULT_CACHE_ENABLED:
+            return None
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    cls._default = cls()
+        return cls._default
+
+    def get(self, key: str) -> Optional[Dict]:
+        """검색 결과 조회 (메모리 → 공유 저장소 순)"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] is None or entry[1] > now:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return json.loads(entry[0])
+                self._forget(key)
+
+        entry = self._shared.get(key) if self._shared is not None else None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.shared_hits += 1
+            self._remember(key, entry[0], entry[1])
+        return json.loads(entry[0])
+
+    def put(self, key: str, result: Dict, ttl: float = None):
+        """검색 결과 저장 (같은 키는 덮어씀)"""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl and ttl > 0 else None
+        value = json.dumps(result, ensure_ascii=False)
+
+        with self._lock:
+            self._remember(key, value, expires_at)
+        if self._shared is not None:
+            self._shared.put(key, value, expires_at)
+
+    def _remember(self, key: str, value: str, expires_at: Optional[float]):
+        """메모리 LRU에 기록 (락을 잡은 상태에서 호출)"""
+        if self.memory_bytes > 0 and len(value) > self.memory_bytes:
+            return
+        self._forget(key)
+        self._memory[key] = (value, expires_at)
+        self._memory_used += len(value)
+        while self._memory and (
+            (self.memory_size > 0 and len(self._memory) > self.memory_size) or
+            (self.memory_bytes > 0 and self._memory_used > self.memory_bytes)
+        ):
+            _, (evicted, _) = self._memory.popitem(last=False)
+            self._memory_used -= len(evicted)
+            self.evictions += 1
+
+    def _forget(self, key: str):
+        """메모리에서 항목 제거 (락을 잡은 상태에서 호출)"""
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_used -= len(entry[0])
+
+    def clear(self):
+        """모든 검색 결과 삭제"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_used = 0
+        if self._shared is not None:
+            self._shared.clear()
+
+    def stats(self) -> Dict:
+        """캐시 적중 통계 (공유 저장소 항목 수는 테이블을 세지 않은 대략값, redis는 None)"""
+        hits = self.memory_hits + self.shared_hits
+        total = hits + self.misses
+        return {
+            'backend': self.backend,
+            'entries': self._shared.approx_count if self._shared is not None else len(self._memory),
+            'memory_entries': len(self._memory),
+            'memory_bytes': self._memory_used,
+            'memory_hits': self.memory_hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+            'evictions': self.evictions + (self._shared.evictions if self._shared is not None else 0),
+            'hit_ratio': round(hits / total, 4) if total else 0.0
+        }
+
+    def close(self):
+        if self._shared is not None:
+            self._shared.close()
@@ -0,0 +1,462 @@
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from config import config
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+|[가-힣]+')
+
+# PubMed 필드 태그가 붙은 조건 ("humans"[MeSH Terms], "2014"[Date - Publication] 등)은 본문 검색어가 아님
+FIELD_TAGGED_PATTERN = re.compile(r'"[^"]*"\s*\[[^\]]*\]|[^\s()"]+\[[^\]]*\]')
+
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'have', 'in', 'is', 'it',
+    'its', 'not', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'were', 'which', 'with'
+})
+
+# SQLite 한 문장에 넣는 바인딩 변수 수 상한
+_SQL_CHUNK = 900
+
+
+def tokenize(text: str) -> List[str]:
+    """소문자 영숫자/한글 토큰 (불용어 제외)"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def query_terms(query: str) -> List[str]:
+    """PubMed 검색식에서 본문 검색어만 추출 (필드 태그 조건과 AND/OR/NOT 제외, 중복 제거)"""
+    return list(dict.fromkeys(tokenize(FIELD_TAGGED_PATTERN.sub(' ', query))))
+
+
+def normalize_topic(query: str) -> str:
+    """주제(검색식) 키 정규화 (대소문자/공백 차이 무시)"""
+    return ' '.join(query.casefold().split())
+
+
+def _encode_postings(entries: Iterable[Tuple[int, int, int]]) -> bytes:
+    """(doc_id, 제목 빈도, 초록 빈도) 목록을 doc_id 차분 + varint로 압축 (doc_id 오름차순)"""
+    data = bytearray()
+    previous = 0
+    for doc_id, title_tf, abstract_tf in entries:
+        for value in (doc_id - previous, title_tf, abstract_tf):
+            while value >= 0x80:
+                data.append((value & 0x7F) | 0x80)
+                value >>= 7
+            data.append(value)
+        previous = doc_id
+    return bytes(data)
+
+
+def _decode_postings(data: bytes) -> Iterator[Tuple[int, int, int]]:
+    """_encode_postings의 역변환 (앞에서부터 하나씩 풀어, 필요한 doc_id를 지나면 멈출 수 있음)"""
+    values = []
+    value = shift = 0
+    doc_id = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        values.append(value)
+        value = shift = 0
+        if len(values) == 3:
+            doc_id += values[0]
+            yield doc_id, values[1], values[2]
+            values.clear()
+
+
+def _begin_immediate(conn: sqlite3.Connection):
+    """쓰기 잠금을 먼저 잡고 트랜잭션 시작 (여러 프로세스가 같은 색인에 쓸 때 next_block 등을 읽고 쓰는 사이 경합 방지)"""
+    if not conn.in_transaction:
+        conn.execute('BEGIN IMMEDIATE')
+
+
+def _compact_postings(conn: sqlite3.Connection) -> int:
+    """용어별 포스팅 블록을 하나로 합치고 삭제된 문서를 제거, 다시 쓴 용어 수 반환"""
+    _begin_immediate(conn)
+    live = {row[0] for row in conn.execute('SELECT doc_id FROM docs')}
+    rows = conn.execute(
+        'SELECT term FROM postings GROUP BY term HAVING COUNT(*) > 1 OR term NOT IN (SELECT term FROM terms WHERE df > 0)'
+    ).fetchall()
+
+    for (term,) in rows:
+        entries = []
+        for (data,) in conn.execute('SELECT data FROM postings WHERE term = ? ORDER BY block', (term,)):
+            entries.extend(entry for entry in _decode_postings(data) if entry[0] in live)
+        conn.execute('DELETE FROM postings WHERE term = ?', (term,))
+        if entries:
+            entries.sort()
+            conn.execute('INSERT INTO postings (term, block, data) VALUES (?, 0, ?)', (term, _encode_postings(entries)))
+
+    conn.execute('DELETE FROM terms WHERE df <= 0')
+    conn.commit()
+    return len(rows)
+
+
+class SearchIndex:
+    """논문 저장소 위의 BM25 역색인 (SQLite)
+
+    제목과 초록을 필드로 나눠 색인하고 BM25F(필드 가중치)로 점수를 매깁니다.
+    논문을 추가할 때마다 그 묶음의 포스팅을 용어별 블록 하나로 덧붙이고(증분 색인),
+    블록이 쌓이면 compact()가 용어별로 하나로 합치면서 삭제된 문서를 걸러냅니다.
+    묶음이 compact_interval개 쌓이면 요청 경로가 아닌 백그라운드 스레드가 별도 연결로 압축합니다.
+    검색했던 주제(검색식)와 그 결과 PMID도 기록해 반복 주제는 NCBI 호출 없이 답할 수 있게 합니다.
+    """
+
+    _default: Optional['SearchIndex'] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, path: str = None, title_weight: float = None, abstract_weight: float = None,
+                 k1: float = None, b: float = None, topic_ttl: float = None, compact_interval: int = None):
+        self.path = path or config.SEARCH_INDEX_PATH
+        self.title_weight = config.SEARCH_INDEX_TITLE_WEIGHT if title_weight is None else title_weight
+        self.abstract_weight = config.SEARCH_INDEX_ABSTRACT_WEIGHT if abstract_weight is None else abstract_weight
+        self.k1 = config.SEARCH_INDEX_BM25_K1 if k1 is None else k1
+        self.b = config.SEARCH_INDEX_BM25_B if b is None else b
+        self.topic_ttl = config.SEARCH_INDEX_TOPIC_TTL if topic_ttl is None else topic_ttl
+        self.compact_interval = config.SEARCH_INDEX_COMPACT_INTERVAL if compact_interval is None else compact_interval
+        self.topic_hits = 0
+        self.topic_misses = 0
+        self._batches_since_compact = 0
+        self._compactor: Optional[threading.Thread] = None
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS docs (
+                doc_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                pmid TEXT UNIQUE NOT NULL,
+                title_len INTEGER NOT NULL,
+                abstract_len INTEGER NOT NULL,
+                terms TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS terms (
+                term TEXT PRIMARY KEY,
+                df INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                block INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                PRIMARY KEY (term, block)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS topics (
+                topic TEXT PRIMARY KEY,
+                max_results INTEGER NOT NULL,
+                pmids TEXT NOT NULL,
+                searched_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value REAL NOT NULL
+            );
+        ''')
+        self._conn.commit()
+
+    @classmethod
+    def default(cls) -> Optional['SearchIndex']:
+        """설정에 따라 프로세스 전체에서 공유하는 색인 반환 (비활성화 시 None)"""
+        if not config.SEARCH_INDEX_ENABLED:
+            return None
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    cls._default = cls()
+        return cls._default
+
+    # 색인 갱신
+
+    def add_papers(self, papers: Iterable[Dict], replace: bool = True) -> int:
+        """논문 색인 (replace=False이면 이미 색인된 PMID는 건너뜀), 새로 색인한 논문 수 반환"""
+        papers = [paper for paper in papers if paper.get('pmid')]
+        if not papers:
+            return 0
+
+        with self._lock:
+            self._begin()
+            existing = self._existing_pmids([paper['pmid'] for paper in papers])
+            postings: Dict[str, List[Tuple[int, int, int]]] = {}
+            doc_frequency: Counter = Counter()
+            totals = Counter()
+            indexed = set()
+
+            for paper in papers:
+                pmid = paper['pmid']
+                if pmid in indexed or (pmid in existing and not replace):
+                    continue
+                if pmid in existing:
+                    self._delete_doc(pmid)
+
+                title_counts = Counter(tokenize(paper.get('title', '')))
+                abstract_counts = Counter(tokenize(paper.get('abstract', '')))
+                title_len = sum(title_counts.values())
+                abstract_len = sum(abstract_counts.values())
+                doc_terms = sorted(title_counts.keys() | abstract_counts.keys())
+
+                cursor = self._conn.execute(
+                    'INSERT INTO docs (pmid, title_len, abstract_len, terms) VALUES (?, ?, ?, ?)',
+                    (pmid, title_len, abstract_len, ' '.join(doc_terms))
+                )
+                doc_id = cursor.lastrowid
+                for term in doc_terms:
+                    postings.setdefault(term, []).append((doc_id, title_counts[term], abstract_counts[term]))
+                doc_frequency.update(doc_terms)
+                totals.update(doc_count=1, title_total=title_len, abstract_total=abstract_len)
+                indexed.add(pmid)
+
+            if indexed:
+                # 이번 묶음의 포스팅은 모든 용어가 같은 블록 번호를 사용 (용어별로 마지막 블록을 조회하지 않음)
+                block = int(self._meta('next_block'))
+                self._conn.executemany(
+                    'INSERT INTO postings (term, block, data) VALUES (?, ?, ?)',
+                    [(term, block, _encode_postings(entries)) for term, entries in postings.items()]
+                )
+                self._conn.executemany(
+                    'INSERT INTO terms (term, df) VALUES (?, ?) ON CONFLICT(term) DO UPDATE SET df = df + excluded.df',
+                    doc_frequency.items()
+                )
+                totals['next_block'] = 1
+                self._add_meta(totals)
+            self._conn.commit()
+
+            self._batches_since_compact += 1
+            if self.compact_interval and self._batches_since_compact >= self.compact_interval:
+                self._schedule_compact()
+
+        return len(indexed)
+
+    def delete(self, pmids: Iterable[str]) -> int:
+        """논문을 색인에서 제거 (포스팅은 compact() 때 정리), 제거한 논문 수 반환"""
+        with self._lock:
+            self._begin()
+            deleted = sum(self._delete_doc(pmid) for pmid in dict.fromkeys(pmids))
+            self._conn.commit()
+        return deleted
+
+    def _begin(self):
+        _begin_immediate(self._conn)
+
+    def _delete_doc(self, pmid: str) -> bool:
+        """문서 행 삭제와 df/통계 차감 (락을 잡은 상태에서 호출)"""
+        row = self._conn.execute(
+            'SELECT title_len, abstract_len, terms FROM docs WHERE pmid = ?', (pmid,)
+        ).fetchone()
+        if row is None:
+            return False
+
+        title_len, abstract_len, doc_terms = row
+        self._conn.execute('DELETE FROM docs WHERE pmid = ?', (pmid,))
+        self._conn.executemany('UPDATE terms SET df = df - 1 WHERE term = ?', [(term,) for term in doc_terms.split()])
+        self._add_meta({'doc_count': -1, 'title_total': -title_len, 'abstract_total': -abstract_len})
+        return True
+
+    def compact(self) -> int:
+        """용어별 포스팅 블록을 하나로 합치고 삭제된 문서를 제거, 다시 쓴 용어 수 반환 (적재/유지보수용)"""
+        with self._lock:
+            self._batches_since_compact = 0
+            return _compact_postings(self._conn)
+
+    def _schedule_compact(self):
+        """백그라운드 압축 시작 (락을 잡은 상태에서 호출, 이미 실행 중이면 무시)"""
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._batches_since_compact = 0
+        self._compactor = threading.Thread(target=self._compact_in_background, name='search-index-compact', daemon=True)
+        self._compactor.start()
+
+    def _compact_in_background(self):
+        """별도 연결로 압축 (WAL이므로 그동안 이 인스턴스의 조회는 막히지 않고, 색인 쓰기만 잠금을 기다림)"""
+        try:
+            conn = sqlite3.connect(self.path, timeout=30)
+            try:
+                _compact_postings(conn)
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"검색 색인 압축 오류: {e}")
+
+    def wait_for_compaction(self, timeout: float = None):
+        """진행 중인 백그라운드 압축이 끝날 때까지 대기 (테스트/종료용)"""
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join(timeout)
+
+    # 검색
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """색인 전체에서 BM25 상위 limit개 (pmid, 점수)"""
+        with self._lock:
+            scores = self._score(query_terms(query))
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:limit]
+
+    def score(self, query: str, pmids: Iterable[str]) -> Dict[str, float]:
+        """주어진 PMID들의 BM25 점수 (색인에 없거나 검색어가 없으면 0점)"""
+        pmids = list(dict.fromkeys(pmids))
+        with self._lock:
+            docs = self._docs_by_pmid(pmids)
+            scores = self._score(query_terms(query), docs) if docs else {}
+        return {pmid: scores.get(pmid, 0.0) for pmid in pmids}
+
+    def _score(self, terms: List[str], docs: Optional[Dict[int, Tuple[str, int, int]]] = None) -> Dict[str, float]:
+        """BM25F 점수 {pmid: 점수} (docs가 주어지면 그 문서만, 락을 잡은 상태에서 호출)"""
+        if not terms:
+            return {}
+
+        doc_count = self._meta('doc_count')
+        if doc_count <= 0:
+            return {}
+        avg_title = max(self._meta('title_total') / doc_count, 1.0)
+        avg_abstract = max(self._meta('abstract_total') / doc_count, 1.0)
+
+        # 블록 안의 포스팅과 블록 순서 모두 doc_id 오름차순이므로, 후보가 주어지면 가장 큰 후보를 지나면 멈춤
+        last_doc = max(docs) if docs is not None else None
+
+        # 용어별 (idf, {doc_id: (제목 빈도, 초록 빈도)})
+        matches = []
+        for term in terms:
+            row = self._conn.execute('SELECT df FROM terms WHERE term = ?', (term,)).fetchone()
+            if row is None or row[0] <= 0:
+                continue
+            df = row[0]
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            frequencies = {}
+            for (data,) in self._conn.execute('SELECT data FROM postings WHERE term = ? ORDER BY block', (term,)):
+                past_last = False
+                for doc_id, title_tf, abstract_tf in _decode_postings(data):
+                    if last_doc is not None and doc_id > last_doc:
+                        past_last = True
+                        break
+                    if docs is None or doc_id in docs:
+                        frequencies[doc_id] = (title_tf, abstract_tf)
+                if past_last:
+                    break
+            matches.append((idf, frequencies))
+
+        if docs is None:
+            candidates = set().union(*(frequencies.keys() for _, frequencies in matches)) if matches else set()
+            docs = self._docs_by_id(list(candidates))
+
+        scores: Dict[str, float] = {}
+        for idf, frequencies in matches:
+            for doc_id, (title_tf, abstract_tf) in frequencies.items():
+                doc = docs.get(doc_id)
+                if doc is None:  # 삭제되었거나 다시 색인된 문서의 이전 포스팅
+                    continue
+                pmid, title_len, abstract_len = doc
+                tf = (self.title_weight * title_tf / (1 - self.b + self.b * title_len / avg_title)
+                      + self.abstract_weight * abstract_tf / (1 - self.b + self.b * abstract_len / avg_abstract))
+                scores[pmid] = scores.get(pmid, 0.0) + idf * tf / (self.k1 + tf)
+        return scores
+
+    def _docs_by_pmid(self, pmids: List[str]) -> Dict[int, Tuple[str, int, int]]:
+        docs = {}
+        for start in range(0, len(pmids), _SQL_CHUNK):
+            chunk = pmids[start:start + _SQL_CHUNK]
+            for doc_id, pmid, title_len, abstract_len in self._conn.execute(
+                f'SELECT doc_id, pmid, title_len, abstract_len FROM docs WHERE pmid IN ({",".join("?" * len(chunk))})',
+                chunk
+            ):
+                docs[doc_id] = (pmid, title_len, abstract_len)
+        return docs
+
+    def _docs_by_id(self, doc_ids: List[int]) -> Dict[int, Tuple[str, int, int]]:
+        docs = {}
+        for start in range(0, len(doc_ids), _SQL_CHUNK):
+            chunk = doc_ids[start:start + _SQL_CHUNK]
+            for doc_id, pmid, title_len, abstract_len in self._conn.execute(
+                f'SELECT doc_id, pmid, title_len, abstract_len FROM docs WHERE doc_id IN ({",".join("?" * len(chunk))})',
+                chunk
+            ):
+                docs[doc_id] = (pmid, title_len, abstract_len)
+        return docs
+
+    def _existing_pmids(self, pmids: List[str]) -> set:
+        existing = set()
+        for start in range(0, len(pmids), _SQL_CHUNK):
+            chunk = pmids[start:start + _SQL_CHUNK]
+            existing.update(row[0] for row in self._conn.execute(
+                f'SELECT pmid FROM docs WHERE pmid IN ({",".join("?" * len(chunk))})', chunk
+            ))
+        return existing
+
+    # 반복 주제
+
+    def remember_topic(self, query: str, max_results: int, pmids: List[str]):
+        """NCBI 검색 결과(PMID 순서)를 주제별로 기록"""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO topics (topic, max_results, pmids, searched_at) VALUES (?, ?, ?, ?)',
+                (normalize_topic(query), max_results, json.dumps(pmids), time.time())
+            )
+            self._conn.commit()
+
+    def topic_pmids(self, query: str, max_results: int) -> Optional[List[str]]:
+        """최근(TTL 이내)에 같은 주제를 max_results개 이상 검색했으면 그 PMID 목록, 아니면 None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT max_results, pmids, searched_at FROM topics WHERE topic = ?', (normalize_topic(query),)
+            ).fetchone()
+
+            fresh = row is not None and row[0] >= max_results and (
+                not self.topic_ttl or self.topic_ttl <= 0 or time.time() - row[2] < self.topic_ttl
+            )
+            if not fresh:
+                self.topic_misses += 1
+                return None
+            self.topic_hits += 1
+        return json.loads(row[1])[:max_results]
+
+    # 통계
+
+    def _meta(self, key: str) -> float:
+        row = self._conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else 0.0
+
+    def _add_meta(self, deltas: Dict[str, float]):
+        self._conn.executemany(
+            'INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = value + excluded.value',
+            deltas.items()
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._meta('doc_count'))
+
+    def stats(self, storage: bool = False) -> Dict:
+        """색인 크기(유지 중인 doc_count)와 반복 주제 적중 통계
+
+        storage=True면 용어/포스팅 블록 수와 크기도 셉니다. 테이블 전체를 훑으므로 /stats가 아닌
+        압축 확인 같은 유지 보수 작업에서만 씁니다.
+        """
+        with self._lock:
+            documents = int(self._meta('doc_count'))
+            if storage:
+                terms = self._conn.execute('SELECT COUNT(*) FROM terms').fetchone()[0]
+                blocks, size = self._conn.execute(
+                    'SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM postings'
+                ).fetchone()
+        total = self.topic_hits + self.topic_misses
+        stats = {
+            'documents': documents,
+            'topic_hits': self.topic_hits,
+            'topic_misses': self.topic_misses,
+            'topic_hit_ratio': round(self.topic_hits / total, 4) if total else 0.0
+        }
+        if storage:
+            stats.update(terms=terms, posting_blocks=blocks, posting_bytes=size)
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
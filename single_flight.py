@@ -0,0 +1,90 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar('T')
+
+class _Call:
+    """진행 중인 실행 하나 (결과를 기다리는 호출자들이 공유)"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """같은 키의 작업이 동시에 요청되면 한 번만 실행하고 결과를 공유 (스레드용)
+
+    먼저 들어온 호출자가 작업을 실행하고, 실행 중에 같은 키로 들어온 호출자들은
+    그 결과(또는 예외)를 그대로 받습니다. 실행이 끝나면 키가 비워지므로 캐시는 아닙니다.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'executions': self.executions, 'shared': self.shared, 'in_flight': len(self._calls)}
+
+
+class AsyncSingleFlight:
+    """SingleFlight의 asyncio 버전 (같은 이벤트 루프 안의 코루틴끼리 결과 공유)"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.executions = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        future = self._calls.get(key)
+        if future is not None and future.get_loop() is asyncio.get_running_loop():
+            self.shared += 1
+        else:
+            future = asyncio.ensure_future(func())
+            self._calls[key] = future
+            self.executions += 1
+            future.add_done_callback(lambda f: self._forget(key, f))
+
+        # 한 호출자가 취소되어도 다른 호출자들이 기다리는 실행은 계속되도록 shield
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future):
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if not future.cancelled():
+            future.exception()  # 기다리던 호출자가 모두 취소된 경우 미회수 예외 경고 방지
+
+    def stats(self) -> Dict:
+        return {'executions': self.executions, 'shared': self.shared, 'in_flight': len(self._calls)}
@@ -0,0 +1,66 @@
+import sqlite3
+from typing import Iterable, Optional
+from config import config
+
+
+class CacheEviction:
+    """SQLite 캐시 테이블의 만료/초과 항목 정리와 조회 시각 갱신 주기 (ArticleStore, SummaryCache, ResultCache 공용)
+
+    정리는 매 기록마다 하지 않고 evict_interval초마다 또는 대략적인 항목 수가 한도를 넘을 때만 하며,
+    한도를 넘으면 90%까지 줄여 가득 찬 상태에서 기록할 때마다 정리하지 않게 합니다.
+    조회 시각(accessed_at)은 touch_interval초가 지난 항목만 갱신해 읽기마다 쓰기가 생기지 않게 합니다.
+    메서드는 모두 캐시의 락을 잡은 상태에서 호출합니다.
+    """
+
+    def __init__(self, table: str, key_column: str, max_entries: int, expiring_tables: Iterable[str] = ()):
+        self.table = table
+        self.key_column = key_column
+        self.max_entries = max_entries
+        # 정리할 때 만료 항목을 함께 지우는 테이블 (expires_at 열 필요)
+        self.expiring_tables = (table, *expiring_tables)
+        self.evict_interval = config.CACHE_EVICT_INTERVAL
+        self.touch_interval = config.CACHE_TOUCH_INTERVAL
+        self.evictions = 0
+        # 마지막 정리 이후 기록 수를 더한 대략적인 항목 수 (덮어쓰기도 더하므로 실제보다 크거나 같음, None이면 아직 세지 않음)
+        self.approx_count: Optional[int] = None
+        self._evicted_at = 0.0
+
+    def is_stale(self, accessed_at: float, now: float) -> bool:
+        """조회 시각을 갱신할 때가 됐는지"""
+        return now - accessed_at >= self.touch_interval
+
+    def written(self, conn: sqlite3.Connection, rows: int, now: float):
+        """rows개를 기록(커밋)한 뒤 호출 - 정리 주기가 지났거나 한도를 넘었으면 정리"""
+        if self.approx_count is not None:
+            self.approx_count += rows
+        if self._should_evict(now):
+            self.evict(conn, now)
+
+    def cleared(self):
+        """테이블을 비운 뒤 호출"""
+        self.approx_count = 0
+
+    def _should_evict(self, now: float) -> bool:
+        if self.approx_count is None or now - self._evicted_at >= self.evict_interval:
+            return True
+        return bool(self.max_entries and self.max_entries > 0 and self.approx_count > self.max_entries)
+
+    def evict(self, conn: sqlite3.Connection, now: float):
+        """만료된 항목과 최대 개수를 넘는 오래된(최근 조회 기준) 항목 제거"""
+        for table in self.expiring_tables:
+            conn.execute(f'DELETE FROM {table} WHERE expires_at IS NOT NULL AND expires_at <= ?', (now,))
+
+        count = conn.execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()[0]
+        if self.max_entries and self.max_entries > 0 and count > self.max_entries:
+            overflow = count - (self.max_entries - self.max_entries // 10)
+            conn.execute(
+                f'DELETE FROM {self.table} WHERE {self.key_column} IN '
+                f'(SELECT {self.key_column} FROM {self.table} ORDER BY accessed_at ASC LIMIT ?)',
+                (overflow,)
+            )
+            self.evictions += overflow
+            count -= overflow
+
+        conn.commit()
+        self.approx_count = count
+        self._evicted_at = now
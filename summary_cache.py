@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from config import config
+from sqlite_cache import CacheEviction
+
+def normalize_query(query: str) -> str:
+    """캐시 키용 질의 정규화 (대소문자/공백 차이 무시)"""
+    return ' '.join(query.casefold().split())
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def paper_summary_key(paper: Dict, query: str, model: str, prompt_version: str) -> str:
+    """논문 요약 캐시 키 (PMID + 초록 해시 + 정규화된 질의 + 모델 + 프롬프트 버전)"""
+    abstract_hash = hashlib.sha256(paper.get('abstract', '').encode('utf-8')).hexdigest()
+    return _digest('paper', paper.get('pmid', ''), abstract_hash, normalize_query(query), model, prompt_version)
+
+
+def overall_summary_key(papers: List[Dict], query: str, model: str, prompt_version: str) -> str:
+    """종합 요약 캐시 키 (프롬프트에 들어가는 논문 제목/요약 내용 + 질의 + 모델 + 프롬프트 버전)"""
+    contents = [
+        [paper.get('pmid', ''), paper.get('title', ''), paper.get('ai_summary', '')[:200]]
+        for paper in papers
+    ]
+    return _digest('overall', contents, normalize_query(query), model, prompt_version)
+
+
+class SummaryCache:
+    """LLM 요약 결과를 내용 기반 키로 저장하는 2단계 캐시
+
+    1단계는 프로세스 메모리의 LRU, 2단계는 SQLite 파일(여러 워커가 공유)입니다.
+    디스크에서 찾은 항목은 메모리로 올리고, 두 단계 모두 최대 개수를 넘으면
+    가장 오래 조회되지 않은 항목부터 제거합니다 (디스크는 CacheEviction 주기로).
+    """
+
+    _default: Optional['SummaryCache'] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, path: str = None, memory_size: int = None, ttl: float = None, max_entries: int = None):
+        self.path = path or config.SUMMARY_CACHE_PATH
+        self.memory_size = config.SUMMARY_CACHE_MEMORY_SIZE if memory_size is None else memory_size
+        self.ttl = config.SUMMARY_CACHE_TTL if ttl is None else ttl
+        max_entries = config.SUMMARY_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0  # 메모리 LRU에서 밀려난 수 (디스크는 _eviction.evictions)
+
+        # key → (요약, 만료 시각)
+        self._memory: 'OrderedDict[str, Tuple[str, Optional[float]]]' = OrderedDict()
+        self._eviction = CacheEviction('summaries', 'key', max_entries)
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS summaries (
+                key TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                expires_at REAL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_summaries_accessed ON summaries(accessed_at)')
+        self._conn.commit()
+
+    @classmethod
+    def default(cls) -> Optional['SummaryCache']:
+        """설정에 따라 프로세스 전체에서 공유하는 캐시 반환 (비활성화 시 None)"""
+        if not config.SUMMARY_CACHE_ENABLED:
+            return None
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    cls._default = cls()
+        return cls._default
+
+    def get(self, key: str) -> Optional[str]:
+        """요약 조회 (메모리 → 디스크 순)"""
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                summary, expires_at = cached
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return summary
+                del self._memory[key]
+
+            row = self._conn.execute(
+                'SELECT summary, accessed_at, expires_at FROM summaries '
+                'WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)',
+                (key, now)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            summary, accessed_at, expires_at = row
+            if self._eviction.is_stale(accessed_at, now):
+                self._conn.execute('UPDATE summaries SET accessed_at = ? WHERE key = ?', (now, key))
+                self._conn.commit()
+            self.disk_hits += 1
+            self._remember(key, summary, expires_at)
+            return summary
+
+    def put(self, key: str, summary: str, ttl: float = None):
+        """요약 저장 (같은 키는 덮어씀)"""
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = now + ttl if ttl and ttl > 0 else None
+
+        with self._lock:
+            self._remember(key, summary, expires_at)
+            self._conn.execute(
+                'INSERT OR REPLACE INTO summaries (key, summary, created_at, accessed_at, expires_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, summary, now, now, expires_at)
+            )
+            self._conn.commit()
+            self._eviction.written(self._conn, 1, now)
+
+    def _remember(self, key: str, summary: str, expires_at: Optional[float]):
+        """메모리 LRU에 기록 (락을 잡은 상태에서 호출)"""
+        self._memory[key] = (summary, expires_at)
+        self._memory.move_to_end(key)
+        while self.memory_size > 0 and len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """모든 요약 삭제"""
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute('DELETE FROM summaries')
+            self._conn.commit()
+            self._eviction.cleared()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM summaries').fetchone()[0]
+
+    def stats(self) -> Dict:
+        """캐시 적중 통계 (디스크 항목 수는 COUNT(*) 대신 정리 때 센 대략값)"""
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {
+            'entries': self._eviction.approx_count,
+            'memory_entries': len(self._memory),
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions + self._eviction.evictions,
+            'hit_ratio': round(hits / total, 4) if total else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -2,40 +2,78 @@
 """
 PubMed 의료 검색 앱 테스트 예시
 
-이 스크립트는 OpenAI API 키 없이도 기본 기능을 테스트할 수 있습니다.
+이 스크립트는 OpenAI API 키나 인터넷 연결 없이도 기본 기능을 테스트할 수 있습니다.
+PubMed/OpenAI 호출은 로컬 대역 서버(mock_eutils.py)가 fixtures/의 XML로 응답합니다.
 """
 
+from contextlib import contextmanager
 from medical_search_service import MedicalSearchService
-import time
+
+@contextmanager
+def mock_services(**behavior):
+    """로컬 대역 서버(mock_eutils)를 띄우고 E-utilities/OpenAI 주소를 그쪽으로 돌림 (캐시는 끔)
+    
+    behavior는 create_app에 그대로 넘깁니다 (예: eutils=MockBehavior(rate_limit=3)).
+    """
+    from config import config
+    from mock_eutils import create_app, serve_in_thread
+    
+    with serve_in_thread(create_app(**behavior)) as base_url:
+        overrides = {
+            'PUBMED_SEARCH_URL': f"{base_url}/entrez/eutils/esearch.fcgi",
+            'PUBMED_FETCH_URL': f"{base_url}/entrez/eutils/efetch.fcgi",
+            'PUBMED_SUMMARY_URL': f"{base_url}/entrez/eutils/esummary.fcgi",
+            'PUBMED_LINK_URL': f"{base_url}/entrez/eutils/elink.fcgi",
+            'OPENAI_BASE_URL': f"{base_url}/v1",
+            'OPENAI_API_KEY': "mock",
+            'ARTICLE_CACHE_ENABLED': False,
+            'SEARCH_INDEX_ENABLED': False,
+            'SUMMARY_CACHE_ENABLED': False,
+            'RESULT_CACHE_ENABLED': False
+        }
+        originals = {name: getattr(config, name) for name in overrides}
+        for name, value in overrides.items():
+            setattr(config, name, value)
+        try:
+            yield base_url
+        finally:
+            for name, value in originals.items():
+                setattr(config, name, value)
 
 def test_medical_search():
-    """의료 검색 기능 테스트"""
+    """의료 검색 기능 테스트 (로컬 대역 서버 사용)"""
     print("🏥 PubMed 의료 검색 앱 테스트")
     print("=" * 50)
     
-    # 서비스 초기화
-    service = MedicalSearchService()
-    
-    # 테스트 쿼리들
-    test_queries = [
-        "CRP 수치 12.5",
-        "HbA1c 7.8 당뇨병",
-        "혈압 180/120",
-        "파킨슨병 치료",
-        "콜레스테롤 250"
-    ]
-    
-    for i, query in enumerate(test_queries, 1):
-        print(f"\n📝 테스트 {i}: {query}")
-        print("-" * 30)
+    with mock_services():
+        # 서비스 초기화
+        service = MedicalSearchService()
         
-        try:
+        # 테스트 쿼리들
+        test_queries = [
+            "CRP 수치 12.5",
+            "HbA1c 7.8 당뇨병",
+            "혈압 180/120",
+            "파킨슨병 치료",
+            "콜레스테롤 250",
+            "ca 125 정상범위"
+        ]
+        
+        summarized = 0
+        for i, query in enumerate(test_queries, 1):
+            print(f"\n📝 테스트 {i}: {query}")
+            print("-" * 30)
+            
             # 검색 실행
             results = service.search_medical_papers(query, max_results=3)
             
             # 결과 출력
             print(f"✅ 검색 완료 - {results['processing_time']}초")
             print(f"📊 발견된 논문: {results['total_papers_found']}개")
+            # 대역 서버는 일치하는 논문이 없어도 fixture 전체를 돌려주므로 항상 검색 결과가 있음
+            assert results['total_papers_found'] > 0
+            assert len(results['papers']) <= 3
+            summarized += len(results['papers'])
             
             # 감지된 의료 개체
             if results['detected_entities']:
@@ -60,14 +98,13 @@ def test_medical_search():
                 for j, paper in enumerate(results['papers'][:2], 1):
                     print(f"  {j}. {paper['title'][:80]}...")
                     print(f"     PMID: {paper['pmid']}")
+                    assert paper['pmid'] and paper['title']
+                    # 대역 서버의 고정 요약이 그대로 전달되어야 함
+                    assert '핵심 내용' in paper['ai_summary']
             
             print()
-            
-        except Exception as e:
-            print(f"❌ 오류 발생: {e}")
         
-        # API 호출 제한을 위한 대기
-        time.sleep(1)
+        assert summarized > 0
 
 def test_medical_analyzer():
     """의료 텍스트 분석 기능만 테스트"""
@@ -78,15 +115,42 @@ def test_medical_analyzer():
     
     analyzer = MedicalAnalyzer()
     
-    test_texts = [
-        "CRP 수치가 15.2로 나왔어요",
-        "당화혈색소 HbA1c 8.5% 당뇨병",
-        "혈압이 190/100으로 측정되었습니다",
-        "총 콜레스테롤 280, HDL 35",
-        "파킨슨병 환자의 levodopa 반응성"
+    # 입력별 기대 개체 (텍스트, 종류, 값, 단위)와 검색어 (공통 사람/기간 조건 앞부분)
+    test_cases = [
+        ("CRP 15.2로 나왔어요",
+         [('CRP 15.2', 'test', 15.2, 'mg/L')],
+         ['"C-reactive protein"', '"inflammation"', '"acute phase"']),
+        ("당화혈색소 HbA1c 8.5% 당뇨병",
+         [('HBA1C 8.5', 'test', 8.5, '%'), ('당뇨', 'disease', None, None), ('당뇨병', 'disease', None, None)],
+         ['"당뇨"', '"diabetes mellitus"', '"Hemoglobin A1c"', '"diabetes"']),
+        ("혈압이 190/100으로 측정되었습니다",
+         [('190/100', 'test', 190, 'mmHg')],
+         ['"blood pressure"']),
+        ("총 콜레스테롤 280, HDL 35",
+         [('CHOLESTEROL 280.0', 'test', 280.0, 'mg/dL'), ('HDL 35.0', 'test', 35.0, 'mg/dL')],
+         ['"Total cholesterol"', '"cardiovascular"', '"lipid"', '"HDL cholesterol"']),
+        ("파킨슨병 환자의 levodopa 반응성",
+         [('파킨슨', 'disease', None, None), ('파킨슨병', 'disease', None, None), ('levodopa', 'disease', None, None)],
+         ['"parkinson"', '"parkinson disease"', '"levodopa"']),
+        # CA-125: 수치가 붙어 있으면 값으로, 언급만 있으면 값 없이 인식하고 종양 표지자 전용 쿼리로 끝남
+        ("CA-125 45 높음",
+         [('CA-125 45.0', 'test', 45.0, 'U/mL')],
+         ['"CA-125"', '"ovarian cancer"']),
+        ("ca 125 정상범위",
+         [('CA-125', 'test', None, 'U/mL')],
+         ['"CA-125"', '"reference values"']),
+        # SCS/DBS: 신경자극술은 다른 개체와 상관없이 전용 쿼리로 바로 끝남
+        ("척수자극술 SCS 효과",
+         [('척수자극술', 'disease', None, None), ('효과', 'disease', None, None),
+          ('scs', 'treatment', None, None), ('척수자극술', 'treatment', None, None)],
+         ['"spinal cord stimulation"', '"efficacy"']),
+        ("DBS 파킨슨병",
+         [('파킨슨', 'disease', None, None), ('파킨슨병', 'disease', None, None), ('dbs', 'treatment', None, None)],
+         ['"deep brain stimulation"', '"parkinson disease"']),
     ]
+    query_suffix = ' AND "humans"[MeSH Terms] AND ("2014"[Date - Publication] : "2024"[Date - Publication])'
     
-    for text in test_texts:
+    for text, expected_entities, expected_terms in test_cases:
         print(f"\n📝 입력: {text}")
         
         # 의료 개체 분석
@@ -101,10 +165,12 @@ def test_medical_analyzer():
                 if entity.normal_range:
                     info += f" - 정상범위: {entity.normal_range}"
                 print(info)
+        assert [(e.text, e.entity_type, e.value, e.unit) for e in entities] == expected_entities
         
         # 검색 쿼리 생성
         search_query = analyzer.generate_search_query(entities, text)
         print(f"🔍 생성된 검색 쿼리: {search_query}")
+        assert search_query == ' AND '.join(expected_terms) + query_suffix
         
         # 수치 해석
         interpretations = analyzer.interpret_values(entities)
@@ -112,38 +178,951 @@ def test_medical_analyzer():
             print("📈 수치 해석:")
             for interpretation in interpretations:
                 print(f"  • {interpretation}")
+    
+    # 정상 범위를 벗어난 수치는 비정상으로 해석
+    assert analyzer.interpret_values(analyzer.analyze_input("CRP 15.2로 나왔어요")) == [
+        'C-reactive protein: 15.2 (비정상, 정상: <3.0 mg/L)'
+    ]
+    assert analyzer.interpret_values(analyzer.analyze_input("HbA1c 8.5%")) == [
+        'Hemoglobin A1c: 8.5 (비정상, 정상: <5.7%)'
+    ]
+
+def test_relevance_scorer():
+    """관련성 점수 키워드 행렬과 1만 건 채점 시간 테스트 (인터넷 연결 불필요)"""
+    print("\n📏 관련성 점수 테스트")
+    print("=" * 50)
+    
+    import os
+    import time
+    from medical_analyzer import MedicalAnalyzer
+    from pubmed_search import iter_papers_xml
+    from relevance_scorer import SearchRelevanceScorer, SummaryRelevanceScorer, term_incidence
+    
+    texts = ['ca-125 tumor marker', 'patient care', '', 'plant biology of patients']
+    terms = ['patient', 'patient care', 'ca-125', '', 'patient']
+    assert term_incidence(texts, terms).tolist() == [[term in text for term in terms] for text in texts]
+    assert term_incidence(texts, []).shape == (4, 0)
+    
+    fixture = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'efetch_sample.xml')
+    with open(fixture, 'rb') as f:
+        base = list(iter_papers_xml(f))
+    papers = [dict(base[i % len(base)], pmid=str(i)) for i in range(10000)]
+    query = "CA-125 정상범위 당뇨병 patients"
+    entities = MedicalAnalyzer().analyze_input(query)
+    
+    summary_scorer, search_scorer = SummaryRelevanceScorer(), SearchRelevanceScorer()
+    start = time.perf_counter()
+    summary_scores = summary_scorer.score(papers, query)
+    summary_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    search_scores = search_scorer.score(papers, entities, query)
+    search_elapsed = time.perf_counter() - start
+    print(f"✅ 논문 1만 건: 요약용 {summary_elapsed * 1000:.0f}ms, 검색용 {search_elapsed * 1000:.0f}ms")
+    
+    # 한 건씩 채점한 결과와 일치
+    for index, paper in enumerate(base):
+        assert summary_scores[index] == summary_scorer.score([paper], query)[0]
+        assert search_scores[index] == search_scorer.score([paper], entities, query)[0]
+    assert summary_elapsed < 0.8 and search_elapsed < 0.8
 
 def test_pubmed_search():
-    """PubMed 검색 기능만 테스트"""
+    """PubMed 검색 기능만 테스트 (로컬 대역 서버 사용)"""
     print("\n🔍 PubMed 검색 테스트")
     print("=" * 50)
     
     from pubmed_search import PubMedSearcher
     
-    searcher = PubMedSearcher()
-    
-    # 간단한 검색 테스트
-    query = "diabetes mellitus"
-    print(f"📝 검색어: {query}")
-    
-    try:
+    with mock_services():
+        searcher = PubMedSearcher()
+        
+        # 간단한 검색 테스트
+        query = "diabetes mellitus"
+        print(f"📝 검색어: {query}")
+        
         # 논문 ID 검색
         pmids = searcher.search_papers(query, max_results=3)
         print(f"✅ 발견된 논문 ID: {len(pmids)}개")
+        assert pmids and len(pmids) <= 3
+        # 제목/초록에 검색어가 들어간 fixture 논문이 먼저 나옴
+        assert pmids[0] == '37010001'
+        
+        # 상세 정보 가져오기
+        papers = searcher.fetch_paper_details(pmids[:2])
+        print(f"📚 상세 정보 가져온 논문: {len(papers)}개")
+        assert [paper['pmid'] for paper in papers] == pmids[:2]
+        
+        for i, paper in enumerate(papers, 1):
+            print(f"\n{i}. {paper['title'][:80]}...")
+            print(f"   저자: {', '.join(paper['authors'][:2]) if paper['authors'] else 'N/A'}")
+            print(f"   저널: {paper['journal']}")
+            print(f"   PMID: {paper['pmid']}")
+            assert paper['title'] and paper['abstract']
+        
+        summaries = searcher.fetch_summaries(pmids[:1])
+        assert summaries and summaries[0]['title'] == papers[0]['title']
+
+def test_history_paging():
+    """히스토리 서버(usehistory=y, WebEnv) 배치 병렬 가져오기 테스트 (로컬 대역 서버 사용)"""
+    print("\n📑 히스토리 서버 배치 테스트")
+    print("=" * 50)
+    
+    import os
+    import requests
+    import tempfile
+    import time
+    from config import config
+    from mock_eutils import FixtureCorpus, MockBehavior
+    from pubmed_search import PubMedSearcher
+    from rate_limiter import TokenBucket
+    
+    fixture = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'efetch_sample.xml')
+    with open(fixture, 'rb') as f:
+        sample = f.read()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        # PMID 첫 자리만 바꾼 사본으로 여러 배치가 필요한 크기의 코퍼스를 만듦
+        for digit in range(1, 10):
+            with open(os.path.join(tmp, f'efetch_{digit}.xml'), 'wb') as f:
+                f.write(sample.replace(b'<PMID Version="1">3', f'<PMID Version="1">{digit}'.encode()))
+        query = "patients"
+        expected = FixtureCorpus(tmp).search(query)[:10]
+        
+        eutils = MockBehavior(latency=0.3, rate_limit=25)
+        with mock_services(fixtures_dir=tmp, eutils=eutils) as base_url:
+            searcher = PubMedSearcher(rate_limiter=TokenBucket(rate=20))
+            
+            # esearch는 PMID 대신 WebEnv/query_key와 전체 건수만 돌려줌
+            history = searcher.search_with_history(query)
+            print(f"✅ WebEnv {history['webenv']}, query_key {history['query_key']}, {history['count']}건")
+            assert history['webenv'] and history['query_key'] == '1' and history['count'] > len(expected)
+            
+            # 10건을 4건씩: efetch 3번을 동시에 보내고 결과는 retstart 순서대로
+            before = eutils.requests
+            start = time.perf_counter()
+            batches = list(searcher.iter_history_batches(history['webenv'], history['query_key'], 10,
+                                                         batch_size=4, max_workers=3))
+            elapsed = time.perf_counter() - start
+            print(f"✅ 배치 {[len(batch) for batch in batches]}, {elapsed:.2f}초 (요청당 지연 {eutils.latency}초)")
+            assert [len(batch) for batch in batches] == [4, 4, 2]
+            assert [paper['pmid'] for batch in batches for paper in batch] == expected
+            assert eutils.requests - before == 3
+            assert elapsed < 2 * eutils.latency
+            
+            # search_and_fetch(use_history=True)도 같은 순서로 모음 (esearch 1번 + efetch 배치)
+            eutils.latency = 0.0
+            before = eutils.requests
+            original_batch_size = config.PUBMED_HISTORY_BATCH_SIZE
+            config.PUBMED_HISTORY_BATCH_SIZE = 4
+            try:
+                papers = searcher.search_and_fetch(query, max_results=10, use_history=True)
+            finally:
+                config.PUBMED_HISTORY_BATCH_SIZE = original_batch_size
+            assert [paper['pmid'] for paper in papers] == expected
+            assert eutils.requests - before == 4
+            assert requests.get(f"{base_url}/mock/stats").json()['eutils']['rate_limited'] == 0
+
+def test_rate_limiter():
+    """토큰 버킷 호출 제한 테스트 (여러 스레드가 동시에 불러도 대역 서버의 초당 제한을 넘지 않음)"""
+    import os
+    import requests
+    import tempfile
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from mock_eutils import MockBehavior
+    from pubmed_search import PubMedSearcher
+    from rate_limiter import FileTokenBucket, TokenBucket
+    
+    print("\n🚦 호출 제한 테스트")
+    print("=" * 50)
+    
+    # 토큰을 먼저 차감하므로 연속 예약의 대기 시간이 1/rate씩 늘어남
+    bucket = TokenBucket(rate=10)
+    waits = [bucket.reserve() for _ in range(3)]
+    assert waits[0] == 0 and 0.09 < waits[1] <= 0.1 and 0.19 < waits[2] <= 0.2
+    assert bucket.stats()['acquired'] == 3 and bucket.stats()['waited'] == 2
+    
+    # 상태 파일을 공유하는 두 버킷(워커 두 개에 해당)은 같은 토큰을 나눠 씀
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'rate.state')
+        first, second = FileTokenBucket(path, rate=10), FileTokenBucket(path, rate=10)
+        try:
+            assert first.reserve() == 0
+            assert 0.05 < second.reserve() <= 0.1
+        finally:
+            first.close()
+            second.close()
+    
+    # 대역 서버는 초당 25회를 넘으면 429를 반환: 초당 20회로 제한하면 한 번도 걸리지 않아야 함
+    with mock_services(eutils=MockBehavior(rate_limit=25)) as base_url:
+        limiter = TokenBucket(rate=20)
+        searcher = PubMedSearcher(rate_limiter=limiter)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: searcher.search_papers("diabetes", max_results=3), range(12)))
+        elapsed = time.perf_counter() - start
+        
+        stats = requests.get(f"{base_url}/mock/stats").json()['eutils']
+        print(f"✅ 요청 {stats['requests']}번, 429 {stats['rate_limited']}번, {elapsed:.2f}초 "
+              f"(평균 대기 {limiter.stats()['avg_wait_ms']}ms)")
+        assert all(results)
+        assert stats['requests'] == 12 and stats['rate_limited'] == 0
+        assert elapsed >= 11 / 20 - 0.01
+        assert limiter.stats()['acquired'] == 12 and limiter.stats()['waited'] > 0
+
+def test_retry_and_circuit_breaker():
+    """재시도(Retry-After 포함)와 서킷 브레이커 상태 전이 테스트 (로컬 대역 서버 사용)"""
+    import requests
+    import time
+    from config import config
+    from mock_eutils import MockBehavior
+    from pubmed_search import PubMedSearcher, PubMedHTTPError, PubMedResponseError, PubMedUnavailableError
+    from resilience import CircuitBreaker, RetryPolicy, parse_retry_after
+    
+    print("\n🔌 재시도/서킷 브레이커 테스트")
+    print("=" * 50)
+    
+    assert parse_retry_after('2') == 2.0 and parse_retry_after(None) is None
+    policy = RetryPolicy(max_retries=3, backoff_base=0.5, backoff_max=8)
+    assert policy.delay(0, retry_after=1.5) == 1.5 and policy.delay(0, retry_after=60) == 8
+    assert all(0 <= policy.delay(attempt) <= 0.5 * 2 ** attempt for attempt in range(3))
+    
+    eutils = MockBehavior(rate_limit=1)
+    with mock_services(eutils=eutils) as base_url:
+        def eutils_stats():
+            return requests.get(f"{base_url}/mock/stats").json()['eutils']
+        
+        searcher = PubMedSearcher()
+        searcher.rate_limiter = None
+        searcher.retry_policy = RetryPolicy(max_retries=2, backoff_base=0.01, backoff_max=2)
+        searcher.circuit_breaker = breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=0.2)
+        
+        # 초당 1회를 넘으면 429 + Retry-After: 1 → 1초 기다렸다가 재시도해 성공
+        assert searcher.search_papers("diabetes", max_results=3)
+        start = time.perf_counter()
+        assert searcher.search_papers("diabetes", max_results=3)
+        print(f"✅ 429 후 {time.perf_counter() - start:.2f}초 만에 재시도 성공")
+        assert time.perf_counter() - start >= 0.9
+        assert eutils_stats()['rate_limited'] == 1 and breaker.stats()['state'] == 'closed'
+        
+        # 5xx가 계속되면 max_retries만큼 재시도한 뒤 실패하고, 연속 실패가 임계값에 닿으면 open
+        eutils.rate_limit, eutils.error_rate = 0, 1.0
+        before = eutils_stats()['requests']
+        assert_raises(PubMedHTTPError, searcher.search_papers, "diabetes", max_results=3)
+        assert eutils_stats()['requests'] - before == 3
+        assert breaker.stats()['state'] == 'open' and breaker.stats()['times_opened'] == 1
+        
+        # open 상태에서는 요청을 보내지 않고 바로 거절
+        assert_raises(PubMedUnavailableError, searcher.search_papers, "diabetes", max_results=3)
+        assert eutils_stats()['requests'] - before == 3
+        
+        # half_open 시험 호출이 파싱 오류로 끝나도 서킷이 half_open에 묶이지 않아야 함
+        eutils.error_rate = 0.0
+        time.sleep(0.25)
+        assert breaker.state == 'half_open'
+        assert_raises(PubMedResponseError, searcher._get_xml, config.PUBMED_SEARCH_URL,
+                      searcher._search_params("diabetes", 3), lambda content: int('not a count'))
+        assert_raises(KeyError, searcher._call, lambda: {}['missing'])
+        assert breaker.state == 'half_open' and breaker.stats()['consecutive_failures'] == 3
+        
+        # 4xx는 NCBI 장애가 아니므로 시험 호출만 반납하고, 다음 정상 호출이 서킷을 닫음
+        assert_raises(PubMedHTTPError, searcher._get_xml, f"{base_url}/entrez/eutils/unknown.fcgi", {},
+                      lambda content: content)
+        assert breaker.state == 'half_open'
+        assert searcher.search_papers("diabetes", max_results=3)
+        print(f"✅ 서킷 상태: {breaker.stats()}")
+        assert breaker.stats()['state'] == 'closed' and breaker.stats()['consecutive_failures'] == 0
+
+def test_single_flight():
+    """같은 검색이 동시에 들어오면 한 번만 실행하고 결과(또는 예외)를 공유하는지 테스트"""
+    import asyncio
+    import requests
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from mock_eutils import MockBehavior
+    from single_flight import AsyncSingleFlight, SingleFlight
+    
+    print("\n🛫 동시 검색 공유 테스트")
+    print("=" * 50)
+    
+    # 스레드: 먼저 들어온 호출자만 실행하고 나머지는 결과를 받음
+    flight = SingleFlight()
+    release = threading.Event()
+    runs = []
+    
+    def slow():
+        runs.append(1)
+        release.wait(5)
+        return {'value': len(runs)}
+    
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [executor.submit(flight.do, 'key', slow) for _ in range(5)]
+        while flight.stats()['shared'] < 4:
+            threading.Event().wait(0.01)
+        release.set()
+        results = [future.result() for future in futures]
+    assert len(runs) == 1 and all(result is results[0] for result in results)
+    assert flight.stats() == {'executions': 1, 'shared': 4, 'in_flight': 0}
+    
+    # 예외도 기다리던 호출자 모두에게 전달되고, 끝난 키는 다시 실행됨
+    release.clear()
+    
+    def failing():
+        release.wait(5)
+        raise ValueError('upstream failed')
+    
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(flight.do, 'error', failing) for _ in range(3)]
+        while flight.stats()['shared'] < 6:
+            threading.Event().wait(0.01)
+        release.set()
+        for future in futures:
+            assert_raises(ValueError, future.result)
+    assert flight.do('error', lambda: 'recovered') == 'recovered'
+    assert flight.stats()['executions'] == 3
+    
+    # asyncio: 한 호출자가 취소되어도 나머지는 같은 실행의 결과를 받음
+    async def run_async():
+        flight = AsyncSingleFlight()
+        calls = []
+        
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 'papers'
+        
+        tasks = [asyncio.ensure_future(flight.do('key', fetch)) for _ in range(4)]
+        await asyncio.sleep(0)
+        tasks[0].cancel()
+        results = await asyncio.gather(*tasks[1:])
+        assert calls == [1] and results == ['papers'] * 3
+        assert flight.stats() == {'executions': 1, 'shared': 3, 'in_flight': 0}
+        
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise ValueError('upstream failed')
+        
+        errors = await asyncio.gather(*(flight.do('error', failing) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(error, ValueError) for error in errors) and flight.stats()['executions'] == 2
+    
+    asyncio.run(run_async())
+    
+    # 서비스: 같은 검색 4개가 동시에 들어와도 E-utilities/OpenAI는 한 번씩만 호출
+    with mock_services(eutils=MockBehavior(latency=0.2)) as base_url:
+        service = MedicalSearchService()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: service.search_medical_papers("ca 125 정상범위", max_results=3),
+                                        range(4)))
+        stats = requests.get(f"{base_url}/mock/stats").json()
+        print(f"✅ 동시 검색 4개: esearch/efetch {stats['eutils']['requests']}번, 요약 {stats['chat']['requests']}번")
+        assert all(result['papers'] == results[0]['papers'] for result in results)
+        assert results[0]['papers'] and stats['eutils']['requests'] == 2
+        assert stats['chat']['requests'] == len(results[0]['papers']) + 1
+        assert service._search_flight.stats()['executions'] == 1
+
+def test_summary_cache():
+    """LLM 요약 캐시 테스트 (메모리/디스크 적중, TTL 만료, 같은 논문·질의의 재요약 방지)"""
+    import os
+    import requests
+    import tempfile
+    import time
+    from paper_summarizer import PaperSummarizer
+    from pubmed_search import iter_papers_xml
+    from summary_cache import SummaryCache, paper_summary_key
+    
+    print("\n🧠 요약 캐시 테스트")
+    print("=" * 50)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'summaries.db')
+        first, second = SummaryCache(path=path), SummaryCache(path=path)
+        try:
+            first.put('key', '요약')
+            assert first.get('key') == '요약' and first.stats()['memory_hits'] == 1
+            # 다른 워커는 디스크에서 찾고 메모리로 올림
+            assert second.get('key') == '요약' and second.get('key') == '요약'
+            assert second.stats()['disk_hits'] == 1 and second.stats()['memory_hits'] == 1
+            
+            # TTL이 지나면 메모리/디스크 모두 미스
+            first.put('short', '곧 만료', ttl=0.05)
+            assert second.get('short') == '곧 만료'
+            time.sleep(0.1)
+            assert first.get('short') is None and second.get('short') is None
+            assert first.stats()['misses'] == 1 and second.stats()['misses'] == 1
+            
+            # 최대 개수를 넘으면 가장 오래 조회되지 않은 항목부터 제거
+            small = SummaryCache(path=os.path.join(tmp, 'small.db'), memory_size=1, max_entries=3)
+            for index in range(5):
+                small.put(f'k{index}', f'v{index}')
+            assert len(small) <= 3 and small.get('k0') is None and small.get('k4') == 'v4'
+            small.close()
+        finally:
+            first.close()
+            second.close()
+        
+        fixture = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'efetch_sample.xml')
+        with open(fixture, 'rb') as f:
+            paper = next(iter_papers_xml(f))
+        
+        with mock_services() as base_url:
+            def chat_requests() -> int:
+                return requests.get(f"{base_url}/mock/stats").json()['chat']['requests']
+            
+            cache = SummaryCache(path=os.path.join(tmp, 'service.db'))
+            summarizer = PaperSummarizer(summary_cache=cache)
+            summary = summarizer.summarize_paper(paper, "당뇨병 HbA1c")
+            before = chat_requests()
+            # 대소문자/공백만 다른 질의는 같은 키
+            again = summarizer.summarize_paper(paper, "  당뇨병   hba1c ")
+            print(f"✅ 재요약: OpenAI 호출 {chat_requests() - before}번, 캐시 {cache.stats()}")
+            assert again['ai_summary'] == summary['ai_summary'] and chat_requests() == before
+            assert paper_summary_key(paper, "당뇨병 HbA1c", summarizer.model, summarizer.PROMPT_VERSION) == \
+                paper_summary_key(paper, "당뇨병  hba1c", summarizer.model, summarizer.PROMPT_VERSION)
+            
+            # 질의가 바뀌면 다시 요약
+            summarizer.summarize_paper(paper, "당뇨병 합병증")
+            assert chat_requests() == before + 1
+            cache.close()
+
+def test_search_index():
+    """BM25 색인 순위, 후보 재정렬, 백그라운드 압축, 반복 주제 로컬 응답 테스트"""
+    import os
+    import requests
+    import tempfile
+    from article_store import ArticleStore
+    from pubmed_search import PubMedSearcher
+    from search_index import SearchIndex
+    
+    print("\n📇 BM25 색인 테스트")
+    print("=" * 50)
+    
+    common = ("patient clinical treatment therapy diagnosis disease medical health study trial "
+              "efficacy outcome")
+    papers = [
+        {'pmid': '1', 'title': 'Insulin pump outcomes', 'abstract': f"{common} metformin was also used."},
+        {'pmid': '2', 'title': 'Metformin in type 2 diabetes', 'abstract': f"{common} metformin dosing."},
+        {'pmid': '3', 'title': 'Statin adherence', 'abstract': f"{common} lipid lowering."},
+    ]
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        index = SearchIndex(path=os.path.join(tmp, 'index.db'), compact_interval=2)
+        try:
+            for paper in papers:
+                index.add_papers([paper])
+            
+            # 제목(가중치 2)과 초록에 모두 나온 논문이 초록에만 나온 논문보다 위, 없는 논문은 제외
+            ranked = index.search('metformin AND "humans"[MeSH Terms]', limit=10)
+            print(f"✅ 'metformin' 순위: {ranked}")
+            assert [pmid for pmid, _ in ranked] == ['2', '1']
+            scores = index.score('metformin', ['1', '3', 'unknown'])
+            assert scores['1'] == dict(ranked)['1'] and scores['3'] == 0 and scores['unknown'] == 0
+            
+            # 묶음 2개마다 백그라운드에서 압축해도 점수는 그대로
+            index.wait_for_compaction()
+            stats = index.stats(storage=True)
+            assert stats['posting_blocks'] < stats['terms'] * len(papers)
+            # /stats 기본값은 유지 중인 문서 수만 읽고 용어/포스팅 테이블은 세지 않음
+            assert index.stats()['documents'] == len(papers) and 'posting_blocks' not in index.stats()
+            assert index.search('metformin', limit=10) == ranked
+            
+            # 관련성 점수가 같은 후보는 BM25 점수 순으로 재정렬 (입력 순서와 무관)
+            service = MedicalSearchService()
+            service.pubmed_searcher.search_index = index
+            top = service._filter_papers([papers[0], papers[1]], [], "메트포르민 효능", 2, "metformin")
+            assert [paper['pmid'] for paper in top] == ['2', '1']
+            assert top[0]['relevance_score'] == top[1]['relevance_score']
+            assert top[0]['bm25_score'] == 1.0 and 0 < top[1]['bm25_score'] < 1
+        finally:
+            index.close()
+        
+        # 최근 검색한 주제는 NCBI 호출 없이 저장소에서 같은 순서로 응답
+        with mock_services() as base_url:
+            def eutils_requests() -> int:
+                return requests.get(f"{base_url}/mock/stats").json()['eutils']['requests']
+            
+            store = ArticleStore(path=os.path.join(tmp, 'articles.db'))
+            index = SearchIndex(path=os.path.join(tmp, 'topics.db'))
+            try:
+                searcher = PubMedSearcher(article_store=store, search_index=index)
+                searcher.rate_limiter = None
+                first = searcher.search_and_fetch("patients", max_results=1)
+                before = eutils_requests()
+                repeat = searcher.search_and_fetch("  Patients ", max_results=1)
+                print(f"✅ 반복 주제: NCBI 호출 {eutils_requests() - before}번")
+                assert [paper['pmid'] for paper in repeat] == [paper['pmid'] for paper in first]
+                assert eutils_requests() == before and index.stats()['topic_hits'] == 1
+                
+                # 더 많은 결과를 원하면 다시 esearch (이미 저장된 논문은 efetch에서 제외)
+                more = searcher.search_and_fetch("patients", max_results=2)
+                assert len(more) == 2 and more[0]['pmid'] == first[0]['pmid']
+                assert eutils_requests() == before + 2 and store.stats()['hits'] >= 1
+                
+                # 그보다 적게 원하면 기록된 순서의 앞부분을 로컬에서 응답
+                fewer = searcher.search_and_fetch("patients", max_results=1)
+                assert [paper['pmid'] for paper in fewer] == [first[0]['pmid']]
+                assert eutils_requests() == before + 2 and index.stats()['topic_hits'] == 2
+            finally:
+                store.close()
+                index.close()
+
+def assert_raises(error_type, func, *args, **kwargs):
+    """func 호출이 error_type 예외로 끝나는지 확인"""
+    try:
+        func(*args, **kwargs)
+    except error_type:
+        return
+    raise AssertionError(f"{error_type.__name__}가 발생하지 않았습니다")
+
+def test_similar_papers():
+    """벡터 색인/ELink 기반 유사 논문 검색 테스트 (로컬 대역 서버 사용)"""
+    print("\n🧭 유사 논문 검색 테스트")
+    print("=" * 50)
+    
+    import asyncio
+    import os
+    import requests
+    import tempfile
+    import numpy as np
+    from pubmed_search import iter_papers_xml
+    from vector_index import VectorIndex, build_index
+    
+    fixture = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'efetch_sample.xml')
+    with open(fixture, 'rb') as f:
+        papers = list(iter_papers_xml(f))
+    
+    with mock_services() as base_url, tempfile.TemporaryDirectory() as tmp:
+        # 마지막 논문은 색인하지 않아 ELink 경로를 확인
+        indexed, unindexed = papers[:-1], papers[-1]
+        assert build_index(lambda: [indexed], path=tmp, dim=8, min_df=1) == len(indexed)
+        
+        service = MedicalSearchService()
+        service.vector_index = VectorIndex(path=tmp)
+        
+        similar = service.search_similar_papers(indexed[0]['pmid'], max_results=5)
+        print(f"✅ {indexed[0]['pmid']}와 유사한 논문: {[paper['pmid'] for paper in similar]}")
+        assert [paper['pmid'] for paper in similar] == [paper['pmid'] for paper in indexed[1:]]
+        assert all('similarity_score' in paper for paper in similar)
+        
+        similar = service.search_similar_papers(unindexed['pmid'], max_results=5)
+        print(f"✅ 색인에 없는 {unindexed['pmid']}와 유사한 논문: {[paper['pmid'] for paper in similar]}")
+        assert similar and unindexed['pmid'] not in [paper['pmid'] for paper in similar]
+        assert all(0 < paper['similarity_score'] <= 1 for paper in similar)
+        
+        # 비동기 버전도 같은 이웃 (벡터 색인 조회는 스레드에서 실행)
+        async def similar_async() -> list:
+            try:
+                return await service.search_similar_papers_async(indexed[0]['pmid'], max_results=5)
+            finally:
+                await service.aclose()
+        
+        similar = asyncio.run(similar_async())
+        assert [paper['pmid'] for paper in similar] == [paper['pmid'] for paper in indexed[1:]]
+        
+        # 여러 PMID의 관련 논문은 ELink 1번 + efetch 1번으로 가져옴
+        def eutils_requests() -> int:
+            return requests.get(f"{base_url}/mock/stats").json()['eutils']['requests']
+        
+        before = eutils_requests()
+        related = service.search_related_papers([paper['pmid'] for paper in papers], max_results=2)
+        print(f"✅ 일괄 관련 논문: {sum(len(found) for found in related.values())}개 (요청 {eutils_requests() - before}번)")
+        assert list(related) == [paper['pmid'] for paper in papers]
+        assert all(pmid not in [paper['pmid'] for paper in found] for pmid, found in related.items())
+        assert eutils_requests() - before == 2
+    
+    # 큰 색인처럼 LSH 경로 사용: 후보 버킷만 비교하고, PMID는 정렬 배열(+ 붙인 꼬리 구간)에서 찾음
+    import random
+    rng = random.Random(7)
+    vocabulary = [f"term{i}" for i in range(300)]
+    synthetic = [{'pmid': str(1000 + i), 'title': ' '.join(rng.sample(vocabulary, 5)),
+                  'abstract': ' '.join(rng.sample(vocabulary, 40))} for i in range(400)]
+    synthetic.append(dict(synthetic[0], pmid='2000'))  # 0번과 같은 내용
+    with tempfile.TemporaryDirectory() as tmp:
+        build_index(lambda: [synthetic[200:], synthetic[:200]], path=tmp, dim=16, min_df=1, tables=4, bits=12)
+        index = VectorIndex(path=tmp, exact_threshold=0)
+        assert len(index) == 401 and '1000' in index and '999' not in index and 'abc' not in index
+        
+        row = index._row('1000')
+        candidates = index._lsh_candidates(np.asarray(index._vectors[row]), 5)
+        neighbors = index.similar('1000', 5)
+        print(f"✅ LSH 후보 {len(candidates)}/{len(index)}개에서 이웃 {len(neighbors)}개")
+        assert len(candidates) < len(index) and neighbors[0] == ('2000', 1.0)
+        assert len(neighbors) <= 5 and all(index._row(pmid) in candidates for pmid, _ in neighbors)
         
-        if pmids:
-            # 상세 정보 가져오기
-            papers = searcher.fetch_paper_details(pmids[:2])
-            print(f"📚 상세 정보 가져온 논문: {len(papers)}개")
+        # 붙인 논문은 꼬리 구간에서 찾고, 같은 PMID는 새 행이 우선
+        assert index.add_papers([dict(synthetic[1], pmid='3000'), dict(synthetic[2], pmid='1000')]) == 2
+        assert len(index) == 402 and index._row('1000') == 402 and index._row('3000') == 401
+        assert index.similar('3000', 5)[0][0] == '1001'
+
+def test_summarize_papers():
+    """논문 요약 동시 요청 테스트 (결과 순서, 동시 요청 수 제한, 요청별 시간 제한 / 로컬 대역 서버 사용)"""
+    import asyncio
+    import os
+    import time
+    from config import config
+    from mock_eutils import MockBehavior
+    from paper_summarizer import PaperSummarizer
+    from pubmed_search import iter_papers_xml
+    
+    print("\n📝 논문 요약 동시 요청 테스트")
+    print("=" * 50)
+    
+    fixture = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'efetch_sample.xml')
+    with open(fixture, 'rb') as f:
+        base = list(iter_papers_xml(f))
+    # 같은 논문을 PMID만 바꿔 두 번씩 넣어 관련성 점수가 같은 논문도 생기게 함
+    papers = [dict(paper, pmid=f"{paper['pmid']}{copy}") for copy in range(2) for paper in base]
+    query = "CA-125 정상범위"
+    
+    chat = MockBehavior(latency=0.4)
+    originals = (config.SUMMARY_MAX_CONCURRENCY, config.SUMMARY_TIMEOUT)
+    with mock_services(chat=chat):
+        summarizer = PaperSummarizer()
+        # 관련성 점수 내림차순, 같은 점수는 입력 순서 (완료 순서와 무관)
+        expected = [paper['pmid'] for paper in
+                    sorted(papers, key=lambda paper: -summarizer._calculate_relevance_score(paper, query))]
+        try:
+            config.SUMMARY_MAX_CONCURRENCY = 3
+            start = time.perf_counter()
+            summarized = summarizer.summarize_papers(papers, query)
+            elapsed = time.perf_counter() - start
+            print(f"✅ {len(papers)}편을 3개씩 동시 요약: {elapsed:.2f}초 (요청당 {chat.latency}초)")
+            assert [paper['pmid'] for paper in summarized] == expected
+            assert all(f"핵심 내용: {paper['title']}" in paper['ai_summary'] and not paper['summary_fallback']
+                       for paper in summarized)
+            # 3개씩 두 번에 나눠 요청: 한 번에 다 보내지도, 하나씩 보내지도 않음
+            assert 2 * chat.latency <= elapsed < 3 * chat.latency
+            
+            summarized = asyncio.run(summarizer.summarize_papers_async(papers, query))
+            assert [paper['pmid'] for paper in summarized] == expected
             
-            for i, paper in enumerate(papers, 1):
-                print(f"\n{i}. {paper['title'][:80]}...")
-                print(f"   저자: {', '.join(paper['authors'][:2]) if paper['authors'] else 'N/A'}")
-                print(f"   저널: {paper['journal']}")
-                print(f"   PMID: {paper['pmid']}")
+            # 시간 제한을 넘긴 요청은 기본 요약으로 대체 (순서는 그대로)
+            config.SUMMARY_TIMEOUT = 0.1
+            by_pmid = {paper['pmid']: paper for paper in base}
+            summarized = summarizer.summarize_papers(base, query)
+            print(f"✅ 시간 제한 {config.SUMMARY_TIMEOUT}초: 기본 요약 {sum(p['summary_fallback'] for p in summarized)}편")
+            assert [paper['pmid'] for paper in summarized] == list(dict.fromkeys(pmid[:-1] for pmid in expected))
+            assert all(paper['summary_fallback'] and
+                       paper['ai_summary'] == summarizer._basic_summary_text(by_pmid[paper['pmid']])
+                       for paper in summarized)
+        finally:
+            config.SUMMARY_MAX_CONCURRENCY, config.SUMMARY_TIMEOUT = originals
+
+def test_search_stream():
+    """단계별 스트리밍 검색 테스트 (OpenAI 오류 시 기본 요약 대체 표시 포함, 로컬 대역 서버 사용)"""
+    from mock_eutils import MockBehavior
+    
+    print("\n📡 스트리밍 검색 테스트")
+    print("=" * 50)
     
-    except Exception as e:
-        print(f"❌ 검색 오류: {e}")
+    chat = MockBehavior()
+    with mock_services(chat=chat):
+        service = MedicalSearchService()
+        
+        def collect() -> list:
+            return list(service.stream_medical_papers("ca 125 정상범위", max_results=3))
+        
+        events = collect()
+        summaries = [data for event, data in events if event == 'summary']
+        done = events[-1][1]
+        assert summaries and not any(summary['summary_fallback'] for summary in summaries)
+        assert not done['summary_fallback'] and not done['overall_summary_fallback']
+        
+        # 첫 토큰 전에 OpenAI가 실패하면 기본 요약을 보내고 fallback으로 표시
+        chat.error_rate = 1.0
+        events = collect()
+        chat.error_rate = 0.0
+        summaries = [data for event, data in events if event == 'summary']
+        overall = next(data for event, data in events if event == 'overall_summary')
+        done = events[-1][1]
+        print(f"✅ OpenAI 오류: 논문 요약 {len(summaries)}개, 종합 요약 모두 기본 요약으로 대체 표시")
+        assert summaries and all(summary['summary_fallback'] and not summary['incomplete'] for summary in summaries)
+        for summary in summaries:
+            deltas = [data['delta'] for event, data in events
+                      if event == 'summary_delta' and data['index'] == summary['index']]
+            assert ''.join(deltas) == summary['ai_summary']
+        assert overall['overall_summary_fallback'] and overall['overall_summary']
+        assert done['summary_fallback'] and done['overall_summary_fallback']
+
+def test_result_cache():
+    """검색 결과 캐시 테스트 (정규화된 입력이 같으면 파이프라인을 다시 실행하지 않음)"""
+    import os
+    import requests
+    import tempfile
+    from mock_eutils import MockBehavior
+    from result_cache import ResultCache, canonical_query
+    
+    print("\n🗃️ 검색 결과 캐시 테스트")
+    print("=" * 50)
+    
+    assert canonical_query("혈당  126MG / dL") == canonical_query("혈당 126 mg/dl")
+    assert canonical_query("HbA1c 7.80 %") == canonical_query("hba1c 7.8퍼센트")
+    assert canonical_query("혈압 180 / 120 mm Hg") == canonical_query("혈압 180/120mmHg")
+    assert canonical_query("CRP 12.5") != canonical_query("CRP 125")
+    
+    chat = MockBehavior()
+    with mock_services(chat=chat) as base_url, tempfile.TemporaryDirectory() as tmp:
+        def upstream_requests() -> int:
+            stats = requests.get(f"{base_url}/mock/stats").json()
+            return stats['eutils']['requests'] + stats['chat']['requests']
+        
+        # 두 서비스 인스턴스가 같은 sqlite 파일을 공유 (uvicorn 워커 여러 개에 해당)
+        path = os.path.join(tmp, 'results.db')
+        first, second = MedicalSearchService(), MedicalSearchService()
+        first.result_cache = ResultCache(backend='sqlite', path=path)
+        second.result_cache = ResultCache(backend='sqlite', path=path)
+        
+        results = first.search_medical_papers("HbA1c 7.8% 당뇨병", max_results=3)
+        assert results['from_cache'] is False
+        
+        before = upstream_requests()
+        repeat = first.search_medical_papers("  hba1c 7.80 %  당뇨병", max_results=3)
+        shared = second.search_medical_papers("HBA1C 7.8 퍼센트 당뇨병", max_results=3)
+        print(f"✅ 반복 검색: from_cache={repeat['from_cache']}, 다른 워커: from_cache={shared['from_cache']}")
+        assert repeat['from_cache'] and shared['from_cache']
+        assert repeat['user_input'] == "  hba1c 7.80 %  당뇨병"
+        assert [paper['pmid'] for paper in shared['papers']] == [paper['pmid'] for paper in results['papers']]
+        assert upstream_requests() == before
+        assert first.result_cache.stats()['memory_hits'] == 1
+        assert second.result_cache.stats()['shared_hits'] == 1
+        
+        # max_results가 다르면 다른 검색
+        assert first.search_medical_papers("HbA1c 7.8% 당뇨병", max_results=2)['from_cache'] is False
+        
+        # OpenAI 오류로 기본 요약이 들어간 결과는 fallback으로 표시되고 캐시하지 않음
+        first.result_cache.clear()
+        chat.error_rate = 1.0
+        degraded = first.search_medical_papers("ca 125 정상범위", max_results=3)
+        assert degraded['papers'] and degraded['overall_summary_fallback'] and all(paper['summary_fallback'] for paper in degraded['papers'])
+        chat.error_rate = 0.0
+        recovered = first.search_medical_papers("ca 125 정상범위", max_results=3)
+        assert recovered['from_cache'] is False and not recovered['overall_summary_fallback']
+        assert not any(paper['summary_fallback'] for paper in recovered['papers'])
+        assert first.search_medical_papers("ca 125 정상범위", max_results=3)['from_cache'] is True
+        
+        first.result_cache.close()
+        second.result_cache.close()
+    
+    # 메모리 LRU 제한
+    cache = ResultCache(backend='memory', memory_size=2)
+    for key in ('a', 'b', 'c'):
+        cache.put(key, {'key': key})
+    assert cache.get('a') is None and cache.get('c') == {'key': 'c'}
+    assert cache.stats()['evictions'] == 1
+
+def test_request_tracing():
+    """단계별 spans, /metrics 히스토그램, /stats 운영 통계, X-Profile 프로파일링 테스트 (로컬 대역 서버 사용)"""
+    import json
+    from config import config
+    from fastapi.testclient import TestClient
+    
+    print("\n⏱️ 요청 계측 테스트")
+    print("=" * 50)
+    
+    # 스트리밍 요약 토큰 사이에 지연을 넣어 SSE 응답 본문이 헤더보다 늦게 끝나게 함
+    with mock_services(token_delay=0.002):
+        import main
+        import tracing
+        
+        # 다른 테스트가 일부러 낸 NCBI 오류도 같은 프로세스 통계에 남아 있으므로 시작 시점 값과 비교
+        ncbi_errors = tracing.call_stats('ncbi')['errors']
+        
+        with TestClient(main.app) as client:
+            response = client.get("/search", params={"q": "ca 125 정상범위", "max_results": 3, "spans": "true"})
+            assert response.status_code == 200
+            spans = response.json()['spans']
+            for span in spans:
+                print(f"  • [{span['kind']}] {span['name']}: {span['duration_ms']}ms")
+            names = {span['name'] for span in spans}
+            assert {'analyze', 'pubmed_search', 'filter', 'summarize', 'overall_summary'} <= names
+            assert {'ncbi.esearch', 'ncbi.efetch', 'efetch_xml_parse', 'openai.paper_summary'} <= names
+            assert all(span['duration_ms'] >= 0 and span['status'] == 'ok' for span in spans)
+            
+            # spans는 요청할 때만 포함
+            response = client.post("/search", json={"query": "CRP 수치 12.5", "max_results": 3})
+            assert response.status_code == 200 and response.json()['spans'] is None
+            
+            metrics = client.get("/metrics").text
+            assert 'pubmed_span_duration_seconds_bucket{kind="ncbi",name="ncbi.esearch",status="ok",le="+Inf"}' in metrics
+            assert 'http_request_duration_seconds_count{method="GET",route="/search",status="200"}' in metrics
+            print("✅ /metrics 히스토그램 확인")
+            
+            # SSE 응답은 헤더가 아니라 본문(마지막 done 이벤트)을 다 보낸 시점까지 기록
+            response = client.get("/search/stream", params={"q": "ca 125 정상범위", "max_results": 3})
+            done = json.loads(response.text.split("event: done\ndata: ")[1].split("\n")[0])
+            stream_seconds = tracing.REQUEST_SECONDS.snapshot()[('GET', '/search/stream', '200')]['sum']
+            print(f"✅ /search/stream 기록 {stream_seconds * 1000:.0f}ms (파이프라인 {done['processing_time']}초)")
+            assert stream_seconds >= sum(done['stage_timings'].values()) - 0.01
+            
+            stats = client.get("/stats").json()
+            search_stats = stats['requests']['endpoints']['GET /search']
+            print(f"✅ /stats: GET /search p50 {search_stats['p50_ms']}ms, p99 {search_stats['p99_ms']}ms, "
+                  f"NCBI 호출 {stats['external']['ncbi']['calls']}번")
+            assert stats['requests']['in_flight'] == 1  # /stats 요청 자신
+            assert search_stats['count'] == 1 and search_stats['p50_ms'] <= search_stats['p99_ms']
+            assert stats['stages']['summarize']['count'] >= 1
+            assert stats['external']['ncbi']['calls'] >= 2 and stats['external']['ncbi']['errors'] == ncbi_errors
+            assert stats['external']['openai']['by_name']['openai.paper_summary']['count'] >= 1
+            assert stats['rate_limiter']['acquired'] >= 2
+            assert stats['circuit_breaker']['state'] == 'closed'
+            assert 'result' in stats['caches']
+            
+            # 프로파일링은 설정으로 켰을 때만 헤더에 반응
+            assert client.get("/health", headers={"X-Profile": "cprofile"}).json()['status'] == 'healthy'
+            config.PROFILING_ENABLED = True
+            try:
+                response = client.get("/search", params={"q": "CRP 수치 12.5", "max_results": 3},
+                                      headers={"X-Profile": "cprofile"})
+            finally:
+                config.PROFILING_ENABLED = False
+            assert response.headers['x-profiled-status'] == '200'
+            assert 'function calls' in response.text
+            print(f"✅ cProfile 보고서 {len(response.text)}자")
+
+def test_search_stream_endpoint():
+    """/search/stream SSE 이벤트 순서와 첫 이벤트 도착 시점 테스트 (로컬 대역 서버 사용)"""
+    import json
+    import re
+    import requests
+    import time
+    from mock_eutils import MockBehavior, serve_in_thread
+    
+    print("\n📡 /search/stream SSE 테스트")
+    print("=" * 50)
+    
+    # OpenAI 응답마다 지연을 넣어 요약이 끝나기 전에 앞 단계 이벤트가 도착하는지 확인
+    chat = MockBehavior(latency=0.3)
+    with mock_services(chat=chat):
+        import main
+        
+        # main.service는 import 시점의 대역 서버 주소로 만들어지므로 이 테스트의 서버로 다시 만듦
+        original_service = main.service
+        main.service = MedicalSearchService()
+        try:
+            with serve_in_thread(main.app) as api_url:
+                start = time.perf_counter()
+                events = []
+                with requests.get(f"{api_url}/search/stream", params={"q": "ca 125 정상범위", "max_results": 3},
+                                  stream=True) as response:
+                    assert response.status_code == 200
+                    assert response.headers['content-type'].startswith('text/event-stream')
+                    event = None
+                    for line in response.iter_lines(decode_unicode=True):
+                        if line.startswith('event: '):
+                            event = line[len('event: '):]
+                        elif line.startswith('data: '):
+                            events.append((event, json.loads(line[len('data: '):]), time.perf_counter() - start))
+        finally:
+            main.service = original_service
+    
+    names = [event for event, _, _ in events]
+    print(f"✅ 이벤트 {len(events)}개: {' → '.join(dict.fromkeys(names))}")
+    
+    # analysis → paper → summary_delta/summary → overall_summary_delta → overall_summary → done
+    pattern = r'analysis (paper )+((summary_delta )*summary )+(overall_summary_delta )*overall_summary done '
+    assert re.fullmatch(pattern, ''.join(f"{name} " for name in names)), names
+    
+    analysis = events[0][1]
+    assert any(entity['text'] == 'CA-125' for entity in analysis['detected_entities'])
+    assert analysis['search_query'].startswith('"CA-125"')
+    
+    papers = [data for event, data, _ in events if event == 'paper']
+    assert [paper['index'] for paper in papers] == list(range(len(papers)))
+    assert all(paper['pmid'] and paper['title'] for paper in papers)
+    
+    # 논문마다 요약 한 번, 그 전까지 온 토큰을 이으면 완성된 요약
+    summaries = [data for event, data, _ in events if event == 'summary']
+    assert sorted(summary['index'] for summary in summaries) == [paper['index'] for paper in papers]
+    for summary in summaries:
+        deltas = [data['delta'] for event, data, _ in events
+                  if event == 'summary_delta' and data['index'] == summary['index']]
+        assert summary['pmid'] == papers[summary['index']]['pmid']
+        assert ''.join(deltas) == summary['ai_summary'] and '핵심 내용' in summary['ai_summary']
+        assert not summary['incomplete'] and not summary['summary_fallback']
+    
+    overall = next(data for event, data, _ in events if event == 'overall_summary')
+    assert ''.join(data['delta'] for event, data, _ in events if event == 'overall_summary_delta') == \
+        overall['overall_summary']
+    assert overall['overall_summary'] and not overall['overall_summary_fallback']
+    
+    done = events[-1][1]
+    assert done['filtered_papers_count'] == len(papers)
+    assert not done['summary_fallback'] and not done['overall_summary_fallback']
+    
+    # 분석 결과와 논문 목록은 요약(OpenAI 지연 2번 이상)이 끝나기 전에 도착
+    first_paper = next(elapsed for event, _, elapsed in events if event == 'paper')
+    print(f"⏱️ analysis {events[0][2] * 1000:.0f}ms, 첫 paper {first_paper * 1000:.0f}ms, "
+          f"done {events[-1][2] * 1000:.0f}ms")
+    assert first_paper < events[-1][2] - 2 * chat.latency
+
+def test_baseline_ingestion():
+    """baseline 일괄 적재와 업데이트 적용 테스트 (합성 gz 파일 사용, 인터넷 연결 불필요)"""
+    print("\n📦 baseline 적재 테스트")
+    print("=" * 50)
+    
+    import gzip
+    import os
+    import tempfile
+    from article_store import ArticleStore
+    from pubmed_ingest import ingest, update
+    from search_index import SearchIndex
+    
+    fixture = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'efetch_sample.xml')
+    with open(fixture, 'rb') as f:
+        sample = f.read()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        # 두 번째 파일은 PMID만 바꿔 서로 다른 논문으로 만듦
+        for name, xml in (('pubmed25n0001.xml.gz', sample),
+                          ('pubmed25n0002.xml.gz', sample.replace(b'<PMID Version="1">3', b'<PMID Version="1">9'))):
+            with gzip.open(os.path.join(tmp, name), 'wb') as f:
+                f.write(xml)
+        
+        paths = dict(store_path=os.path.join(tmp, 'articles.db'), index_path=os.path.join(tmp, 'index.db'),
+                     log_path=os.path.join(tmp, 'ingest.db'))
+        result = ingest([tmp], workers=2, batch_size=2, **paths)
+        print(f"✅ 파일 {result['files']}개, 논문 {result['papers']}개 적재")
+        assert result['files'] == 2 and not result['failed']
+        assert result['papers'] > 0 and result['papers'] % 2 == 0
+        
+        store = ArticleStore(path=paths['store_path'])
+        index = SearchIndex(path=paths['index_path'])
+        try:
+            assert len(store) == result['papers']
+            assert len(index) == result['papers']
+            hits = index.search('diabetes', limit=result['papers'])
+            assert hits and all(store.get(pmid) for pmid, _ in hits)
+        finally:
+            store.close()
+            index.close()
+        
+        # 다시 실행하면 완료한 파일은 건너뜀
+        again = ingest([tmp], workers=2, batch_size=2, **paths)
+        print(f"🔁 재실행: 건너뜀 {again['skipped']}개")
+        assert again['skipped'] == 2 and again['papers'] == 0
+        
+        # 업데이트 파일: 논문 수정 + DeleteCitation
+        revised = sample.replace(b'<ArticleTitle>Glycated hemoglobin', b'<ArticleTitle>Revised zebrafish glycated hemoglobin')
+        revised = revised.replace(b'</PubmedArticleSet>',
+                                  b'<DeleteCitation><PMID Version="1">36520002</PMID></DeleteCitation></PubmedArticleSet>')
+        with gzip.open(os.path.join(tmp, 'pubmed25n0003.xml.gz'), 'wb') as f:
+            f.write(revised)
+        
+        updated = update([tmp], batch_size=2, **paths)
+        print(f"🔄 업데이트: 갱신 {updated['papers']}개, 삭제 {updated['deleted']}개")
+        assert updated['files'] == 1 and updated['deleted'] == 1
+        
+        store = ArticleStore(path=paths['store_path'])
+        index = SearchIndex(path=paths['index_path'])
+        try:
+            assert store.get('36520002') is None
+            assert len(store) == len(index) == result['papers'] - 1
+            assert 'zebrafish' in store.get('37010001')['title'].lower()
+            assert [pmid for pmid, _ in index.search('zebrafish')] == ['37010001']
+            assert '36520002' not in dict(index.search('spinal cord stimulation'))
+        finally:
+            store.close()
+            index.close()
+        
+        assert update([tmp], batch_size=2, **paths)['files'] == 0
 
 def main():
     """메인 테스트 함수"""
@@ -151,18 +1130,26 @@ def main():
     
     # 1. 의료 텍스트 분석 테스트 (인터넷 연결 불필요)
     test_medical_analyzer()
+    test_relevance_scorer()
+    test_rate_limiter()
+    test_retry_and_circuit_breaker()
+    test_single_flight()
+    test_summary_cache()
+    test_search_index()
+    test_baseline_ingestion()
+    test_similar_papers()
+    test_result_cache()
     
-    # 2. PubMed 검색 테스트 (인터넷 연결 필요)
-    try:
-        test_pubmed_search()
-    except Exception as e:
-        print(f"⚠️ PubMed 검색 테스트 건너뜀 (인터넷 연결 필요): {e}")
+    # 2. PubMed 검색 테스트 (로컬 대역 서버)
+    test_pubmed_search()
+    test_history_paging()
     
-    # 3. 전체 서비스 테스트 (인터넷 연결 필요)
-    try:
-        test_medical_search()
-    except Exception as e:
-        print(f"⚠️ 전체 서비스 테스트 건너뜀 (인터넷 연결 필요): {e}")
+    # 3. 전체 서비스 테스트 (로컬 대역 서버)
+    test_medical_search()
+    test_summarize_papers()
+    test_search_stream()
+    test_request_tracing()
+    test_search_stream_endpoint()
     
     print("\n✅ 테스트 완료!")
     print("\n💡 실제 사용을 위해서는:")
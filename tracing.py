@@ -0,0 +1,356 @@
+import asyncio
+import bisect
+import contextvars
+import cProfile
+import io
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+try:
+    import pyinstrument
+except ImportError:  # 없으면 cProfile로 대신함
+    pyinstrument = None
+
+T = TypeVar('T')
+
+# 초 단위 히스토그램 버킷 (로컬 파싱 ms 단위 ~ LLM 요약 수십 초)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Prometheus 형식으로 내보내는 레이블별 누적 히스토그램 (프로세스 단위)"""
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...], buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # 레이블 값 → [버킷별 개수..., +Inf 개수, 합계]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Dict]:
+        """레이블별 누적 버킷 개수, 총 개수, 합계"""
+        with self._lock:
+            items = [(labels, list(series)) for labels, series in self._series.items()]
+        result = {}
+        for labels, series in items:
+            cumulative, running = [], 0
+            for count in series[:-1]:
+                running += count
+                cumulative.append(running)
+            result[labels] = {'buckets': cumulative, 'count': running, 'sum': series[-1]}
+        return result
+
+    def summarize(self, group_by: Tuple[int, ...], where: Callable[[Tuple[str, ...]], bool] = None) -> Dict[Tuple[str, ...], Dict]:
+        """레이블 일부(group_by 위치)로 시계열을 합쳐 개수/평균/p50/p95/p99(ms) 계산"""
+        merged: Dict[Tuple[str, ...], List] = {}
+        for labels, series in self.snapshot().items():
+            if where is not None and not where(labels):
+                continue
+            key = tuple(labels[index] for index in group_by)
+            total = merged.setdefault(key, [[0] * (len(self.buckets) + 1), 0, 0.0])
+            total[0] = [a + b for a, b in zip(total[0], series['buckets'] + [series['count']])]
+            total[1] += series['count']
+            total[2] += series['sum']
+        return {
+            key: {
+                'count': count,
+                'avg_ms': round(total_sum / count * 1000, 2) if count else 0.0,
+                **{f'p{int(q * 100)}_ms': self._quantile_ms(cumulative, count, q) for q in (0.5, 0.95, 0.99)}
+            }
+            for key, (cumulative, count, total_sum) in merged.items()
+        }
+
+    def _quantile_ms(self, cumulative: List[int], count: int, q: float) -> Optional[float]:
+        """누적 버킷 개수에서 분위수 추정 (버킷 경계 사이 선형 보간, 마지막 버킷을 넘으면 그 경계값)"""
+        if not count:
+            return None
+        rank = q * count
+        lower, previous = 0.0, 0
+        for bound, running in zip(self.buckets, cumulative):
+            if running >= rank:
+                value = lower + (bound - lower) * (rank - previous) / max(running - previous, 1)
+                return round(value * 1000, 2)
+            lower, previous = bound, running
+        return round(self.buckets[-1] * 1000, 2)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.snapshot().items()):
+            label_text = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels))
+            prefix = f"{label_text}," if label_text else ''
+            for bound, cumulative in zip(self.buckets, series['buckets']):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series["count"]}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {series['sum']:.6f}")
+            lines.append(f"{self.name}_count{{{label_text}}} {series['count']}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+SPAN_SECONDS = Histogram(
+    'pubmed_span_duration_seconds', "파이프라인 단계와 외부 호출(NCBI/OpenAI) 소요 시간",
+    ('kind', 'name', 'status')
+)
+REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', "HTTP 요청 처리 시간",
+    ('method', 'route', 'status')
+)
+
+
+class RateCounter:
+    """최근 window초 동안의 초당 처리량 (초 단위 슬롯 링 버퍼)
+
+    락 없이 갱신하므로 한 스레드(이벤트 루프)에서만 hit()을 호출해야 합니다.
+    """
+
+    def __init__(self, window: int = 60):
+        self.window = window
+        self._seconds = [0] * window
+        self._counts = [0] * window
+
+    def hit(self, now: float = None):
+        second = int(time.monotonic() if now is None else now)
+        slot = second % self.window
+        if self._seconds[slot] != second:
+            self._seconds[slot] = second
+            self._counts[slot] = 0
+        self._counts[slot] += 1
+
+    def rate(self, seconds: int = None, now: float = None) -> float:
+        """최근 seconds초(기본: window 전체)의 평균 초당 횟수 (진행 중인 현재 초는 제외)"""
+        seconds = min(seconds or self.window, self.window - 1)
+        current = int(time.monotonic() if now is None else now)
+        total = sum(count for second, count in zip(self._seconds, self._counts)
+                    if current - seconds <= second < current)
+        return round(total / seconds, 3)
+
+
+class RequestStats:
+    """HTTP 요청 처리량/진행 중 요청 수/지연 시간 (미들웨어가 이벤트 루프 스레드에서만 갱신)"""
+
+    def __init__(self, window: int = 60):
+        self.started_at = time.time()
+        self.window = window
+        self.in_flight = 0
+        self.total = 0
+        self.rate = RateCounter(window)
+        self._route_rates: Dict[str, RateCounter] = {}
+
+    def begin(self):
+        self.in_flight += 1
+
+    def end(self, method: str, route: str, status: int, duration: float):
+        self.in_flight -= 1
+        self.total += 1
+        now = time.monotonic()
+        self.rate.hit(now)
+        key = f"{method} {route}"
+        counter = self._route_rates.get(key)
+        if counter is None:
+            counter = self._route_rates[key] = RateCounter(self.window)
+        counter.hit(now)
+        REQUEST_SECONDS.observe((method, route, str(status)), duration)
+
+    def snapshot(self) -> Dict:
+        """/stats용 요청 통계 (엔드포인트별 rps, 오류 수, 지연 분위수)"""
+        latency = REQUEST_SECONDS.summarize((0, 1))
+        errors = REQUEST_SECONDS.summarize((0, 1), where=lambda labels: labels[2].startswith('5'))
+        endpoints = {}
+        for (method, route), summary in sorted(latency.items()):
+            key = f"{method} {route}"
+            counter = self._route_rates.get(key)
+            endpoints[key] = {
+                'rps': counter.rate() if counter is not None else 0.0,
+                'errors': errors.get((method, route), {}).get('count', 0),
+                **summary
+            }
+        return {
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'in_flight': self.in_flight,
+            'total': self.total,
+            'rps_10s': self.rate.rate(10),
+            'rps_1m': self.rate.rate(),
+            'endpoints': endpoints
+        }
+
+
+REQUESTS = RequestStats()
+
+
+def span_stats(kind: str) -> Dict[str, Dict]:
+    """종류(stage/ncbi/openai/...)별 span 호출 수, 오류율, 지연 분위수"""
+    latency = SPAN_SECONDS.summarize((1,), where=lambda labels: labels[0] == kind)
+    errors = SPAN_SECONDS.summarize((1,), where=lambda labels: labels[0] == kind and labels[2] == 'error')
+    stats = {}
+    for (name,), summary in sorted(latency.items()):
+        error_count = errors.get((name,), {}).get('count', 0)
+        stats[name] = {
+            **summary,
+            'errors': error_count,
+            'error_rate': round(error_count / summary['count'], 4) if summary['count'] else 0.0
+        }
+    return stats
+
+
+def call_stats(kind: str) -> Dict:
+    """외부 호출(ncbi/openai) 전체 호출 수와 오류율 + 호출 이름별 통계"""
+    by_name = span_stats(kind)
+    calls = sum(stat['count'] for stat in by_name.values())
+    errors = sum(stat['errors'] for stat in by_name.values())
+    return {
+        'calls': calls,
+        'errors': errors,
+        'error_rate': round(errors / calls, 4) if calls else 0.0,
+        'by_name': by_name
+    }
+
+
+class Trace:
+    """요청 하나의 구간(span) 기록 (time.perf_counter 기준, 시작 시각은 trace 시작부터의 ms)"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, kind: str, start: float, duration: float, status: str, attrs: Dict):
+        span = {
+            'name': name,
+            'kind': kind,
+            'start_ms': round((start - self.started) * 1000, 3),
+            'duration_ms': round(duration * 1000, 3),
+            'status': status,
+            **attrs
+        }
+        with self._lock:
+            self.spans.append(span)
+
+    def to_list(self) -> List[Dict]:
+        with self._lock:
+            return sorted(self.spans, key=lambda span: span['start_ms'])
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar('trace', default=None)
+
+
+@contextmanager
+def trace() -> Iterator[Trace]:
+    """현재 컨텍스트(요청)의 span을 모을 Trace 시작"""
+    current = Trace()
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        _current_trace.reset(token)
+
+
+def record(name: str, kind: str, duration: float, start: float = None, status: str = 'ok', **attrs):
+    """측정한 구간을 히스토그램과 현재 Trace에 기록"""
+    SPAN_SECONDS.observe((kind, name, status), duration)
+    current = _current_trace.get()
+    if current is not None:
+        current.add(name, kind, time.perf_counter() - duration if start is None else start, duration, status, attrs)
+
+
+@contextmanager
+def span(name: str, kind: str = 'call', **attrs) -> Iterator[Dict]:
+    """with 블록의 소요 시간을 span으로 기록 (예외가 나면 status=error, 취소되면 cancelled)
+
+    컨텍스트 변수를 바꾸지 않으므로 제너레이터의 yield를 가로질러 써도 안전합니다.
+    블록 안에서 돌려받은 dict에 값을 넣으면 span 속성으로 함께 기록됩니다.
+    """
+    start = time.perf_counter()
+    status = 'ok'
+    try:
+        yield attrs
+    except (GeneratorExit, asyncio.CancelledError):
+        # 소비자가 스트림을 중간에 닫거나 작업이 취소된 경우
+        status = 'cancelled'
+        raise
+    except BaseException:
+        status = 'error'
+        raise
+    finally:
+        record(name, kind, time.perf_counter() - start, start=start, status=status, **attrs)
+
+
+def bind(func: Callable[..., T]) -> Callable[..., T]:
+    """현재 Trace를 스레드 풀 작업에도 전달 (호출마다 컨텍스트 복사본에서 실행)"""
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs) -> T:
+        return context.copy().run(func, *args, **kwargs)
+
+    return run
+
+
+def render_metrics() -> str:
+    """/metrics 응답 본문 (Prometheus text exposition 형식)"""
+    lines = SPAN_SECONDS.render() + REQUEST_SECONDS.render()
+    return '\n'.join(lines) + '\n'
+
+
+class RequestProfiler:
+    """요청 하나를 cProfile 또는 pyinstrument로 프로파일링
+
+    cProfile은 이벤트 루프 스레드 전체를 측정하므로, 동시에 처리 중인 다른 요청도 결과에 섞일 수 있습니다.
+    pyinstrument는 async_mode로 해당 요청의 await 흐름만 따라갑니다 (설치되어 있지 않으면 cProfile 사용).
+    """
+
+    # 파이썬 프로파일러는 동시에 하나만 켤 수 있음
+    _active = threading.Lock()
+
+    def __init__(self, mode: str, top_n: int = 40):
+        self.mode = mode.lower()
+        self.top_n = top_n
+        if self.mode == 'pyinstrument' and pyinstrument is None:
+            print("⚠️ pyinstrument가 설치되어 있지 않아 cProfile로 프로파일링합니다")
+            self.mode = 'cprofile'
+        self._profiler = None
+
+    def start(self):
+        """프로파일링 시작 (다른 요청을 프로파일링 중이면 RuntimeError)"""
+        if not self._active.acquire(blocking=False):
+            raise RuntimeError("이미 다른 요청을 프로파일링 중입니다")
+        try:
+            if self.mode == 'pyinstrument':
+                self._profiler = pyinstrument.Profiler(async_mode='enabled')
+                self._profiler.start()
+            else:
+                self._profiler = cProfile.Profile()
+                self._profiler.enable()
+        except BaseException:
+            self._active.release()
+            raise
+
+    def stop(self) -> Tuple[str, str]:
+        """프로파일링을 멈추고 (보고서, media type) 반환"""
+        try:
+            if self.mode == 'pyinstrument':
+                self._profiler.stop()
+                return self._profiler.output_html(), 'text/html'
+            self._profiler.disable()
+        finally:
+            self._active.release()
+
+        output = io.StringIO()
+        stats = pstats.Stats(self._profiler, stream=output)
+        stats.strip_dirs().sort_stats('cumulative').print_stats(self.top_n)
+        return output.getvalue(), 'text/plain'
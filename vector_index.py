@@ -0,0 +1,552 @@
+#!/usr/bin/env python3
+"""
+유사 논문 벡터 색인
+
+논문 제목/초록을 TF-IDF로 만든 뒤 무작위 SVD로 줄인 밀집 벡터(LSA)를 memory-mapped 파일에 두고,
+무작위 초평면 LSH 테이블로 근사 최근접 이웃을 찾습니다. 작은 색인은 전체를 정확히 비교합니다.
+색인에 없는 논문도 같은 모델로 벡터를 만들 수 있으므로 (fold-in) 네트워크 없이 유사 논문을 찾습니다.
+
+    python vector_index.py build            # 로컬 논문 저장소(data/articles.db) 전체로 색인 생성
+    python vector_index.py similar 37010001 # 유사 논문 확인
+"""
+
+import argparse
+import json
+import math
+import os
+import shutil
+import threading
+import time
+from collections import Counter
+from itertools import combinations
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config import config
+from search_index import tokenize
+
+# 제목 용어는 초록 용어보다 이만큼 더 세어 가중
+TITLE_REPEAT = 2
+
+# 희소 행렬 곱을 나눠 계산할 때 한 번에 다루는 0이 아닌 원소 수 (메모리 상한)
+_NNZ_CHUNK = 200_000
+
+# LSH 후보가 k개의 이 배수보다 적으면 해밍 거리를 1비트씩 넓혀 이웃 버킷까지 조사
+_CANDIDATE_FACTOR = 20
+
+# 이웃 버킷을 찾는 최대 해밍 거리 (그래도 후보가 부족하면 전체를 훑지 않고 찾은 만큼만 반환)
+_MAX_PROBE_RADIUS = 2
+
+
+def _term_counts(paper: Dict) -> Counter:
+    counts = Counter(tokenize(paper.get('abstract', '') or ''))
+    for term in tokenize(paper.get('title', '') or ''):
+        counts[term] += TITLE_REPEAT
+    return counts
+
+
+def _indexable(paper: Dict) -> bool:
+    return str(paper.get('pmid', '')).isdigit()
+
+
+def _sparse_dot(rows: np.ndarray, cols: np.ndarray, vals: np.ndarray, dense: np.ndarray, n_rows: int) -> np.ndarray:
+    """(행 정렬된 COO 희소 행렬) @ dense"""
+    out = np.zeros((n_rows, dense.shape[1]), dtype=np.float32)
+    for start in range(0, len(vals), _NNZ_CHUNK):
+        r, c, v = rows[start:start + _NNZ_CHUNK], cols[start:start + _NNZ_CHUNK], vals[start:start + _NNZ_CHUNK]
+        unique_rows, starts = np.unique(r, return_index=True)
+        out[unique_rows] += np.add.reduceat(v[:, None] * dense[c], starts)
+    return out
+
+
+def _sparse_t_dot(rows: np.ndarray, cols: np.ndarray, vals: np.ndarray, dense: np.ndarray, n_cols: int) -> np.ndarray:
+    """(COO 희소 행렬).T @ dense"""
+    out = np.zeros((n_cols, dense.shape[1]), dtype=np.float32)
+    for start in range(0, len(vals), _NNZ_CHUNK):
+        r, c, v = rows[start:start + _NNZ_CHUNK], cols[start:start + _NNZ_CHUNK], vals[start:start + _NNZ_CHUNK]
+        order = np.argsort(c, kind='stable')
+        unique_cols, starts = np.unique(c[order], return_index=True)
+        out[unique_cols] += np.add.reduceat(v[order, None] * dense[r[order]], starts)
+    return out
+
+
+def _randomized_svd(rows, cols, vals, n_rows: int, n_cols: int, rank: int,
+                    rng: np.random.Generator, n_iter: int = 4, oversample: int = 10) -> np.ndarray:
+    """희소 행렬의 상위 rank개 오른쪽 특이벡터 (rank × n_cols, Halko et al. 무작위 SVD)"""
+    width = min(rank + oversample, n_rows, n_cols)
+    basis = _sparse_dot(rows, cols, vals, rng.standard_normal((n_cols, width)).astype(np.float32), n_rows)
+    for _ in range(n_iter):
+        basis, _ = np.linalg.qr(basis)
+        projected, _ = np.linalg.qr(_sparse_t_dot(rows, cols, vals, basis, n_cols))
+        basis = _sparse_dot(rows, cols, vals, projected, n_rows)
+    basis, _ = np.linalg.qr(basis)
+    small = _sparse_t_dot(rows, cols, vals, basis, n_cols).T
+    _, _, vt = np.linalg.svd(small, full_matrices=False)
+    return vt[:min(rank, width)].astype(np.float32)
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    """uint32 배열 원소별 1인 비트 수"""
+    values = values - ((values >> 1) & np.uint32(0x55555555))
+    values = (values & np.uint32(0x33333333)) + ((values >> 2) & np.uint32(0x33333333))
+    values = (values + (values >> 4)) & np.uint32(0x0F0F0F0F)
+    return (values * np.uint32(0x01010101)) >> 24
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+class TextVectorModel:
+    """용어 사전 + IDF + SVD 투영 + LSH 초평면"""
+
+    def __init__(self, vocabulary: List[str], idf: np.ndarray, components: np.ndarray = None,
+                 planes: np.ndarray = None, bits: int = 0):
+        self.vocabulary = vocabulary
+        self.columns = {term: index for index, term in enumerate(vocabulary)}
+        self.idf = idf.astype(np.float32)
+        self.components = components
+        self.planes = planes
+        self.bits = bits
+
+    @property
+    def dim(self) -> int:
+        return self.components.shape[0]
+
+    @property
+    def tables(self) -> int:
+        return self.planes.shape[0] // self.bits
+
+    def weights(self, documents: List[Counter]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """문서별 용어 빈도 → L2 정규화된 (1 + log tf) × idf 가중치의 COO (행 정렬)"""
+        rows, cols, vals = [], [], []
+        for row, counts in enumerate(documents):
+            entries = [(self.columns[term], count) for term, count in counts.items() if term in self.columns]
+            if not entries:
+                continue
+            columns = np.fromiter((column for column, _ in entries), dtype=np.int64, count=len(entries))
+            tf = np.fromiter((count for _, count in entries), dtype=np.float32, count=len(entries))
+            weight = (1.0 + np.log(tf)) * self.idf[columns]
+            weight /= np.linalg.norm(weight)
+            rows.append(np.full(len(entries), row, dtype=np.int64))
+            cols.append(columns)
+            vals.append(weight)
+        if not rows:
+            return np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0, np.float32)
+        return np.concatenate(rows), np.concatenate(cols), np.concatenate(vals).astype(np.float32)
+
+    def vectorize(self, papers: List[Dict]) -> np.ndarray:
+        """논문들의 단위 벡터 (len(papers) × dim, 사전 용어가 없으면 0 벡터)"""
+        rows, cols, vals = self.weights([_term_counts(paper) for paper in papers])
+        return _normalize(_sparse_dot(rows, cols, vals, self.components.T, len(papers)))
+
+    def codes(self, vectors: np.ndarray) -> np.ndarray:
+        """LSH 테이블별 버킷 코드 (len(vectors) × tables)"""
+        bits = (vectors @ self.planes.T > 0).reshape(len(vectors), self.tables, self.bits)
+        return (bits * (np.uint32(1) << np.arange(self.bits, dtype=np.uint32))).sum(axis=2, dtype=np.uint32)
+
+    def save(self, path: str):
+        np.savez(path, vocabulary=np.array(self.vocabulary, dtype=object), idf=self.idf,
+                 components=self.components, planes=self.planes, bits=np.array(self.bits))
+
+    @classmethod
+    def load(cls, path: str) -> 'TextVectorModel':
+        with np.load(path, allow_pickle=True) as data:
+            return cls(list(data['vocabulary']), data['idf'], data['components'], data['planes'], int(data['bits']))
+
+
+class VectorIndex:
+    """논문 벡터와 LSH 버킷을 세대(generation) 디렉터리에 저장하는 유사 논문 색인
+
+    path/CURRENT가 가리키는 세대 디렉터리에 모델(model.npz), 벡터(vectors.f32), PMID(pmids.i64),
+    버킷 코드(codes.u32)를 두고, 정렬된 버킷 코드(lsh_order.npy, lsh_codes.npy)와 정렬된 PMID
+    (pmid_keys.npy, pmid_rows.npy)로 이진 탐색합니다.
+    재구축은 새 세대를 만든 뒤 CURRENT만 바꾸므로 읽는 쪽은 다음 조회에서 새 색인을 엽니다.
+    add_papers()로 붙인 논문은 정렬되지 않은 꼬리 구간으로 두고 선형으로 비교합니다 (쓰는 프로세스는 하나).
+    """
+
+    _default: Optional['VectorIndex'] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, path: str = None, exact_threshold: int = None):
+        self.path = path or config.VECTOR_INDEX_PATH
+        self.exact_threshold = config.VECTOR_INDEX_EXACT_THRESHOLD if exact_threshold is None else exact_threshold
+        self.queries = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._version = None
+        self.model: Optional[TextVectorModel] = None
+        self._vectors = np.zeros((0, 0), np.float32)
+        self._codes = np.zeros((0, 0), np.uint32)
+        self._pmids = np.zeros(0, np.int64)
+        self._pmid_keys = np.zeros(0, np.int64)
+        self._pmid_rows = np.zeros(0, np.int64)
+        # add_papers()로 붙인 꼬리 구간만 dict로 (정렬 구간보다 우선)
+        self._tail_rows: Dict[str, int] = {}
+        self._paper_count = 0
+        self._lsh_order = None
+        self._lsh_codes = None
+        self._sorted_count = 0
+        self._sorted_unique = 0
+        self._refresh()
+
+    @classmethod
+    def default(cls) -> Optional['VectorIndex']:
+        """설정에 따라 프로세스 전체에서 공유하는 색인 반환 (비활성화 시 None)"""
+        if not config.VECTOR_INDEX_ENABLED:
+            return None
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    cls._default = cls()
+        return cls._default
+
+    # 세대 디렉터리 읽기
+
+    def _generation(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.path, 'CURRENT'), encoding='utf-8') as f:
+                return os.path.join(self.path, f.read().strip())
+        except FileNotFoundError:
+            return None
+
+    def _refresh(self):
+        """CURRENT나 meta.json이 바뀌었으면 다시 열기 (락을 잡은 상태 또는 생성자에서 호출)"""
+        generation = self._generation()
+        if generation is None:
+            return
+        meta_path = os.path.join(generation, 'meta.json')
+        try:
+            version = (generation, os.stat(meta_path).st_mtime_ns)
+        except FileNotFoundError:
+            return
+        if version == self._version:
+            return
+
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        if self._version is None or self._version[0] != generation:
+            self.model = TextVectorModel.load(os.path.join(generation, 'model.npz'))
+            self._lsh_order = np.load(os.path.join(generation, 'lsh_order.npy'), mmap_mode='r')
+            self._lsh_codes = np.load(os.path.join(generation, 'lsh_codes.npy'), mmap_mode='r')
+            self._sorted_count = meta['sorted_count']
+
+        count = meta['count']
+        self._vectors = self._map(generation, 'vectors.f32', np.float32, (count, self.model.dim))
+        self._codes = self._map(generation, 'codes.u32', np.uint32, (count, self.model.tables))
+        self._pmids = self._map(generation, 'pmids.i64', np.int64, (count,))
+        if self._version is None or self._version[0] != generation:
+            self._load_pmid_keys(generation, meta)
+        # 같은 PMID가 여러 번 붙었으면 마지막 행이 최신
+        tail = self._pmids[self._sorted_count:].tolist()
+        self._tail_rows = {str(pmid): row for row, pmid in enumerate(tail, self._sorted_count)}
+        self._paper_count = self._sorted_unique + sum(
+            1 for pmid in self._tail_rows if self._sorted_row(pmid) is None
+        )
+        self._version = version
+
+    def _load_pmid_keys(self, generation: str, meta: Dict):
+        """정렬 구간의 PMID 정렬본과 행 번호 열기 (예전 세대는 한 번 정렬해 만듦)"""
+        try:
+            self._pmid_keys = np.load(os.path.join(generation, 'pmid_keys.npy'), mmap_mode='r')
+            self._pmid_rows = np.load(os.path.join(generation, 'pmid_rows.npy'), mmap_mode='r')
+            self._sorted_unique = meta['sorted_unique']
+        except (FileNotFoundError, KeyError):
+            self._pmid_rows, self._pmid_keys, self._sorted_unique = _sorted_pmids(self._pmids[:self._sorted_count])
+
+    def _sorted_row(self, pmid: str) -> Optional[int]:
+        """정렬 구간에서 PMID의 (마지막) 행 번호"""
+        if not pmid.isdigit() or len(pmid) > 18 or len(self._pmid_keys) == 0:
+            return None
+        value = int(pmid)
+        position = int(np.searchsorted(self._pmid_keys, value, side='right')) - 1
+        if position < 0 or int(self._pmid_keys[position]) != value:
+            return None
+        return int(self._pmid_rows[position])
+
+    def _row(self, pmid: str) -> Optional[int]:
+        """PMID의 최신 행 번호 (꼬리 구간 → 정렬 구간 순)"""
+        row = self._tail_rows.get(pmid)
+        return row if row is not None else self._sorted_row(pmid)
+
+    @staticmethod
+    def _map(generation: str, name: str, dtype, shape) -> np.ndarray:
+        if shape[0] == 0:
+            return np.zeros(shape, dtype)
+        return np.memmap(os.path.join(generation, name), dtype=dtype, mode='r', shape=shape)
+
+    @property
+    def ready(self) -> bool:
+        return self.model is not None
+
+    def __len__(self) -> int:
+        return self._paper_count
+
+    def __contains__(self, pmid: str) -> bool:
+        return self._row(str(pmid)) is not None
+
+    # 검색
+
+    def similar(self, pmid: str, k: int = 5) -> Optional[List[Tuple[str, float]]]:
+        """색인된 논문과 가까운 논문 (pmid, 코사인 유사도) 최대 k개, 색인에 없으면 None
+
+        LSH 후보가 부족하면 k개보다 적게 반환합니다 (비어 있으면 호출하는 쪽이 ELink로 대체).
+        """
+        with self._lock:
+            self._refresh()
+            self.queries += 1
+            row = self._row(str(pmid))
+            if row is None:
+                self.misses += 1
+                return None
+            return self._nearest(np.asarray(self._vectors[row]), k, exclude={str(pmid)})
+
+    def similar_to_paper(self, paper: Dict, k: int = 5) -> List[Tuple[str, float]]:
+        """색인에 없는 논문을 같은 모델로 벡터화해 가까운 논문 k개 (자기 자신 제외)"""
+        with self._lock:
+            self._refresh()
+            if self.model is None:
+                return []
+            vector = self.model.vectorize([paper])[0]
+            if not vector.any():
+                return []
+            return self._nearest(vector, k, exclude={str(paper.get('pmid', ''))})
+
+    def _nearest(self, vector: np.ndarray, k: int, exclude: set) -> List[Tuple[str, float]]:
+        """락을 잡은 상태에서 호출 (큰 색인은 LSH 후보만 비교하고 전체를 훑지 않음)"""
+        count = len(self._pmids)
+        if count == 0:
+            return []
+        if count <= self.exact_threshold:
+            candidates = np.arange(count)
+        else:
+            candidates = self._lsh_candidates(vector, k)
+
+        scores = np.asarray(self._vectors[candidates]) @ vector
+        results = []
+        for index in np.argsort(-scores, kind='stable'):
+            row = int(candidates[index])
+            pmid = str(int(self._pmids[row]))
+            # 다시 붙인 논문의 이전 행은 건너뜀
+            if pmid in exclude or self._row(pmid) != row:
+                continue
+            results.append((pmid, round(float(scores[index]), 4)))
+            if len(results) >= k:
+                break
+        return results
+
+    def _lsh_candidates(self, vector: np.ndarray, k: int) -> np.ndarray:
+        """같은 버킷부터 해밍 거리 _MAX_PROBE_RADIUS까지 넓혀 가며 버킷에 든 행 번호 (후보가 충분하면 멈춤)"""
+        query_codes = self.model.codes(vector[None, :])[0]
+        tail = self._codes[self._sorted_count:]
+        tail_distance = _popcount(np.bitwise_xor(tail, query_codes)) if len(tail) else None
+
+        found = []
+        candidates = np.zeros(0, np.int64)
+        for radius in range(_MAX_PROBE_RADIUS + 1):
+            masks = np.array([sum(1 << bit for bit in flipped) for flipped in combinations(range(self.model.bits), radius)],
+                             dtype=np.uint32)
+            for table, code in enumerate(query_codes):
+                sorted_codes = self._lsh_codes[table]
+                probes = code ^ masks
+                lows = np.searchsorted(sorted_codes, probes, side='left')
+                highs = np.searchsorted(sorted_codes, probes, side='right')
+                for lo, hi in zip(lows.tolist(), highs.tolist()):
+                    if hi > lo:
+                        found.append(np.asarray(self._lsh_order[table, lo:hi]))
+            # add_papers()로 붙인 정렬되지 않은 꼬리 구간
+            if tail_distance is not None:
+                found.append(np.flatnonzero((tail_distance == radius).any(axis=1)) + self._sorted_count)
+            if found:
+                candidates = np.unique(np.concatenate(found))
+            if len(candidates) >= k * _CANDIDATE_FACTOR:
+                break
+        return candidates
+
+    # 갱신
+
+    def add_papers(self, papers: Iterable[Dict]) -> int:
+        """논문을 현재 세대 끝에 붙임 (이미 있는 PMID는 새 벡터로 대체), 붙인 논문 수 반환"""
+        papers = [paper for paper in papers if _indexable(paper)]
+        with self._lock:
+            self._refresh()
+            if self.model is None or not papers:
+                return 0
+            generation = self._version[0]
+            vectors = self.model.vectorize(papers)
+            _append_rows(generation, vectors, self.model.codes(vectors),
+                         np.array([int(paper['pmid']) for paper in papers], dtype=np.int64))
+            self._refresh()
+        return len(papers)
+
+    def stats(self) -> Dict:
+        """색인 크기와 조회 통계"""
+        with self._lock:
+            return {
+                'papers': self._paper_count,
+                'dim': self.model.dim if self.model is not None else 0,
+                'queries': self.queries,
+                'misses': self.misses
+            }
+
+
+def _sorted_pmids(pmids: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+    """(PMID 순 행 번호, 정렬된 PMID, 서로 다른 PMID 수) - 같은 PMID는 행 순서를 유지해 마지막 행이 뒤에 옴"""
+    rows = np.argsort(pmids, kind='stable').astype(np.int64)
+    keys = np.asarray(pmids)[rows]
+    unique = int(np.count_nonzero(np.diff(keys))) + 1 if len(keys) else 0
+    return rows, keys, unique
+
+
+def _write_meta(generation: str, meta: Dict):
+    temp_path = os.path.join(generation, 'meta.json.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(temp_path, os.path.join(generation, 'meta.json'))
+
+
+def _append_rows(generation: str, vectors: np.ndarray, codes: np.ndarray, pmids: np.ndarray):
+    """벡터/코드/PMID 파일 끝에 붙이고 meta.json의 개수 갱신 (개수를 마지막에 바꿔 읽는 쪽이 반쯤 쓴 행을 보지 않음)"""
+    for name, array in (('vectors.f32', vectors), ('codes.u32', codes), ('pmids.i64', pmids)):
+        with open(os.path.join(generation, name), 'ab') as f:
+            f.write(np.ascontiguousarray(array).tobytes())
+    with open(os.path.join(generation, 'meta.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+    meta['count'] += len(pmids)
+    _write_meta(generation, meta)
+
+
+def build_index(batches: Callable[[], Iterable[List[Dict]]], path: str = None, dim: int = None,
+                vocabulary_size: int = None, min_df: int = None, fit_sample: int = None,
+                tables: int = None, bits: int = None, seed: int = 0) -> int:
+    """논문 묶음을 두 번 읽어(용어 통계 → 벡터) 새 세대를 만들고 CURRENT를 바꿈, 색인한 논문 수 반환
+
+    batches는 호출할 때마다 처음부터 논문 묶음을 다시 내놓는 함수입니다.
+    """
+    path = path or config.VECTOR_INDEX_PATH
+    dim = dim or config.VECTOR_INDEX_DIM
+    vocabulary_size = vocabulary_size or config.VECTOR_INDEX_VOCABULARY_SIZE
+    min_df = config.VECTOR_INDEX_MIN_DF if min_df is None else min_df
+    fit_sample = fit_sample or config.VECTOR_INDEX_FIT_SAMPLE
+    tables = tables or config.VECTOR_INDEX_LSH_TABLES
+    bits = bits or config.VECTOR_INDEX_LSH_BITS
+    rng = np.random.default_rng(seed)
+
+    # 1차: 문서 빈도와 SVD 학습용 표본 (저장소 순서에 치우치지 않도록 저수지 표본 추출)
+    document_frequency: Counter = Counter()
+    sample: List[Counter] = []
+    seen = 0
+    for batch in batches():
+        for paper in batch:
+            if not _indexable(paper):
+                continue
+            counts = _term_counts(paper)
+            document_frequency.update(counts.keys())
+            seen += 1
+            if len(sample) < fit_sample:
+                sample.append(counts)
+            else:
+                slot = rng.integers(seen)
+                if slot < fit_sample:
+                    sample[slot] = counts
+    if seen == 0:
+        raise ValueError("색인할 논문이 없습니다")
+
+    frequent = [(term, df) for term, df in document_frequency.most_common(vocabulary_size) if df >= min_df]
+    if not frequent:
+        frequent = document_frequency.most_common(vocabulary_size)
+    vocabulary = [term for term, _ in frequent]
+    idf = np.array([math.log((1 + seen) / (1 + df)) + 1.0 for _, df in frequent], dtype=np.float32)
+
+    model = TextVectorModel(vocabulary, idf, bits=bits)
+    rows, cols, vals = model.weights(sample)
+    model.components = _randomized_svd(rows, cols, vals, len(sample), len(vocabulary), dim, rng)
+    model.planes = rng.standard_normal((tables * bits, model.dim)).astype(np.float32)
+
+    os.makedirs(path, exist_ok=True)
+    name = f"gen-{time.strftime('%Y%m%d%H%M%S')}-{os.getpid()}"
+    generation = os.path.join(path, name)
+    os.makedirs(generation)
+    model.save(os.path.join(generation, 'model.npz'))
+    for filename in ('vectors.f32', 'codes.u32', 'pmids.i64'):
+        open(os.path.join(generation, filename), 'wb').close()
+    _write_meta(generation, {'count': 0, 'sorted_count': 0, 'dim': model.dim, 'tables': tables, 'bits': bits})
+
+    # 2차: 모든 논문 벡터화
+    count = 0
+    for batch in batches():
+        batch = [paper for paper in batch if _indexable(paper)]
+        if not batch:
+            continue
+        vectors = model.vectorize(batch)
+        _append_rows(generation, vectors, model.codes(vectors),
+                     np.array([int(paper['pmid']) for paper in batch], dtype=np.int64))
+        count += len(batch)
+
+    # 테이블별로 버킷 코드를 정렬해 두고 조회 때 이진 탐색
+    codes = np.fromfile(os.path.join(generation, 'codes.u32'), dtype=np.uint32).reshape(count, tables)
+    order = np.argsort(codes, axis=0, kind='stable').T.astype(np.int64)
+    np.save(os.path.join(generation, 'lsh_order.npy'), order)
+    np.save(os.path.join(generation, 'lsh_codes.npy'), np.take_along_axis(codes.T, order, axis=1))
+    # PMID → 행 번호도 정렬해 두고 이진 탐색 (읽는 프로세스마다 dict를 만들지 않음)
+    pmid_rows, pmid_keys, unique = _sorted_pmids(np.fromfile(os.path.join(generation, 'pmids.i64'), dtype=np.int64))
+    np.save(os.path.join(generation, 'pmid_rows.npy'), pmid_rows)
+    np.save(os.path.join(generation, 'pmid_keys.npy'), pmid_keys)
+    _write_meta(generation, {'count': count, 'sorted_count': count, 'sorted_unique': unique,
+                             'dim': model.dim, 'tables': tables, 'bits': bits})
+
+    current_path = os.path.join(path, 'CURRENT')
+    with open(current_path + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(name)
+    os.replace(current_path + '.tmp', current_path)
+
+    # 이전 세대 정리 (열어 둔 memmap은 파일이 지워져도 계속 읽을 수 있음)
+    for entry in os.listdir(path):
+        if entry.startswith('gen-') and entry != name:
+            shutil.rmtree(os.path.join(path, entry), ignore_errors=True)
+    return count
+
+
+def main():
+    from article_store import ArticleStore
+
+    parser = argparse.ArgumentParser(description="유사 논문 벡터 색인")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help="논문 저장소 전체로 색인 생성")
+    build_parser.add_argument('--store-path', default=None)
+    build_parser.add_argument('--path', default=None)
+    build_parser.add_argument('--batch-size', type=int, default=1000)
+    similar_parser = subparsers.add_parser('similar', help="유사 논문 조회")
+    similar_parser.add_argument('pmid')
+    similar_parser.add_argument('-k', type=int, default=5)
+    similar_parser.add_argument('--path', default=None)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        store = ArticleStore(path=args.store_path, ttl=0, max_entries=0)
+        start = time.perf_counter()
+        try:
+            count = build_index(lambda: store.iter_papers(args.batch_size), path=args.path)
+        finally:
+            store.close()
+        print(f"✅ 논문 {count}개 색인 ({time.perf_counter() - start:.1f}초)")
+        return
+
+    index = VectorIndex(path=args.path)
+    start = time.perf_counter()
+    neighbors = index.similar(args.pmid, args.k)
+    elapsed = (time.perf_counter() - start) * 1000
+    if neighbors is None:
+        print(f"⚠️ 색인에 없는 PMID: {args.pmid}")
+        return
+    for pmid, score in neighbors:
+        print(f"{pmid}\t{score:.4f}")
+    print(f"({elapsed:.1f}ms)")
+
+
+if __name__ == "__main__":
+    main()